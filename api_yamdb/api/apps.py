@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = "api"
+
+    def ready(self):
+        import api.signals  # noqa: F401
+        import db.slow_queries  # noqa: F401
+        from api.cache import check_shared_cache
+
+        check_shared_cache()
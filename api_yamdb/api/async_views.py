@@ -0,0 +1,406 @@
+"""Асинхронные чтения произведений, отзывов и комментариев для ASGI.
+
+Django 2.2 не умеет асинхронные представления, поэтому
+``AsyncReadApplication`` сама обрабатывает GET-запросы к спискам и
+объектам из ``ROUTES``, а остальные запросы передает WSGI-приложению
+через ``asgiref.wsgi.WsgiToAsgi``.
+
+Обработчик создает тот же вьюсет, что и синхронный путь, и берет у него
+аутентификацию, права, условные запросы, кэш ответов, фильтры и
+пагинацию. Синхронный код выполняется в пуле ``ASGI_DB_WORKERS``
+потоков, а независимые запросы к базе (родительский объект, страница,
+число строк) - в нем одновременно. Middleware Django на этом пути не
+выполняются: заголовки ``X-DB-*`` и метрики запроса пишет сам
+обработчик, а роутер реплик включает ``request_routing``.
+
+Соединение потока пула проверяется (и при ``CONN_MAX_AGE=0``
+переоткрывается) один раз за запрос, поэтому для ASGI нужен
+``DB_CONN_MAX_AGE`` больше нуля или ``DB_POOL=True``.
+"""
+import asyncio
+import contextvars
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache, partial
+
+from api.fastpath import (FastCommentsSerializer, FastReviewsSerializer,
+                          FastTitleSerializer)
+from api.fieldsets import EXPAND_PARAM, FIELDS_PARAM
+from api.middleware import QueryCounter
+from api.views import CommentsViewSet, ReviewsViewSet, TitleViewSet
+from asgiref.wsgi import WsgiToAsgiInstance
+from db.routers import primary_reads, request_routing
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.paginator import InvalidPage
+from django.db import close_old_connections, connections
+from django.http import Http404, QueryDict
+from django.urls import Resolver404, resolve
+from django.views.defaults import server_error
+from metrics.http import observe_request
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from reviews.models import Comment, Review
+
+logger = logging.getLogger("api.async")
+
+ROUTES = {}
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    """Пул потоков для синхронного кода; он же ограничивает соединения."""
+    return ThreadPoolExecutor(
+        max_workers=settings.ASGI_DB_WORKERS,
+        thread_name_prefix="api-async-db",
+    )
+
+
+class Database:
+    """Выполняет синхронный код в пуле и считает его SQL-запросы."""
+
+    def __init__(self):
+        self.counters = []
+        # Потоки пула, которые уже проверили соединения в этом запросе.
+        self.threads = set()
+
+    async def __call__(self, function, *args):
+        counter = QueryCounter()
+        self.counters.append(counter)
+        loop = asyncio.get_event_loop()
+        # Контекст копируется, чтобы роутер реплик в потоке пула видел
+        # состояние этого запроса.
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            get_executor(),
+            partial(context.run, self.run, counter, function, *args),
+        )
+
+    def run(self, counter, function, *args):
+        thread = threading.get_ident()
+        if thread not in self.threads:
+            # Как request_started в WSGI: устаревшее или сломанное
+            # соединение потока закрывается один раз за запрос, а не
+            # вокруг каждого вызова.
+            self.threads.add(thread)
+            close_old_connections()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(counter)
+                )
+            return function(*args)
+
+    @property
+    def query_count(self):
+        return sum(counter.count for counter in self.counters)
+
+    @property
+    def query_time(self):
+        return sum(counter.duration for counter in self.counters)
+
+
+async def gather(*awaitables):
+    """Как ``asyncio.gather``, но ошибка - первая по порядку аргументов.
+
+    Так ответ не зависит от того, какой из запросов завершился раньше,
+    и совпадает с ответом синхронного пути, где они идут по очереди.
+    """
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+def route(viewset, action):
+    def register(handler):
+        ROUTES[viewset, action] = handler
+        return handler
+
+    return register
+
+
+async def cached(view, request, db, handler):
+    key, response = await db(view.get_cached_response, request)
+    if response is not None:
+        return response
+    with primary_reads():
+        response = await handler()
+    return await db(view.cache_response, key, response)
+
+
+def fill_page(paginator, request, queryset, number, count, rows):
+    """Страница ``PageNumberPagination`` из заранее прочитанных строк.
+
+    Повторяет ``paginate_queryset``, но число строк и сама страница
+    уже получены параллельными запросами.
+    """
+    django_paginator = paginator.django_paginator_class(
+        queryset, paginator.get_page_size(request)
+    )
+    django_paginator.count = count
+    try:
+        page = django_paginator.page(number)
+    except InvalidPage as exc:
+        raise NotFound(
+            paginator.invalid_page_message.format(
+                page_number=number, message=str(exc)
+            )
+        )
+    page.object_list = rows
+    if django_paginator.num_pages > 1 and paginator.template is not None:
+        paginator.display_page_controls = True
+    paginator.page = page
+    paginator.request = request
+    return rows
+
+
+@route(TitleViewSet, "list")
+async def title_list(view, request, db):
+    async def handler():
+        serializer = FastTitleSerializer()
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        number = int(request.query_params.get(paginator.page_query_param, 1))
+        size = paginator.get_page_size(request)
+        bottom = (number - 1) * size
+        rows = serializer.get_queryset(queryset)[bottom:bottom + size]
+        count, rows = await gather(db(queryset.count), db(list, rows))
+        page = fill_page(paginator, request, queryset, number, count, rows)
+        data = await db(serializer.to_representation, page)
+        return paginator.get_paginated_response(data)
+
+    return await cached(view, request, db, handler)
+
+
+@route(TitleViewSet, "retrieve")
+async def title_detail(view, request, db):
+    async def handler():
+        serializer = FastTitleSerializer()
+        pk = view.kwargs["pk"]
+        queryset = view.filter_queryset(view.get_queryset()).filter(pk=pk)
+        rows, links = await gather(
+            db(list, serializer.get_queryset(queryset)),
+            db(list, serializer.genre_links([pk])),
+        )
+        if not rows:
+            raise Http404
+        return Response(serializer.to_representation(rows, links)[0])
+
+    return await cached(view, request, db, handler)
+
+
+async def nested_list(view, request, db, serializer, queryset):
+    """Страница вложенного списка вместе с проверкой родителя.
+
+    Родитель проверяется запросом ``get_parent_queryset`` вьюсета, но
+    параллельно со страницей, а не перед ней, как в ``get_parent``.
+    """
+    paginator = view.paginator
+    exists, page = await gather(
+        db(view.get_parent_queryset().exists),
+        db(
+            paginator.paginate_queryset,
+            serializer.get_queryset(view.filter_queryset(queryset)),
+            request,
+            view,
+        ),
+    )
+    if not exists:
+        raise Http404
+    return paginator.get_paginated_response(
+        serializer.to_representation(page)
+    )
+
+
+async def nested_detail(view, db, serializer, queryset):
+    # Родитель и сам объект проверяются одним запросом: в обоих
+    # случаях синхронный путь отвечает одинаковым 404.
+    rows = await db(
+        list, serializer.get_queryset(view.filter_queryset(queryset))
+    )
+    if not rows:
+        raise Http404
+    return Response(serializer.to_representation(rows)[0])
+
+
+@route(ReviewsViewSet, "list")
+async def review_list(view, request, db):
+    return await nested_list(
+        view,
+        request,
+        db,
+        FastReviewsSerializer(),
+        Review.objects.filter(title_id=view.kwargs["title_id"]),
+    )
+
+
+@route(ReviewsViewSet, "retrieve")
+async def review_detail(view, request, db):
+    return await nested_detail(
+        view,
+        db,
+        FastReviewsSerializer(),
+        Review.objects.filter(
+            pk=view.kwargs["pk"], title_id=view.kwargs["title_id"]
+        ),
+    )
+
+
+@route(CommentsViewSet, "list")
+async def comment_list(view, request, db):
+    return await nested_list(
+        view,
+        request,
+        db,
+        FastCommentsSerializer(),
+        Comment.objects.filter(reviews_id=view.kwargs["review_id"]),
+    )
+
+
+@route(CommentsViewSet, "retrieve")
+async def comment_detail(view, request, db):
+    return await nested_detail(
+        view,
+        db,
+        FastCommentsSerializer(),
+        Comment.objects.filter(
+            pk=view.kwargs["pk"],
+            reviews_id=view.kwargs["review_id"],
+            reviews__title_id=view.kwargs["title_id"],
+        ),
+    )
+
+
+def is_page_number(value):
+    return value.isdigit() and not value.startswith("0")
+
+
+def match_route(scope):
+    """Маршрут из ``ROUTES`` для запроса или None.
+
+    Запросы, ответ на которые асинхронный путь не повторит байт в байт
+    (выборочные поля, нецелые идентификаторы, страница ``last`` и т.п.),
+    остаются синхронному пути, как и запросы на профилирование: его
+    делает ``ProfilingMiddleware``.
+    """
+    if scope["type"] != "http" or scope["method"] != "GET":
+        return None
+    headers = scope.get("headers", ())
+    if any(name.lower() == b"x-profile" for name, _ in headers):
+        return None
+    try:
+        match = resolve(scope["path"])
+    except Resolver404:
+        return None
+    view = match.func
+    action = getattr(view, "actions", {}).get("get")
+    if (getattr(view, "cls", None), action) not in ROUTES:
+        return None
+    if not all(str(value).isdigit() for value in match.kwargs.values()):
+        return None
+    query = QueryDict(scope["query_string"].decode("latin1"))
+    if FIELDS_PARAM in query or EXPAND_PARAM in query:
+        return None
+    page_param = getattr(view.cls.pagination_class, "page_query_param", None)
+    page = query.get(page_param) if page_param else None
+    if page is not None and not is_page_number(page):
+        return None
+    return match
+
+
+def build_request(scope):
+    instance = WsgiToAsgiInstance(None)
+    instance.scope = scope
+    return WSGIRequest(instance.build_environ(scope, io.BytesIO()))
+
+
+async def dispatch(match, django_request, db):
+    """Аналог ``APIView.dispatch`` с асинхронным обработчиком."""
+    function = match.func
+    view = function.cls(**function.initkwargs)
+    view.action_map = function.actions
+    args, kwargs = view.args, view.kwargs = match.args, match.kwargs
+    request = view.initialize_request(django_request, *args, **kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+    handler = ROUTES[function.cls, view.action]
+    try:
+        await db(partial(view.initial, request, *args, **kwargs))
+        # Права на объект для безопасных методов не проверяются:
+        # IsAdminOrReadOnly и IsOwnerOrReadOnly разрешают чтение всем.
+        response = await handler(view, request, db)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    response = view.finalize_response(request, response, *args, **kwargs)
+    if callable(getattr(response, "render", None)):
+        response = await db(response.render)
+    return response
+
+
+async def send_response(send, response):
+    headers = [
+        (name.encode("latin1"), str(value).encode("latin1"))
+        for name, value in response.items()
+    ]
+    for cookie in response.cookies.values():
+        headers.append(
+            (b"Set-Cookie", cookie.output(header="").strip().encode("ascii"))
+        )
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": headers,
+        }
+    )
+    await send({"type": "http.response.body", "body": response.content})
+
+
+class AsyncReadApplication:
+    """ASGI-приложение: чтения из ``ROUTES`` асинхронно, прочее - в WSGI."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        database = settings.DATABASES["default"]
+        if not database.get("CONN_MAX_AGE") and "POOL" not in database:
+            logger.warning(
+                "ASGI with CONN_MAX_AGE=0 opens a database connection "
+                "per request and pool thread; set DB_CONN_MAX_AGE or "
+                "DB_POOL=True."
+            )
+
+    async def __call__(self, scope, receive, send):
+        started = time.perf_counter()
+        match = match_route(scope)
+        if match is None:
+            return await self.fallback(scope, receive, send)
+        request = build_request(scope)
+        request.resolver_match = match
+        try:
+            request.get_host()
+        except DisallowedHost:
+            # Ответ 400 на чужой Host формирует обработчик Django.
+            return await self.fallback(scope, receive, send)
+        db = Database()
+        try:
+            with request_routing(request):
+                response = await dispatch(match, request, db)
+        except Exception:
+            logger.exception("Async read %s failed", request.path)
+            response = server_error(request)
+        request.query_count = db.query_count
+        request.query_time = db.query_time
+        if getattr(settings, "QUERY_COUNT_HEADERS", True):
+            response["X-DB-Query-Count"] = str(db.query_count)
+            response["X-DB-Time-Ms"] = f"{db.query_time * 1000:.2f}"
+        observe_request(
+            match, request, response, time.perf_counter() - started
+        )
+        return await send_response(send, response)
@@ -0,0 +1,74 @@
+from api.cache import get_cache
+from django.conf import settings
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from users.models import User
+
+# Пароль и код подтверждения в кэш не попадают; если к ним обратятся,
+# Django догрузит их из БД как отложенные поля.
+SKIPPED_FIELDS = ("password", "confirmation_code")
+CACHED_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.name not in SKIPPED_FIELDS
+)
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def forget_user(user_id, using=None):
+    """Сбрасывает пользователя из кэша, в том числе после коммита."""
+    key = user_cache_key(user_id)
+    get_cache().delete(key)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: get_cache().delete(key), using=using)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, берущая пользователя из кэша.
+
+    Вместо запроса к БД на каждый запрос пользователь собирается из
+    закэшированных полей. Запись сбрасывается сигналами при
+    сохранении и удалении пользователя.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        values = self.get_cached_values(user_id)
+        if values is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        user = User.from_db(router.db_for_read(User), CACHED_FIELDS, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
+
+    @staticmethod
+    def get_cached_values(user_id):
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is not None:
+            return values
+        values = (
+            User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list(*CACHED_FIELDS)
+            .first()
+        )
+        if values is not None:
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+        return values
@@ -0,0 +1,181 @@
+"""Выполнение пачки запросов к API внутри одного HTTP-запроса.
+
+Подзапросы проходят через резолвер URL и вьюсеты ``router_v1`` как
+обычные запросы, но без middleware и без повторной проверки JWT:
+пользователь родительского запроса передается вьюсету через
+``_force_auth_user``/``_force_auth_token`` - тот же механизм, которым
+пользуется ``APIClient.force_authenticate``.
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections, transaction
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger("api.batch")
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+METHODS = SAFE_METHODS + ("POST", "PUT", "PATCH", "DELETE")
+# Заголовки ответа подзапроса, которые возвращаются клиенту.
+RESPONSE_HEADERS = ("ETag", "Last-Modified", "Location", "X-Cache")
+# Заголовки родительского запроса, которые подзапросы не наследуют.
+DROPPED_ENVIRON = (
+    "CONTENT_LENGTH",
+    "CONTENT_TYPE",
+    "HTTP_AUTHORIZATION",
+    "HTTP_IF_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_UNMODIFIED_SINCE",
+)
+
+
+class BatchRollbackError(Exception):
+    """Подзапрос в режиме ``atomic`` завершился ошибкой."""
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    """Общий для всех пачек пул, ограничивающий число потоков."""
+    return ThreadPoolExecutor(
+        max_workers=settings.BATCH_MAX_WORKERS,
+        thread_name_prefix="api-batch",
+    )
+
+
+def router_viewsets():
+    from api.urls import router_v1
+
+    return {viewset for _, viewset, _ in router_v1.registry}
+
+
+def resolve_route(path):
+    """Находит маршрут ``router_v1`` для пути подзапроса или None."""
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return None
+    if getattr(match.func, "cls", None) not in router_viewsets():
+        return None
+    return match
+
+
+def build_request(parent, operation):
+    url = urlsplit(operation["path"])
+    body = b""
+    if operation.get("body") is not None:
+        body = json.dumps(operation["body"]).encode()
+    environ = {
+        key: value
+        for key, value in parent.META.items()
+        if key not in DROPPED_ENVIRON
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": operation["method"],
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+    )
+    for name, value in operation.get("headers", {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    request = WSGIRequest(environ)
+    if parent.user.is_authenticated:
+        request._force_auth_user = parent.user
+        request._force_auth_token = parent.auth
+    return request
+
+
+def response_body(response):
+    data = getattr(response, "data", None)
+    if data is not None:
+        return data
+    if not getattr(response, "is_rendered", True):
+        # Ответ DRF без данных (204 на DELETE) еще не отрендерен.
+        response.render()
+    if not response.content:
+        return None
+    try:
+        return json.loads(response.content)
+    except ValueError:
+        return response.content.decode(response.charset, "replace")
+
+
+def execute(parent, operation, index):
+    """Выполняет один подзапрос и возвращает его результат."""
+    request = build_request(parent, operation)
+    match = resolve_route(request.path_info)
+    request.resolver_match = match
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        return {
+            "id": operation.get("id", index),
+            "status": response.status_code,
+            "headers": {
+                name: response[name]
+                for name in RESPONSE_HEADERS
+                if response.has_header(name)
+            },
+            "body": response_body(response),
+        }
+    except Exception:
+        # Исключения, которые не обработал DRF, не должны ронять
+        # остальные подзапросы; в обычном запросе здесь был бы 500.
+        logger.exception("Batch operation %s failed", operation["path"])
+        return {
+            "id": operation.get("id", index),
+            "status": 500,
+            "headers": {},
+            "body": {"detail": "Internal server error."},
+        }
+
+
+def execute_in_thread(parent, operation, index):
+    close_old_connections()
+    try:
+        return execute(parent, operation, index)
+    finally:
+        close_old_connections()
+
+
+def run_batch(parent, operations, atomic=False):
+    """Выполняет подзапросы и возвращает ``(результаты, откат)``.
+
+    Пачка только из чтений без ``atomic`` выполняется в пуле потоков
+    ``BATCH_MAX_WORKERS``; остальные - последовательно в порядке
+    перечисления. В режиме ``atomic`` первая ошибка (статус 400 и выше)
+    откатывает все изменения и останавливает выполнение.
+    """
+    if atomic:
+        results = []
+        try:
+            with transaction.atomic():
+                for index, operation in enumerate(operations):
+                    results.append(execute(parent, operation, index))
+                    if results[-1]["status"] >= 400:
+                        raise BatchRollbackError
+        except BatchRollbackError:
+            return results, True
+        return results, False
+    reads_only = all(
+        operation["method"] in SAFE_METHODS for operation in operations
+    )
+    if reads_only and settings.BATCH_MAX_WORKERS > 1 and len(operations) > 1:
+        futures = [
+            get_executor().submit(execute_in_thread, parent, operation, index)
+            for index, operation in enumerate(operations)
+        ]
+        return [future.result() for future in futures], False
+    return [
+        execute(parent, operation, index)
+        for index, operation in enumerate(operations)
+    ], False
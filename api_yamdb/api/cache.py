@@ -0,0 +1,195 @@
+import hashlib
+import time
+
+from db.routers import primary_reads
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from rest_framework.response import Response
+
+CATALOG_NAMESPACE = "catalog"
+USERS_NAMESPACE = "users"
+# Рейтинги произведений, пересчитанные разом в обход save().
+RATINGS_NAMESPACE = "ratings"
+# Категории и жанры, которые входят в представление произведения.
+TAXONOMY_NAMESPACE = "taxonomy"
+# Имена пользователей, которые входят в отзывы и комментарии.
+AUTHORS_NAMESPACE = "authors"
+
+
+def reviews_namespace(title_id):
+    return f"reviews:{title_id}"
+
+
+def comments_namespace(review_id):
+    return f"comments:{review_id}"
+
+
+def object_namespace(model, lookup):
+    """Пространство одного объекта по значению поля из адреса."""
+    return f"object:{model._meta.label_lower}:{lookup}"
+
+
+# Бэкенды, данные которых видны только своему процессу.
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def shared_cache_aliases():
+    """Кэши, данные которых должны видеть все процессы."""
+    aliases = [settings.API_CACHE_ALIAS]
+    if settings.DATABASE_REPLICAS and settings.DATABASE_STICKY_SECONDS:
+        aliases.append(settings.DATABASE_STICKY_CACHE)
+    return aliases
+
+
+def check_shared_cache():
+    """Проверяет, что версии и метки записи общие для процессов."""
+    if not settings.API_CACHE_REQUIRE_SHARED:
+        return
+    for alias in shared_cache_aliases():
+        backend = settings.CACHES[alias]["BACKEND"]
+        if backend in PROCESS_LOCAL_BACKENDS:
+            raise ImproperlyConfigured(
+                f"Кэш {alias!r} ({backend}) не общий для процессов: "
+                "запись в одном воркере или команде не дойдет до "
+                "остальных. Задайте CACHE_BACKEND, например "
+                "django.core.cache.backends.db.DatabaseCache."
+            )
+
+
+def _version_key(namespace):
+    return f"api:version:{namespace}"
+
+
+def _initial_version():
+    # Версия, созданная заново после вытеснения ключа, не должна
+    # совпасть ни с одной из прежних.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    cache = get_cache()
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is not None:
+        return version
+    cache.add(key, _initial_version(), settings.API_VERSION_TIMEOUT)
+    return cache.get(key)
+
+
+def _modified_key(namespace):
+    return f"api:modified:{namespace}"
+
+
+def get_last_modified(namespaces):
+    """Время последнего изменения пространств имен или None."""
+    cache = get_cache()
+    stamps = cache.get_many([_modified_key(name) for name in namespaces])
+    return max(stamps.values(), default=None)
+
+
+def _bump(namespace):
+    cache = get_cache()
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), settings.API_VERSION_TIMEOUT)
+    cache.set(
+        _modified_key(namespace), time.time(), settings.API_VERSION_TIMEOUT
+    )
+
+
+def bump_version(namespace, using=None):
+    """Делает недействительными все ответы из пространства имен.
+
+    Внутри транзакции версия сдвигается еще раз после коммита, чтобы
+    отбросить ответы, закэшированные до того, как изменения стали
+    видны другим соединениям.
+    """
+    _bump(namespace)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: _bump(namespace), using=using)
+
+
+def _count(event):
+    cache = get_cache()
+    key = f"api:cache:{event}"
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def cache_stats():
+    """Счетчики попаданий и промахов кэша ответов."""
+    cache = get_cache()
+    return {
+        event: cache.get(f"api:cache:{event}", 0)
+        for event in ("hits", "misses")
+    }
+
+
+class CachedResponseMixin:
+    """Кэширует данные ответов на безопасные запросы к вьюсету.
+
+    Ключ включает версию пространства имен ``cache_namespace``, имя
+    вьюсета и полный путь запроса вместе с отсортированными
+    параметрами, в том числе номером страницы.
+    """
+
+    cache_namespace = CATALOG_NAMESPACE
+
+    def get_response_cache_key(self, request):
+        params = sorted(request.query_params.lists())
+        raw = f"{self.basename}:{self.action}:{request.path}:{params}"
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        version = get_version(self.cache_namespace)
+        return f"api:response:{self.cache_namespace}:{version}:{digest}"
+
+    def get_cached_response(self, request):
+        """Ключ кэша и готовый ответ из кэша или None при промахе."""
+        key = self.get_response_cache_key(request)
+        data = get_cache().get(key)
+        if data is None:
+            _count("misses")
+            return key, None
+        _count("hits")
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return key, response
+
+    def cache_response(self, key, response):
+        if response.status_code == 200:
+            get_cache().set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key, response = self.get_cached_response(request)
+        if response is not None:
+            return response
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        return self.cache_response(key, response)
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
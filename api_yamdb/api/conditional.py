@@ -0,0 +1,138 @@
+import hashlib
+
+from api.cache import (CATALOG_NAMESPACE, get_last_modified, get_version,
+                       object_namespace)
+from api.fieldsets import EXPAND_PARAM, FIELDS_PARAM
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS
+
+
+class PreconditionError(Exception):
+    """Ответ на условный запрос, готовый до вызова обработчика."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalRequestMixin:
+    """Поддержка ETag и условных запросов без сериализации ответа.
+
+    Валидаторы строятся из счетчиков версий пространств имен, которые
+    сдвигаются сигналами при изменении данных, поэтому для ответа
+    304 или 412 не нужны ни сериализаторы, ни запросы к БД. Список
+    зависит от пространств ``etag_namespaces``, а объект - от своей
+    версии ``etag_model`` и пространств ``object_etag_namespaces``:
+    запись в другой объект не меняет его ETag.
+    """
+
+    etag_namespaces = (CATALOG_NAMESPACE,)
+    etag_model = None
+    object_etag_namespaces = ()
+    request_validators = None
+    conditional_actions = (
+        "list",
+        "retrieve",
+        "update",
+        "partial_update",
+        "destroy",
+    )
+
+    def url_id(self, name):
+        """Значение из адреса; числовые приводятся к ``int``.
+
+        ``/titles/05/`` и ``/titles/5/`` - один и тот же объект, а
+        сигналы строят пространства версий из ``int``.
+        """
+        value = self.kwargs[name]
+        return int(value) if value.isdigit() else value
+
+    def get_etag_namespaces(self):
+        """Пространства, от которых зависит список."""
+        return self.etag_namespaces
+
+    def get_object_etag_namespaces(self):
+        """Версия объекта из адреса и пространства его связей."""
+        lookup = self.url_id(self.lookup_url_kwarg or self.lookup_field)
+        return (
+            object_namespace(self.etag_model, lookup),
+        ) + tuple(self.object_etag_namespaces)
+
+    def get_validator_namespaces(self):
+        if self.action == "list":
+            return self.get_etag_namespaces()
+        return self.get_object_etag_namespaces()
+
+    def get_etag(self, request):
+        namespaces = self.get_validator_namespaces()
+        versions = [get_version(namespace) for namespace in namespaces]
+        if self.action == "list":
+            params = sorted(request.query_params.lists())
+        else:
+            # Представление объекта зависит от ?fields= и ?expand=.
+            params = [
+                (name, request.query_params.getlist(name))
+                for name in (FIELDS_PARAM, EXPAND_PARAM)
+                if name in request.query_params
+            ]
+        renderer = getattr(request, "accepted_renderer", None)
+        media_format = getattr(renderer, "format", "")
+        raw = f"{versions}:{request.path}:{params}:{media_format}"
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def get_validators(self, request):
+        etag = self.get_etag(request)
+        last_modified = get_last_modified(self.get_validator_namespaces())
+        return etag, last_modified and int(last_modified)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action not in self.conditional_actions:
+            return
+        etag, last_modified = self.get_validators(request)
+        self.request_validators = (etag, last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if (
+            response is not None
+            and response.status_code == 304
+            and not request.META.get("HTTP_IF_NONE_MATCH")
+        ):
+            # Last-Modified с точностью до секунды не отличает две записи
+            # в одну секунду, поэтому 304 отдается только по ETag.
+            response = None
+        if response is not None:
+            if response.status_code == 304:
+                self.set_validators(response, etag, last_modified)
+            raise PreconditionError(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, PreconditionError):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            response.status_code == 200
+            and getattr(self, "action", None) in self.conditional_actions
+        ):
+            # После изменения данных версия уже сдвинута, поэтому
+            # валидаторы для ответа на запись считаются заново.
+            validators = (
+                self.request_validators
+                if request.method in SAFE_METHODS
+                else self.get_validators(request)
+            )
+            self.set_validators(response, *validators)
+        return response
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
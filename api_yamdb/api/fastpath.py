@@ -0,0 +1,156 @@
+"""Быстрые сериализаторы для списков произведений, отзывов и комментариев.
+
+Строки читаются через ``values()``, а каждое поле ответа превращается
+в заранее подготовленную пару (имя, функция извлечения), поэтому на
+строку не создаются ни модели, ни поля DRF. Результат совпадает
+с ``TitleSerializer``, ``ReviewsSerializer`` и ``CommentsSerializer``
+байт в байт, это проверяют тесты ``tests/test_fastpath.py``.
+"""
+from operator import itemgetter
+
+from api.fieldsets import EXPAND_PARAM, FIELDS_PARAM
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from reviews.models import Genre
+
+
+def nullable(convert, getter):
+    def extract(row):
+        value = getter(row)
+        return None if value is None else convert(value)
+
+    return extract
+
+
+def datetime_extractor(column):
+    # Формат и часовой пояс берутся из того же поля DRF, что и в
+    # ModelSerializer; сам экземпляр поля создается один раз.
+    field = serializers.DateTimeField()
+    return nullable(field.to_representation, itemgetter(column))
+
+
+class FastListSerializer:
+    """Превращает строки ``values()`` в данные ответа списка.
+
+    ``fields`` - кортеж пар (имя в ответе, извлекатель), где извлекатель
+    - функция от строки ``values()``; ``columns`` - поля для ``values()``.
+    """
+
+    columns = ()
+    fields = ()
+
+    def get_queryset(self, queryset):
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def to_representation(self, rows):
+        fields = self.fields
+        return [
+            {name: extract(row) for name, extract in fields} for row in rows
+        ]
+
+
+class FastReviewsSerializer(FastListSerializer):
+    columns = ("id", "text", "author__username", "score", "pub_date")
+    fields = (
+        ("id", itemgetter("id")),
+        ("text", itemgetter("text")),
+        ("author", itemgetter("author__username")),
+        ("score", itemgetter("score")),
+        ("pub_date", datetime_extractor("pub_date")),
+    )
+
+
+class FastCommentsSerializer(FastListSerializer):
+    columns = ("id", "text", "author__username", "pub_date")
+    fields = (
+        ("id", itemgetter("id")),
+        ("text", itemgetter("text")),
+        ("author", itemgetter("author__username")),
+        ("pub_date", datetime_extractor("pub_date")),
+    )
+
+
+def category_extractor(row):
+    if row["category_id"] is None:
+        return None
+    return {"name": row["category__name"], "slug": row["category__slug"]}
+
+
+class FastTitleSerializer(FastListSerializer):
+    columns = (
+        "id",
+        "category_id",
+        "category__name",
+        "category__slug",
+        "rating",
+        "name",
+        "description",
+        "year",
+    )
+    fields = (
+        ("id", itemgetter("id")),
+        ("category", category_extractor),
+        ("genre", itemgetter("genre")),
+        ("rating", nullable(float, itemgetter("rating"))),
+        ("name", itemgetter("name")),
+        ("description", itemgetter("description")),
+        ("year", itemgetter("year")),
+    )
+
+    @staticmethod
+    def genre_links(title_ids):
+        # Тот же JOIN жанров со связующей таблицей, что и в
+        # prefetch_related("genre"), поэтому и порядок жанров тот же.
+        return Genre.objects.filter(titles__in=title_ids).values_list(
+            "titles", "name", "slug"
+        )
+
+    def to_representation(self, rows, links=None):
+        """Строки произведений с жанрами.
+
+        ``links`` - уже прочитанные ``genre_links`` для этих строк;
+        без них жанры читаются отдельным запросом.
+        """
+        rows = list(rows)
+        genres = {row["id"]: [] for row in rows}
+        if links is None and genres:
+            links = self.genre_links(list(genres))
+        for title_id, name, slug in links or ():
+            genres[title_id].append({"name": name, "slug": slug})
+        for row in rows:
+            row["genre"] = genres[row["id"]]
+        return super().to_representation(rows)
+
+
+class FastListMixin:
+    """Отдает список через быстрый сериализатор, если это возможно.
+
+    Быстрый путь выключается настройкой ``API_FAST_LIST`` и не
+    используется с ``?fields=``/``?expand=``: выборочные поля остаются
+    за обычными сериализаторами.
+    """
+
+    fast_list_serializer_class = None
+
+    def use_fast_list(self, request):
+        return (
+            settings.API_FAST_LIST
+            and self.fast_list_serializer_class is not None
+            and FIELDS_PARAM not in request.query_params
+            and EXPAND_PARAM not in request.query_params
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list(request):
+            return super().list(request, *args, **kwargs)
+        serializer = self.fast_list_serializer_class()
+        queryset = serializer.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(queryset))
@@ -0,0 +1,95 @@
+"""Выборочные поля ответа: ``?fields=`` и ``?expand=``.
+
+``fields`` - список полей через запятую; остальные поля не попадают
+в ответ и не читаются из базы. Связи из ``Meta.expandable``
+сериализатора по умолчанию отдаются вложенными объектами, как раньше,
+но если указан ``fields``, то только слагами; ``expand`` перечисляет
+связи, которые нужно вложить объектами.
+
+Параметры действуют только на безопасные запросы: при записи набор
+полей сериализатора не меняется.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def requested_names(request, param):
+    """Множество имен из параметра запроса или None, если его нет."""
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def is_sparse(request):
+    return request is not None and request.method in SAFE_METHODS
+
+
+class SparseFieldsetMixin:
+    """Убирает из сериализатора поля, не перечисленные в ``?fields=``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if not is_sparse(request):
+            return
+        fields = requested_names(request, FIELDS_PARAM)
+        expand = requested_names(request, EXPAND_PARAM)
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+        expandable = getattr(self.Meta, "expandable", {})
+        if expand is None:
+            expand = set() if fields is not None else set(expandable)
+        for name, slug_field in expandable.items():
+            if name in self.fields and name not in expand:
+                self.fields[name] = serializers.SlugRelatedField(
+                    slug_field=slug_field,
+                    many=self.Meta.model._meta.get_field(name).many_to_many,
+                    read_only=True,
+                )
+
+
+class SparseQuerysetMixin:
+    """Сужает queryset вьюсета до полей из ``?fields=``.
+
+    ``sparse_only`` сопоставляет полю сериализатора поля модели для
+    ``.only()``, ``sparse_select`` и ``sparse_prefetch`` - связи, которые
+    нужны только этому полю. ``sparse_always`` читается всегда: первичный
+    ключ и поля, по которым строится курсор пагинации.
+    """
+
+    sparse_always = ("id",)
+    sparse_only = {}
+    sparse_select = {}
+    sparse_prefetch = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not is_sparse(self.request):
+            return queryset
+        fields = requested_names(self.request, FIELDS_PARAM)
+        if fields is None:
+            return queryset
+        only = set(self.sparse_always)
+        for name in fields:
+            only.update(self.sparse_only.get(name, ()))
+        selected = [
+            relation
+            for name, relation in self.sparse_select.items()
+            if name in fields
+        ]
+        prefetched = [
+            relation
+            for name, relation in self.sparse_prefetch.items()
+            if name in fields
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if selected:
+            queryset = queryset.select_related(*selected)
+        if prefetched:
+            queryset = queryset.prefetch_related(*prefetched)
+        return queryset.only(*only)
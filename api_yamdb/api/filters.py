@@ -1,21 +1,70 @@
-from django_filters import rest_framework, utils
+from django.db.models import Count
+from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
+from reviews.models import Title, TitleGenre
+from reviews.search import search_titles
 
 
-class IsOwnerFilterBackend(rest_framework.DjangoFilterBackend):
-    def filter_queryset(self, request, queryset, view):
-        if request.query_params.get("genre"):
-            queryset = queryset.filter(
-                genre__slug=request.query_params["genre"]
-            )
-            return queryset
-        if request.query_params.get("category"):
-            queryset = queryset.filter(
-                category__slug=request.query_params["category"]
+class SlugInFilter(filters.BaseInFilter, filters.CharFilter):
+    pass
+
+
+class TitleFilter(filters.FilterSet):
+    """Фильтры списка произведений; все условия объединяются через И.
+
+    ``genre`` принимает слаги через запятую: при ``genre_mode=any``
+    (по умолчанию) подходит произведение хотя бы с одним из жанров, при
+    ``genre_mode=all`` - со всеми сразу. Условия по жанрам проверяются
+    подзапросом к ``TitleGenre``, поэтому строки не размножаются и
+    ``distinct()`` не нужен.
+    """
+
+    GENRE_MODES = (("any", "any"), ("all", "all"))
+
+    genre = SlugInFilter(method="filter_genre")
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODES, method="filter_genre_mode"
+    )
+    category = filters.CharFilter(field_name="category__slug")
+    year = filters.NumberFilter(field_name="year")
+    year_min = filters.NumberFilter(field_name="year", lookup_expr="gte")
+    year_max = filters.NumberFilter(field_name="year", lookup_expr="lte")
+    name = filters.CharFilter(field_name="name", lookup_expr="istartswith")
+
+    class Meta:
+        model = Title
+        fields = (
+            "genre",
+            "genre_mode",
+            "category",
+            "year",
+            "year_min",
+            "year_max",
+            "name",
+        )
+
+    def filter_genre(self, queryset, name, value):
+        slugs = set(value)
+        matches = TitleGenre.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get("genre_mode") == "all":
+            matches = (
+                matches.values("title_id")
+                .annotate(genres=Count("genre_id"))
+                .filter(genres=len(slugs))
             )
+        return queryset.filter(pk__in=matches.values("title_id"))
+
+    def filter_genre_mode(self, queryset, name, value):
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск ``?q=`` с сортировкой по релевантности."""
+
+    search_param = "q"
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "").strip()
+        if not text:
             return queryset
-        filterset = self.get_filterset(request, queryset, view)
-        if filterset is None:
-            return queryset
-        if not filterset.is_valid() and self.raise_exception:
-            raise utils.translate_validation(filterset.errors)
-        return filterset.qs
+        return search_titles(queryset, text)
@@ -0,0 +1,70 @@
+import glob
+import os
+import pstats
+import sys
+
+from api.profiling import collapse, route_of
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Собирает профили .pstats в collapsed stacks (строки "
+        "«стек микросекунды») для flamegraph.pl или speedscope."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Файлы профилей; по умолчанию все из PROFILE_DIR.",
+        )
+        parser.add_argument(
+            "--route",
+            action="append",
+            help="Только профили маршрута, например TitleViewSet.list.",
+        )
+        parser.add_argument(
+            "--min-us",
+            type=float,
+            default=1,
+            help="Отбросить стеки короче этого числа микросекунд.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для результата; по умолчанию stdout."
+        )
+
+    def profile_paths(self, options):
+        paths = options["paths"]
+        if not paths:
+            if not settings.PROFILE_DIR:
+                raise CommandError("Укажите файлы или задайте PROFILE_DIR.")
+            paths = sorted(
+                glob.glob(os.path.join(settings.PROFILE_DIR, "*.pstats"))
+            )
+        routes = options["route"]
+        if routes:
+            return [path for path in paths if route_of(path) in routes]
+        return paths
+
+    def handle(self, *args, **options):
+        stacks = {}
+        paths = self.profile_paths(options)
+        for path in paths:
+            # Маршрут - нижний кадр стека: flame graph делится по нему.
+            profile = collapse(
+                pstats.Stats(path).stats, route_of(path), options["min_us"]
+            )
+            for stack, micros in profile.items():
+                stacks[stack] = stacks.get(stack, 0) + micros
+        lines = [
+            f"{stack} {round(micros)}\n"
+            for stack, micros in sorted(stacks.items())
+        ]
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
+        self.stderr.write(f"Профилей: {len(paths)}, стеков: {len(lines)}")
@@ -0,0 +1,15 @@
+from api.profiling import HEADER, make_header_value
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Печатает подписанный заголовок X-Profile; он действует "
+        "PROFILE_HEADER_MAX_AGE секунд."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{HEADER}: {make_header_value()}")
+        if not settings.PROFILE_DIR:
+            self.stderr.write("PROFILE_DIR не задан: профили не пишутся.")
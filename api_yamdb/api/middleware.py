@@ -0,0 +1,59 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("api.queries")
+
+
+class QueryCounter:
+    """Обертка над выполнением SQL, считающая запросы и время в БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryCountMiddleware:
+    """Считает SQL-запросы и время в БД для каждого запроса к API.
+
+    Результат сохраняется в ``request.query_count`` и
+    ``request.query_time``, отдается в заголовках ответа и пишется
+    в лог ``api.queries``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.add_headers = getattr(settings, "QUERY_COUNT_HEADERS", True)
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(counter)
+                )
+            response = self.get_response(request)
+        request.query_count = counter.count
+        request.query_time = counter.duration
+        if self.add_headers:
+            response["X-DB-Query-Count"] = str(counter.count)
+            response["X-DB-Time-Ms"] = f"{counter.duration * 1000:.2f}"
+        logger.debug(
+            "%s %s: %d queries, %.2f ms",
+            request.method,
+            request.path,
+            counter.count,
+            counter.duration * 1000,
+        )
+        return response
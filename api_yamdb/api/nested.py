@@ -0,0 +1,33 @@
+"""Родительские объекты вложенных маршрутов отзывов и комментариев.
+
+Вьюсет описывает в ``get_parent_queryset`` один запрос, который по
+``title_id`` и ``review_id`` из адреса находит родителя (и все, что о
+нем нужно знать, через ``select_related`` и аннотации). ``get_parent``
+выполняет его при первом вызове и запоминает результат на запросе,
+поэтому ``get_queryset``, проверка в сериализаторе и ``perform_create``
+не ходят в базу за родителем повторно.
+"""
+from django.shortcuts import get_object_or_404
+
+PARENTS_ATTR = "nested_parents"
+
+
+class NestedParentMixin:
+    parent_url_kwargs = ()
+
+    def get_parent_queryset(self):
+        raise NotImplementedError
+
+    def get_parent(self):
+        """Родитель из адреса запроса; 404, если его нет."""
+        parents = getattr(self.request, PARENTS_ATTR, None)
+        if parents is None:
+            parents = {}
+            setattr(self.request, PARENTS_ATTR, parents)
+        key = (
+            type(self),
+            tuple(self.kwargs[name] for name in self.parent_url_kwargs),
+        )
+        if key not in parents:
+            parents[key] = get_object_or_404(self.get_parent_queryset())
+        return parents[key]
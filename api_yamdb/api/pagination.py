@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация по дате публикации для длинных лент.
+
+    Страница выбирается условием по ``pub_date`` вместо OFFSET и
+    без ``COUNT(*)``, поэтому глубокие страницы стоят столько же,
+    сколько первая. ``id`` делает порядок стабильным при одинаковых
+    датах.
+    """
+
+    ordering = ("-pub_date", "-id")
+
+
+class RankingCursorPagination(CursorPagination):
+    """Курсорная пагинация списка лучших в порядке (-score, title).
+
+    Курсор DRF хранит только ``score``, а равные оценки пропускает
+    смещением.
+    """
+
+    ordering = ("-score", "title_id")
@@ -0,0 +1,187 @@
+"""Профилирование отдельных запросов к API через cProfile.
+
+Запрос профилируется, если в нем есть заголовок ``X-Profile`` с
+подписью из ``python manage.py profile_header`` или если он попал в
+долю ``PROFILE_SAMPLE_RATE``. Профиль сохраняется в ``PROFILE_DIR``
+файлом ``.pstats``, в имени которого - представление и действие, число
+SQL-запросов и время ответа; ``python manage.py aggregate_profiles``
+собирает такие файлы в collapsed stacks для flame graph.
+
+В процессе одновременно профилируется не больше одного запроса:
+остальные в это время выполняются без профилировщика.
+"""
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+from metrics.http import view_labels
+
+HEADER = "X-Profile"
+META_HEADER = "HTTP_X_PROFILE"
+SIGNING_SALT = "api.profiling"
+SIGNED_VALUE = "profile"
+SEPARATOR = "__"
+
+_active = threading.Lock()
+
+
+def make_header_value():
+    """Значение ``X-Profile``, действительное ``PROFILE_HEADER_MAX_AGE``."""
+    return TimestampSigner(salt=SIGNING_SALT).sign(SIGNED_VALUE)
+
+
+def has_valid_signature(value):
+    try:
+        signed = TimestampSigner(salt=SIGNING_SALT).unsign(
+            value, max_age=settings.PROFILE_HEADER_MAX_AGE
+        )
+    except BadSignature:
+        return False
+    return signed == SIGNED_VALUE
+
+
+def profile_name(route, query_count, duration):
+    """Имя файла: маршрут, число запросов, время в мс, момент и pid."""
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    route = re.sub(r"[^\w.-]", "_", route)
+    return SEPARATOR.join(
+        (
+            route,
+            f"q{query_count}",
+            f"{round(duration * 1000)}ms",
+            f"{stamp}-{os.getpid()}.pstats",
+        )
+    )
+
+
+def route_of(name):
+    return os.path.basename(name).split(SEPARATOR, 1)[0]
+
+
+class ProfilingMiddleware:
+    """Профилирует выбранные запросы и пишет ``X-Profile-Id``.
+
+    Стоит в ``MIDDLEWARE`` до ``QueryCountMiddleware``: к концу запроса
+    число SQL-запросов уже известно.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def wants_profile(self, request):
+        if not settings.PROFILE_DIR or not request.path.startswith(
+            settings.PROFILE_PATH_PREFIX
+        ):
+            return False
+        value = request.META.get(META_HEADER)
+        if value is not None:
+            return has_valid_signature(value)
+        return random.random() < settings.PROFILE_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.wants_profile(request) or not _active.acquire(False):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        try:
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+            duration = time.perf_counter() - started
+        finally:
+            _active.release()
+        response[f"{HEADER}-Id"] = self.save(profile, request, duration)
+        return response
+
+    def save(self, profile, request, duration):
+        view, action = view_labels(
+            getattr(request, "resolver_match", None), request.method
+        )
+        name = profile_name(
+            f"{view}.{action}",
+            getattr(request, "query_count", 0),
+            duration,
+        )
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        profile.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+        return name
+
+
+def frame_name(function):
+    """``модуль/файл.py:строка(функция)`` без префикса site-packages."""
+    filename, line, name = function
+    if filename == "~":
+        return name.replace(";", ",")
+    for marker in ("site-packages/", f"{settings.BASE_DIR}/"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{filename}:{line}({name})".replace(";", ",")
+
+
+def call_graph(stats):
+    """Дети каждой функции со временем ребра и корни с долей вызовов."""
+    children = {}
+    roots = []
+    for function, (primitive, calls, _, _, callers) in stats.items():
+        # Вызовы из кадра, в котором включили профилировщик, в профиль
+        # не попали: такие функции - корни стеков.
+        inner_calls = sum(
+            edge[0] for caller, edge in callers.items() if caller in stats
+        )
+        if calls > inner_calls:
+            roots.append((function, min(1, (calls - inner_calls) / primitive)))
+        for caller, edge in callers.items():
+            children.setdefault(caller, {})[function] = edge[3]
+    return children, roots
+
+
+def collapse(stats, root, min_us=1):
+    """Collapsed stacks профиля: ``{"root;a;b": микросекунды}``.
+
+    cProfile хранит только пары вызывающий - вызываемый, поэтому стеки
+    восстанавливаются из них приближенно: вызовы функции делятся между
+    путями к ней пропорционально времени ребер. Время рекурсивных
+    вызовов (так устроены вложенные middleware) учитывается один раз:
+    из ребра вычитается то, что ребенок тратит на вызовы функций, уже
+    стоящих в стеке. Пути короче ``min_us`` отбрасываются.
+    """
+    children, roots = call_graph(stats)
+
+    def edges(function, share, seen):
+        for child, edge in children.get(function, {}).items():
+            if child in seen or not stats[child][3]:
+                continue
+            back = sum(
+                time
+                for grandchild, time in children.get(child, {}).items()
+                if grandchild in seen or grandchild == child
+            )
+            yield child, edge * share / stats[child][3], (edge - back) * share
+
+    def walk(function, path, share, budget, seen, stacks):
+        name = f"{path};{frame_name(function)}"
+        own = min(stats[function][2] * share, budget)
+        if own * 1e6 >= min_us:
+            stacks[name] = stacks.get(name, 0) + own * 1e6
+        calls = list(edges(function, share, seen))
+        spent = sum(max(0, weight) for _, _, weight in calls)
+        scale = min(1, (budget - own) / spent) if spent else 0
+        for child, child_share, weight in calls:
+            weight *= scale
+            if weight * 1e6 >= min_us:
+                walk(child, name, child_share, weight, seen | {child}, stacks)
+
+    stacks = {}
+    for function, share in roots:
+        budget = stats[function][3] * share
+        walk(function, root, share, budget, {function}, stacks)
+    return stacks
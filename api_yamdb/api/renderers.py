@@ -0,0 +1,35 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from reviews.exports import csv_lines
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Рендерер для ``?format=ndjson``.
+
+    Выгрузки отдаются через ``StreamingHttpResponse`` в обход
+    рендеринга, поэтому сюда попадают только ответы об ошибках.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode()
+
+
+class CSVRenderer(BaseRenderer):
+    """Рендерер для ``?format=csv``; ошибка выводится строкой таблицы."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        values = [str(value) for value in data.values()]
+        return "".join(csv_lines(list(data), [values])).encode()
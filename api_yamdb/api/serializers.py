@@ -1,7 +1,13 @@
-from django.db.models import Avg
+from api.batch import METHODS, resolve_route
+from api.fieldsets import SparseFieldsetMixin
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.importers import parse_genres
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleRanking, TitleScoreDistribution)
 from users.models import User
 
 ROLE_CHOICES = [
@@ -11,42 +17,82 @@ ROLE_CHOICES = [
 ]
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         fields = ("name", "slug")
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         fields = ("name", "slug")
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
-    rating = serializers.SerializerMethodField()
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = "__all__"
+        fields = (
+            "id",
+            "category",
+            "genre",
+            "rating",
+            "name",
+            "description",
+            "year",
+        )
         model = Title
+        # Связи, которые без ?expand= при заданном ?fields= отдаются слагами.
+        expandable = {"category": "slug", "genre": "slug"}
 
-    def get_rating(self, instance):
-        return instance.reviews.aggregate(Avg("score"))["score__avg"]
-
+    @transaction.atomic
     def create(self, validated_data):
-        genres = self.initial_data.getlist("genre")
-        categoryes = self.initial_data.get("category")
+        data = self.initial_data
+        # Форма передает жанры повторяющимся полем, JSON - списком.
+        genres = (
+            data.getlist("genre")
+            if hasattr(data, "getlist")
+            else parse_genres(data.get("genre"))
+        )
+        categoryes = data.get("category")
         category = get_object_or_404(Category, slug=categoryes)
+        genre_objs = list(Genre.objects.filter(slug__in=genres))
+        if len(genre_objs) != len(set(genres)):
+            raise Http404("Жанр не найден.")
         title = Title.objects.create(**validated_data, category=category)
-        for genre in genres:
-            current_genre = get_object_or_404(Genre, slug=genre)
-            TitleGenre.objects.create(genre=current_genre, title=title)
+        TitleGenre.objects.bulk_create(
+            TitleGenre(genre=genre, title=title) for genre in genre_objs
+        )
         return title
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class TitleRankingSerializer(serializers.ModelSerializer):
+    title = TitleSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = ("score", "review_count", "title")
+
+
+class ScoreDistributionSerializer(serializers.ModelSerializer):
+    count = serializers.SerializerMethodField()
+    scores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleScoreDistribution
+        fields = ("title", "count", "scores")
+
+    def get_count(self, obj):
+        return sum(obj.scores.values())
+
+    def get_scores(self, obj):
+        return {str(score): value for score, value in obj.scores.items()}
+
+
+class ReviewsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field="username"
     )
@@ -56,20 +102,18 @@ class ReviewsSerializer(serializers.ModelSerializer):
         model = Review
 
     def validate(self, data):
-        user_obj = self.context["request"].user
         my_view = self.context["view"]
-        title_id = my_view.kwargs.get("title_id")
-        pk_id = my_view.kwargs.get("pk")
-        if pk_id:
+        if my_view.kwargs.get("pk"):
             return data
-        if Review.objects.filter(title=title_id, author=user_obj).exists():
+        # Аннотацию reviewed добавляет ReviewsViewSet.get_parent_queryset.
+        if my_view.get_parent().reviewed:
             raise serializers.ValidationError(
                 "Вы уже писали отзыв к этому произведению."
             )
         return data
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field="username"
     )
@@ -113,7 +157,7 @@ class UserSerializer(serializers.ModelSerializer):
         return username
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class UsersSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     token = serializers.CharField(max_length=255, read_only=True)
     role = serializers.ChoiceField(choices=ROLE_CHOICES, default="user")
     username = serializers.RegexField(
@@ -156,3 +200,46 @@ class UserTokenSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ("username", "confirmation_code")
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    title = serializers.IntegerField(required=False, min_value=1)
+    author = serializers.CharField(required=False, max_length=150)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=64)
+    method = serializers.CharField(default="GET")
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(
+        child=serializers.CharField(), required=False
+    )
+
+    def validate_method(self, value):
+        if value.upper() not in METHODS:
+            raise serializers.ValidationError(
+                f"Метод должен быть одним из: {', '.join(METHODS)}."
+            )
+        return value.upper()
+
+    def validate_path(self, value):
+        if resolve_route(value) is None:
+            raise serializers.ValidationError(
+                "Путь не относится к маршрутам API."
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchOperationSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"Не больше {settings.BATCH_MAX_REQUESTS} запросов в пачке."
+            )
+        return value
@@ -0,0 +1,92 @@
+from api.authentication import forget_user
+from api.cache import (AUTHORS_NAMESPACE, CATALOG_NAMESPACE, RATINGS_NAMESPACE,
+                       TAXONOMY_NAMESPACE, USERS_NAMESPACE, bump_version,
+                       comments_namespace, object_namespace, reviews_namespace)
+from django.db.models.signals import post_delete, post_save
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.signals import ratings_recounted, titles_imported
+from users.models import User
+
+CATALOG_MODELS = (Title, TitleGenre, Category, Genre, Review)
+# Поле, по которому объект ищется в адресе API.
+OBJECT_LOOKUPS = {
+    Title: "pk",
+    Category: "slug",
+    Genre: "slug",
+    Review: "pk",
+    Comment: "pk",
+    User: "username",
+}
+
+
+def invalidate_catalog(sender, using=None, **kwargs):
+    bump_version(CATALOG_NAMESPACE, using=using)
+
+
+def invalidate_object(sender, instance, using=None, **kwargs):
+    lookup = getattr(instance, OBJECT_LOOKUPS[sender])
+    bump_version(object_namespace(sender, lookup), using=using)
+
+
+def title_ids(instance):
+    """Произведение объекта и прежнее, если отзыв к нему перенесли."""
+    loaded = getattr(instance, "_loaded_title_id", None)
+    return {instance.title_id, loaded} - {None}
+
+
+def invalidate_title(sender, instance, using=None, **kwargs):
+    # Рейтинг и жанры произведения меняются без сохранения Title.
+    for title_id in title_ids(instance):
+        bump_version(object_namespace(Title, title_id), using=using)
+
+
+def invalidate_ratings(sender, using=None, **kwargs):
+    bump_version(RATINGS_NAMESPACE, using=using)
+
+
+def invalidate_taxonomy(sender, using=None, **kwargs):
+    bump_version(TAXONOMY_NAMESPACE, using=using)
+
+
+def invalidate_reviews(sender, instance, using=None, **kwargs):
+    titles = title_ids(instance)
+    for title_id in titles:
+        bump_version(reviews_namespace(title_id), using=using)
+    if len(titles) > 1:
+        # Комментарии отзыва теперь по адресу другого произведения.
+        bump_version(comments_namespace(instance.pk), using=using)
+
+
+def invalidate_comments(sender, instance, using=None, **kwargs):
+    bump_version(comments_namespace(instance.reviews_id), using=using)
+
+
+def invalidate_users(sender, instance, using=None, created=False, **kwargs):
+    forget_user(instance.pk, using=using)
+    bump_version(USERS_NAMESPACE, using=using)
+    loaded = getattr(instance, "_loaded_username", None)
+    if created or loaded == instance.username:
+        return
+    # Пользователь переименован: старый адрес и имя автора в отзывах и
+    # комментариях больше не действительны.
+    if loaded is not None:
+        bump_version(object_namespace(User, loaded), using=using)
+    bump_version(AUTHORS_NAMESPACE, using=using)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog, sender=model)
+    post_delete.connect(invalidate_catalog, sender=model)
+titles_imported.connect(invalidate_catalog, sender=Title)
+ratings_recounted.connect(invalidate_catalog, sender=Title)
+ratings_recounted.connect(invalidate_ratings, sender=Title)
+for signal in (post_save, post_delete):
+    for model in OBJECT_LOOKUPS:
+        signal.connect(invalidate_object, sender=model)
+    signal.connect(invalidate_title, sender=Review)
+    signal.connect(invalidate_title, sender=TitleGenre)
+    signal.connect(invalidate_taxonomy, sender=Category)
+    signal.connect(invalidate_taxonomy, sender=Genre)
+    signal.connect(invalidate_reviews, sender=Review)
+    signal.connect(invalidate_comments, sender=Comment)
+    signal.connect(invalidate_users, sender=User)
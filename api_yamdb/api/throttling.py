@@ -0,0 +1,167 @@
+"""Ограничение частоты запросов алгоритмом token bucket.
+
+Ведро на ключ (IP или username) вмещает столько жетонов, сколько
+запросов разрешает ставка ``"10/min"``, и пополняется равномерно:
+10 жетонов в минуту. Запрос забирает один жетон, поэтому серия до
+емкости ведра проходит сразу, а дальше - с частотой пополнения.
+
+Ведра хранятся в памяти процесса (не больше ``THROTTLE_MAX_KEYS``
+ключей на ставку, давно не использованные вытесняются). Если задан
+``THROTTLE_CACHE``, они хранятся в этом кэше и общие для всех
+процессов; чтение и запись ведра там не атомарны, поэтому при гонке
+процессы могут пропустить лишний запрос.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """``"10/min"`` -> (емкость 10, пополнение 10 / 60 жетонов в секунду)."""
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def refill(state, capacity, rate, now):
+    """Жетоны ведра к моменту ``now``; ``state`` - (жетоны, время)."""
+    if state is None:
+        return capacity
+    tokens, updated = state
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class TokenBucket:
+    """Ведра в памяти процесса."""
+
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key):
+        """Забирает жетон; возвращает (разрешено, секунд до жетона)."""
+        now = time.monotonic()
+        with self.lock:
+            tokens = refill(
+                self.states.pop(key, None), self.capacity, self.rate, now
+            )
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.states[key] = (tokens, now)
+            if len(self.states) > self.max_keys:
+                self.states.popitem(last=False)
+        return allowed, 0 if allowed else (1 - tokens) / self.rate
+
+
+class CacheTokenBucket:
+    """Ведра в кэше Django, общие для всех процессов."""
+
+    def __init__(self, capacity, rate, cache_alias, prefix):
+        self.capacity = capacity
+        self.rate = rate
+        self.cache = caches[cache_alias]
+        self.prefix = prefix
+        # Полное ведро хранить незачем: ключ живет, пока оно наполняется.
+        self.timeout = max(1, int(capacity / rate) + 1)
+
+    def consume(self, key):
+        now = time.time()
+        cache_key = f"throttle:{self.prefix}:{key}"
+        tokens = refill(
+            self.cache.get(cache_key), self.capacity, self.rate, now
+        )
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.cache.set(cache_key, (tokens, now), self.timeout)
+        return allowed, 0 if allowed else (1 - tokens) / self.rate
+
+
+def get_bucket(scope, rate):
+    cache_alias = settings.THROTTLE_CACHE
+    key = (scope, rate, cache_alias)
+    with _buckets_lock:
+        if key not in _buckets:
+            capacity, per_second = parse_rate(rate)
+            if cache_alias:
+                _buckets[key] = CacheTokenBucket(
+                    capacity, per_second, cache_alias, scope
+                )
+            else:
+                _buckets[key] = TokenBucket(
+                    capacity, per_second, settings.THROTTLE_MAX_KEYS
+                )
+        return _buckets[key]
+
+
+def reset_buckets():
+    """Забывает состояние ведер процесса (для тестов и бенчмарков)."""
+    with _buckets_lock:
+        _buckets.clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение по ``throttle_scope`` представления.
+
+    Ставка берется из ``DEFAULT_THROTTLE_RATES`` по имени
+    ``<scope>_<suffix>``; представления без ``throttle_scope`` или без
+    ставки не ограничиваются.
+    """
+
+    suffix = None
+    retry_after = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope is None:
+            return True
+        name = f"{scope}_{self.suffix}"
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(name)
+        key = self.get_key(request)
+        if rate is None or key is None:
+            return True
+        allowed, self.retry_after = get_bucket(name, rate).consume(key)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    suffix = "ip"
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Ведро на username из тела запроса, с какого бы IP он ни пришел."""
+
+    suffix = "username"
+
+    def get_key(self, request):
+        if not isinstance(request.data, Mapping):
+            # Тело-список отклонит сериализатор представления.
+            return None
+        username = request.data.get("username")
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
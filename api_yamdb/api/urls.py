@@ -1,6 +1,6 @@
-from api.views import (CategoryViewSet, CommentsViewSet, GenreViewSet,
-                       RegistrationAPIView, ReviewsViewSet, TitleViewSet,
-                       UsersModelViewSet, UserTokenView)
+from api.views import (BatchView, CategoryViewSet, CommentsViewSet, ExportView,
+                       GenreViewSet, RegistrationAPIView, ReviewsViewSet,
+                       TitleViewSet, UsersModelViewSet, UserTokenView)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -23,7 +23,14 @@ auth_urlpatterns = [
     path("token/", UserTokenView.as_view()),
 ]
 
+export_urlpatterns = [
+    path("reviews/", ExportView.as_view(kind="reviews")),
+    path("comments/", ExportView.as_view(kind="comments")),
+]
+
 urlpatterns = [
     path("v1/", include(router_v1.urls)),
     path("v1/auth/", include(auth_urlpatterns)),
+    path("v1/export/", include(export_urlpatterns)),
+    path("v1/batch/", BatchView.as_view()),
 ]
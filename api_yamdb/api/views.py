@@ -1,13 +1,29 @@
-from api.filters import IsOwnerFilterBackend
+from api.batch import run_batch
+from api.cache import (AUTHORS_NAMESPACE, RATINGS_NAMESPACE,
+                       TAXONOMY_NAMESPACE, USERS_NAMESPACE, CachedListMixin,
+                       CachedRetrieveMixin, comments_namespace,
+                       reviews_namespace)
+from api.conditional import ConditionalRequestMixin
+from api.fastpath import (FastCommentsSerializer, FastListMixin,
+                          FastReviewsSerializer, FastTitleSerializer)
+from api.fieldsets import SparseQuerysetMixin
+from api.filters import TitleFilter, TitleSearchFilter
+from api.nested import NestedParentMixin
+from api.pagination import PubDateCursorPagination, RankingCursorPagination
 from api.permissions import (IsAdmin, IsAdminOrReadOnly, IsOwnerOrReadOnly,
                              IsSelf)
-from api.serializers import (CategorySerializer, CommentsSerializer,
+from api.renderers import CSVRenderer, NDJSONRenderer
+from api.serializers import (BatchSerializer, CategorySerializer,
+                             CommentsSerializer, ExportQuerySerializer,
                              GenreSerializer, ReviewsSerializer,
-                             TitleSerializer, UserSerializer, UsersSerializer,
+                             ScoreDistributionSerializer,
+                             TitleRankingSerializer, TitleSerializer,
+                             UserSerializer, UsersSerializer,
                              UserTokenSerializer)
-from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters import rest_framework
 from rest_framework import exceptions, filters, permissions, status, viewsets
@@ -18,11 +34,17 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Title
+from reviews.exports import CONTENT_TYPES, export
+from reviews.importers import TitleImporter
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleRanking, TitleScoreDistribution)
+from users.mail import enqueue_mail
 from users.models import User
 
 
 class ListCreateViewSet(
+    ConditionalRequestMixin,
+    CachedListMixin,
     ListModelMixin,
     CreateModelMixin,
     viewsets.GenericViewSet,
@@ -31,17 +53,103 @@ class ListCreateViewSet(
     pass
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(
+    SparseQuerysetMixin,
+    ConditionalRequestMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = (
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
+        .order_by("id")
+    )
     serializer_class = TitleSerializer
+    fast_list_serializer_class = FastTitleSerializer
+    etag_model = Title
+    object_etag_namespaces = (TAXONOMY_NAMESPACE, RATINGS_NAMESPACE)
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [IsOwnerFilterBackend]
-    filterset_fields = (
-        "genre",
-        "category",
-        "year",
-        "name",
+    filter_backends = [rest_framework.DjangoFilterBackend, TitleSearchFilter]
+    filterset_class = TitleFilter
+    sparse_only = {
+        "name": ("name",),
+        "description": ("description",),
+        "year": ("year",),
+        "rating": ("rating",),
+        "category": ("category__name", "category__slug"),
+    }
+    sparse_select = {"category": "category"}
+    sparse_prefetch = {"genre": "genre"}
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAdmin],
+        url_path="bulk",
     )
+    def bulk(self, request):
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get("titles")
+        if not isinstance(rows, list) or not all(
+            isinstance(row, dict) for row in rows
+        ):
+            raise exceptions.ParseError("Ожидается список произведений.")
+        report = TitleImporter().run(rows)
+        return Response(
+            report,
+            status=status.HTTP_201_CREATED
+            if report["created"]
+            else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=["get"])
+    def top(self, request):
+        """Лучшие произведения по байесовской оценке.
+
+        Фильтры ``category`` и ``genre`` принимают слаги. Страницы
+        курсорные по ``score``; при равных оценках позиция внутри них
+        задается смещением, порядок стабилен благодаря ``title``.
+        """
+        return self.cached_response(self.list_top, request)
+
+    def list_top(self, request):
+        rankings = TitleRanking.objects.filter(
+            review_count__gt=0
+        ).select_related("title__category").prefetch_related("title__genre")
+        category = request.query_params.get("category")
+        if category:
+            rankings = rankings.filter(title__category__slug=category)
+        genre = request.query_params.get("genre")
+        if genre:
+            rankings = rankings.filter(
+                title_id__in=TitleGenre.objects.filter(
+                    genre__slug=genre
+                ).values("title_id")
+            )
+        paginator = RankingCursorPagination()
+        page = paginator.paginate_queryset(rankings, request, view=self)
+        serializer = TitleRankingSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], url_path="score-distribution")
+    def score_distribution(self, request, pk=None):
+        try:
+            distribution = TitleScoreDistribution.objects.filter(
+                title_id=pk
+            ).first()
+        except (TypeError, ValueError):
+            # Как get_object_or_404 в DRF: нечисловой ключ - это 404.
+            raise Http404
+        if distribution is None:
+            # Отзывов еще не было: строка гистограммы не создана.
+            title = get_object_or_404(Title.objects.only("pk"), pk=pk)
+            distribution = TitleScoreDistribution(title=title)
+        return Response(ScoreDistributionSerializer(distribution).data)
 
     def perform_update(self, serializer):
         category = self.request.data.get("category")
@@ -52,6 +160,7 @@ class TitleViewSet(viewsets.ModelViewSet):
 class CategoryViewSet(ListCreateViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    etag_model = Category
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [
         rest_framework.DjangoFilterBackend,
@@ -68,6 +177,7 @@ class CategoryViewSet(ListCreateViewSet):
 class GenreViewSet(ListCreateViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    etag_model = Genre
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [
         rest_framework.DjangoFilterBackend,
@@ -81,49 +191,151 @@ class GenreViewSet(ListCreateViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(
+    NestedParentMixin,
+    SparseQuerysetMixin,
+    ConditionalRequestMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """Класс представление модели Review."""
 
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = ReviewsSerializer
+    fast_list_serializer_class = FastReviewsSerializer
+    pagination_class = PubDateCursorPagination
+    etag_model = Review
+    object_etag_namespaces = (AUTHORS_NAMESPACE,)
+    parent_url_kwargs = ("title_id",)
+    sparse_always = ("id", "pub_date")
+    sparse_only = {
+        "text": ("text",),
+        "score": ("score",),
+        "author": ("author__username",),
+    }
+    sparse_select = {"author": "author"}
+
+    def get_etag_namespaces(self):
+        return (reviews_namespace(self.url_id("title_id")), AUTHORS_NAMESPACE)
+
+    def get_parent_queryset(self):
+        queryset = Title.objects.filter(pk=self.kwargs["title_id"])
+        if self.action != "create":
+            return queryset
+        # Повторный отзыв проверяется в том же запросе, что и
+        # произведение: см. ReviewsSerializer.validate.
+        return queryset.annotate(
+            reviewed=Exists(
+                Review.objects.filter(
+                    title=OuterRef("pk"), author=self.request.user
+                )
+            )
+        )
 
     def get_queryset(self):
-        title_id = self.kwargs.get("title_id")
-        title_obj = get_object_or_404(Title, id=title_id)
-        return title_obj.reviews.all()
+        return self.get_parent().reviews.select_related("author")
 
     def perform_create(self, serializer):
-        title_obj = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        serializer.save(title=title_obj, author=self.request.user)
+        serializer.save(title=self.get_parent(), author=self.request.user)
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(
+    NestedParentMixin,
+    SparseQuerysetMixin,
+    ConditionalRequestMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """Класс представление модели Comment."""
 
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = CommentsSerializer
+    fast_list_serializer_class = FastCommentsSerializer
+    pagination_class = PubDateCursorPagination
+    etag_model = Comment
+    object_etag_namespaces = (AUTHORS_NAMESPACE,)
+    parent_url_kwargs = ("title_id", "review_id")
+    sparse_always = ("id", "pub_date")
+    sparse_only = {
+        "text": ("text",),
+        "author": ("author__username",),
+    }
+    sparse_select = {"author": "author"}
+
+    def get_etag_namespaces(self):
+        return (
+            comments_namespace(self.url_id("review_id")),
+            AUTHORS_NAMESPACE,
+        )
 
-    def get_queryset(self):
-        title_obj = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        reviews_obj = title_obj.reviews.all()
-        review_obj = get_object_or_404(
-            reviews_obj, id=self.kwargs.get("review_id")
+    def get_parent_queryset(self):
+        return Review.objects.select_related("title").filter(
+            pk=self.kwargs["review_id"], title_id=self.kwargs["title_id"]
         )
-        return review_obj.comments.all()
+
+    def get_queryset(self):
+        return self.get_parent().comments.select_related("author")
 
     def perform_create(self, serializer):
-        title_obj = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        reviews_obj = title_obj.reviews.all()
-        review_obj = get_object_or_404(
-            reviews_obj, id=self.kwargs.get("review_id")
+        serializer.save(reviews=self.get_parent(), author=self.request.user)
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка отзывов или комментариев для аналитики.
+
+    Фильтры: ``title``, ``author`` (username), ``since`` и ``until`` по
+    ``pub_date``; формат выбирается через ``?format=ndjson|csv``.
+    """
+
+    kind = None
+    permission_classes = [IsAdmin]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request):
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        file_format = request.accepted_renderer.format
+        response = StreamingHttpResponse(
+            export(self.kind, file_format, **serializer.validated_data),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.kind}.{file_format}"'
+        )
+        return response
+
+
+class BatchView(APIView):
+    """Несколько запросов к API за один HTTP-запрос.
+
+    Права проверяет каждый подзапрос сам; ответ - список результатов
+    в порядке запросов. При откате пачки ``atomic`` возвращается 400.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results, rolled_back = run_batch(
+            request,
+            serializer.validated_data["requests"],
+            atomic=serializer.validated_data["atomic"],
+        )
+        return Response(
+            {"results": results, "rolled_back": rolled_back},
+            status=status.HTTP_400_BAD_REQUEST
+            if rolled_back
+            else status.HTTP_200_OK,
         )
-        serializer.save(reviews=review_obj, author=self.request.user)
 
 
 class RegistrationAPIView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "signup"
     serializer_class = UserSerializer
 
+    @transaction.atomic
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         response_data = {
@@ -134,25 +346,20 @@ class RegistrationAPIView(APIView):
             user_obj = User.objects.get(username=request.data.get("username"))
             if user_obj.email != request.data.get("email"):
                 raise exceptions.ParseError
-            send_mail(
-                "confirmation code",
-                user_obj.confirmation_code,
-                settings.DEFAULT_MAIL,
-                [user_obj.email],
-            )
-            return Response(response_data, status=status.HTTP_200_OK)
-        serializer.is_valid(raise_exception=True)
-        user_obj = serializer.save()
-        send_mail(
-            "confirmation_code",
-            user_obj.confirmation_code,
-            settings.DEFAULT_MAIL,
-            [request.data.get("email")],
+        else:
+            serializer.is_valid(raise_exception=True)
+            user_obj = serializer.save()
+        enqueue_mail(
+            "confirmation code",
+            default_token_generator.make_token(user_obj),
+            user_obj.email,
         )
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class UsersModelViewSet(viewsets.ModelViewSet):
+class UsersModelViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    etag_namespaces = (USERS_NAMESPACE,)
+    etag_model = User
     serializer_class = UsersSerializer
     permission_classes = [IsAdmin]
     http_method_names = ["get", "post", "head", "patch", "delete"]
@@ -187,6 +394,8 @@ class UsersModelViewSet(viewsets.ModelViewSet):
         detail=False, methods=["get", "patch"], permission_classes=[IsSelf]
     )
     def me(self, request):
+        if request.method == "GET":
+            return Response(UsersSerializer(request.user).data)
         serializer = UsersSerializer(
             request.user, data=request.data, partial=True
         )
@@ -197,6 +406,7 @@ class UsersModelViewSet(viewsets.ModelViewSet):
 
 class UserTokenView(APIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = "token"
 
     def post(self, request):
         serializer = UserTokenSerializer(data=request.data)
@@ -1,16 +1,24 @@
 """
 ASGI config for YaMDb project.
 
-It exposes the ASGI callable as a module-level variable named ``application``.
+Django 2.2 не обрабатывает ASGI сам: чтения произведений, отзывов и
+комментариев отдает ``api.async_views.AsyncReadApplication``, остальные
+запросы - WSGI-приложение Django, обернутое ``asgiref.wsgi.WsgiToAsgi``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Запуск::
+
+    gunicorn api_yamdb.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
 
-application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+from api.async_views import AsyncReadApplication  # noqa: E402 isort:skip
+
+application = AsyncReadApplication(WsgiToAsgi(wsgi_application))
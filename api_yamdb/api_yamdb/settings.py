@@ -1,6 +1,7 @@
 import os
 
 import dotenv
+from db.config import replica_databases, split_env
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -34,6 +35,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "metrics.middleware.MetricsMiddleware",
+    "api.profiling.ProfilingMiddleware",
+    "api.middleware.QueryCountMiddleware",
+    "db.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -43,6 +48,38 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Отдавать количество SQL-запросов и время в БД в заголовках ответа.
+QUERY_COUNT_HEADERS = True
+
+# Каталог, куда процессы раз в METRICS_FLUSH_INTERVAL секунд пишут свои
+# метрики для /metrics. Без него /metrics показывает только ответивший
+# процесс. При запуске каталог стоит очищать: файлы завершившихся
+# процессов складываются с остальными, чтобы счетчики не убывали.
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", default=1))
+
+# Журнал медленных SQL-запросов (JSONL с ротацией): порог в мс, доля
+# записываемых запросов и не больше SLOW_QUERY_RATE записей на процесс.
+# Без SLOW_QUERY_LOG журнал выключен.
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG") or None
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", default=200))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", default=1))
+SLOW_QUERY_RATE = os.getenv("SLOW_QUERY_RATE", default="60/min")
+SLOW_QUERY_EXPLAIN = True
+SLOW_QUERY_EXPLAIN_ANALYZE = (
+    os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", default="False") == "True"
+)
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Профили cProfile запросов к PROFILE_PATH_PREFIX: с подписанным
+# заголовком X-Profile (manage.py profile_header) или доля
+# PROFILE_SAMPLE_RATE всех запросов. Без PROFILE_DIR профили не пишутся.
+PROFILE_DIR = os.getenv("PROFILE_DIR") or None
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", default=0))
+PROFILE_PATH_PREFIX = "/api/v1/"
+PROFILE_HEADER_MAX_AGE = 600
+
 ROOT_URLCONF = "api_yamdb.urls"
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -89,6 +126,98 @@ DATABASES = {
     }
 }
 
+# DB_POOL=True включает для PostgreSQL пул соединений на процесс
+# (db/pooled_postgresql): соединение возвращается в пул в конце запроса
+# и перед выдачей проверяется. Без пула DB_CONN_MAX_AGE задает, сколько
+# секунд Django держит соединение открытым между запросами.
+if (
+    os.getenv("DB_POOL", default="False") == "True"
+    and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+):
+    DATABASES["default"]["ENGINE"] = "db.pooled_postgresql"
+    DATABASES["default"]["POOL"] = {
+        "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", default=10)),
+        "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", default=5)),
+        "CHECK_IDLE": float(os.getenv("DB_POOL_CHECK_IDLE", default=0)),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.getenv("DB_CONN_MAX_AGE", default=0)
+    )
+
+# Реплики только для чтения: DB_REPLICA_HOSTS - хосты PostgreSQL,
+# DB_REPLICA_NAMES - имена баз или файлы SQLite, через запятую;
+# остальные параметры подключения те же, что у default.
+DATABASES.update(
+    replica_databases(
+        DATABASES["default"],
+        hosts=split_env(os.getenv("DB_REPLICA_HOSTS")),
+        names=split_env(os.getenv("DB_REPLICA_NAMES")),
+    )
+)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["db.routers.ReplicaRouter"]
+# Приложения, чьи модели в безопасных запросах читаются с реплик.
+DATABASE_REPLICA_APPS = ("reviews", "users")
+# Сколько секунд после записи пользователь читает из основной базы;
+# 0 отключает привязку. Метки хранятся в кэше DATABASE_STICKY_CACHE,
+# общем для всех процессов: следующий запрос пользователя может попасть
+# в другой воркер.
+DATABASE_STICKY_SECONDS = int(
+    os.getenv("DB_REPLICA_STICKY_SECONDS", default=5)
+)
+DATABASE_STICKY_CACHE = os.getenv("DB_REPLICA_STICKY_CACHE", default="default")
+
+# Cache
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default="yamdb"),
+    }
+}
+if CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": 10000}
+
+# Кэш ответов каталога (произведения, категории, жанры). При нескольких
+# процессах gunicorn нужен общий бэкенд, например memcached.
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", default=300))
+# Версии пространств имен, из которых строятся ключи кэша и ETag, живут
+# не дольше API_VERSION_TIMEOUT секунд: инвалидация, которая не дошла
+# до кэша, перестает действовать хотя бы через это время.
+API_VERSION_TIMEOUT = int(os.getenv("API_VERSION_TIMEOUT", default=3600))
+# Версии, записанные одним процессом (воркером gunicorn, командой
+# manage.py), должны видеть все остальные. API_CACHE_REQUIRE_SHARED=True
+# запрещает запуск с кэшем в памяти процесса (LocMemCache, DummyCache).
+API_CACHE_REQUIRE_SHARED = (
+    os.getenv("API_CACHE_REQUIRE_SHARED", default="False") == "True"
+)
+# Сколько секунд аутентифицированный пользователь живет в кэше.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", default=60))
+
+# Рейтинг лучших произведений: сколько отзывов нужно, чтобы собственная
+# средняя оценка перевесила среднюю по каталогу, и сколько секунд
+# средняя по каталогу живет в кэше.
+LEADERBOARD_MIN_VOTES = int(os.getenv("LEADERBOARD_MIN_VOTES", default=10))
+LEADERBOARD_MEAN_TIMEOUT = 3600
+
+# POST /api/v1/batch/: наибольшее число подзапросов в пачке и число
+# потоков, в которых выполняются пачки из одних чтений.
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", default=4))
+
+# Списки произведений, отзывов и комментариев сериализуются из values()
+# в обход ModelSerializer (api/fastpath.py); False возвращает обычный путь.
+API_FAST_LIST = os.getenv("API_FAST_LIST", default="True") == "True"
+
+# Потоки, в которых ASGI-путь (api/async_views.py) выполняет запросы
+# к БД; это же верхняя граница его соединений с базой на процесс.
+ASGI_DB_WORKERS = int(os.getenv("ASGI_DB_WORKERS", default=8))
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -108,6 +237,13 @@ AUTH_PASSWORD_VALIDATORS = [
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Очередь писем: размер пачки, число попыток и задержки (в секундах)
+# между ними для команды send_outbox_mail.
+MAIL_OUTBOX_BATCH_SIZE = 100
+MAIL_OUTBOX_MAX_ATTEMPTS = 5
+MAIL_OUTBOX_RETRY_DELAY = 30
+MAIL_OUTBOX_MAX_DELAY = 3600
 # Internationalization
 
 LANGUAGE_CODE = "en-us"
@@ -133,8 +269,30 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
+    # Адрес клиента для ограничения частоты берется из последнего
+    # элемента X-Forwarded-For, который дописывает nginx; остальные
+    # элементы присылает клиент, и им верить нельзя.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 1)),
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttling.IPThrottle",
+        "api.throttling.UsernameThrottle",
+    ],
+    # Ставки token bucket для представлений с throttle_scope: емкость
+    # ведра и число жетонов, которое в него добавляется за период.
+    "DEFAULT_THROTTLE_RATES": {
+        "signup_ip": os.getenv("THROTTLE_SIGNUP_IP", "10/min"),
+        "signup_username": os.getenv("THROTTLE_SIGNUP_USERNAME", "3/min"),
+        "token_ip": os.getenv("THROTTLE_TOKEN_IP", "30/min"),
+        "token_username": os.getenv("THROTTLE_TOKEN_USERNAME", "10/min"),
+    },
 }
+
+# Алиас кэша для ведер ограничения частоты, общих для всех процессов;
+# без него ведра живут в памяти процесса, не больше THROTTLE_MAX_KEYS
+# ключей на ставку.
+THROTTLE_CACHE = os.getenv("THROTTLE_CACHE") or None
+THROTTLE_MAX_KEYS = 10000
@@ -1,10 +1,12 @@
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
+from metrics.views import metrics
 
 urlpatterns = [
     path("api/", include("api.urls")),
     path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
     path(
         "redoc/",
         TemplateView.as_view(template_name="redoc.html"),
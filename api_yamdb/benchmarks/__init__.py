@@ -0,0 +1,22 @@
+"""Воспроизводимые нагрузочные тесты YaMDb.
+
+Запуск из каталога ``api_yamdb``::
+
+    python -m benchmarks seed --titles 100000 --reviews 5000000 \\
+        --comments 10000000
+    python -m benchmarks run --base-url http://localhost:8000 \\
+        --concurrency 32 --requests 500 --output report.json
+    python -m benchmarks compare before.json after.json
+    python -m benchmarks plans --output plans.json
+    python -m benchmarks serializers --rows 1000
+    python -m benchmarks asgi --concurrency 64 --requests 500
+    python -m benchmarks throttle --calls 100000
+"""
+import os
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+    import django
+
+    django.setup()
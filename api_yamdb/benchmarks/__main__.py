@@ -0,0 +1,159 @@
+import argparse
+import json
+import sys
+
+from benchmarks import setup_django
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="наполнить базу данными")
+    seed.add_argument("--titles", type=int, default=1000)
+    seed.add_argument("--reviews", type=int, default=20000)
+    seed.add_argument("--comments", type=int, default=50000)
+    seed.add_argument("--users", type=int)
+    seed.add_argument("--batch-size", type=int, default=5000)
+    seed.add_argument("--random-seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="прогнать сценарии")
+    run.add_argument(
+        "--base-url",
+        help="адрес запущенного сервера; без него запросы идут в WSGI "
+        "внутри процесса",
+    )
+    run.add_argument("--requests", type=int, default=200)
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--only", nargs="*", help="имена сценариев")
+    run.add_argument("--label")
+    run.add_argument("--output", help="файл для JSON-отчета")
+
+    plans = commands.add_parser(
+        "plans", help="планы запросов для фильтров произведений"
+    )
+    plans.add_argument("--output", help="файл для JSON-отчета")
+
+    serializers = commands.add_parser(
+        "serializers", help="сравнить сериализаторы DRF и быстрый путь"
+    )
+    serializers.add_argument("--rows", type=int, default=1000)
+    serializers.add_argument("--repeat", type=int, default=5)
+    serializers.add_argument("--output", help="файл для JSON-отчета")
+
+    asgi = commands.add_parser(
+        "asgi", help="сравнить WSGI- и ASGI-путь на чтениях"
+    )
+    asgi.add_argument("--requests", type=int, default=500)
+    asgi.add_argument("--concurrency", type=int, default=64)
+    asgi.add_argument("--only", nargs="*", help="имена сценариев")
+    asgi.add_argument(
+        "--output",
+        help="префикс файлов отчетов <префикс>-wsgi.json и -asgi.json",
+    )
+
+    throttle = commands.add_parser(
+        "throttle", help="накладные расходы ограничения частоты"
+    )
+    throttle.add_argument("--calls", type=int, default=100000)
+    throttle.add_argument("--keys", type=int, default=1000)
+    throttle.add_argument("--output", help="файл для JSON-отчета")
+
+    compare = commands.add_parser("compare", help="сравнить два отчета")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    return parser.parse_args(argv)
+
+
+def save(report, path):
+    if path:
+        with open(path, "w") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+def print_comparison(rows):
+    print(f"{'route':20} {'rps':>24} {'p99, ms':>26} {'queries':>12}")
+    for row in rows:
+        print(
+            f"{row['route']:20} "
+            f"{row['rps'][0]:>8} → {row['rps'][1]:>8} "
+            f"{str(row['rps'][2]):>6}% "
+            f"{row['p99_ms'][0]:>8} → {row['p99_ms'][1]:>8} "
+            f"{str(row['p99_ms'][2]):>6}% "
+            f"{str(row['queries'][0]):>5} → {row['queries'][1]}"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "compare":
+        from benchmarks.compare import compare
+
+        with open(args.before) as before, open(args.after) as after:
+            print_comparison(compare(json.load(before), json.load(after)))
+        return 0
+
+    setup_django()
+    if args.command == "seed":
+        from benchmarks.seed import seed
+
+        seed(
+            titles=args.titles,
+            reviews=args.reviews,
+            comments=args.comments,
+            users=args.users,
+            batch_size=args.batch_size,
+            random_seed=args.random_seed,
+        )
+        return 0
+
+    if args.command == "plans":
+        from benchmarks.query_plans import run as run_plans
+
+        report = run_plans()
+        save(report, args.output)
+        return 0 if all(case["ok"] for case in report) else 1
+
+    if args.command == "serializers":
+        from benchmarks.serializers import run as run_serializers
+
+        report = run_serializers(rows=args.rows, repeat=args.repeat)
+        save(report, args.output)
+        return 0
+
+    if args.command == "throttle":
+        from benchmarks.throttling import run as run_throttle
+
+        save(run_throttle(calls=args.calls, keys=args.keys), args.output)
+        return 0
+
+    if args.command == "asgi":
+        from benchmarks.asgi import run as run_asgi
+        from benchmarks.compare import compare
+
+        reports = run_asgi(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            only=args.only,
+        )
+        for mode, report in reports.items():
+            save(report, args.output and f"{args.output}-{mode}.json")
+        print_comparison(compare(reports["wsgi"], reports["asgi"]))
+        return 0
+
+    from benchmarks.loadtest import HttpClient, InProcessClient, run
+
+    client = HttpClient(args.base_url) if args.base_url else InProcessClient()
+    report = run(
+        client,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        only=args.only,
+        label=args.label,
+    )
+    save(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
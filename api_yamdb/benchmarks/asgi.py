@@ -0,0 +1,120 @@
+"""Сравнение WSGI- и ASGI-пути на чтениях при высокой конкурентности.
+
+Оба варианта вызываются в этом же процессе через интерфейс ASGI:
+WSGI-путь - синхронный Django в ``WsgiToAsgi``, ASGI-путь -
+``AsyncReadApplication``. Так сравниваются сами обработчики без
+сетевого стека; прогон через сервер - это ``python -m benchmarks run
+--base-url`` против gunicorn с воркером ``uvicorn.workers.UvicornWorker``.
+"""
+import asyncio
+import time
+from urllib.parse import quote
+
+from api.async_views import AsyncReadApplication
+from asgiref.wsgi import WsgiToAsgi
+from benchmarks.loadtest import (SCENARIOS, Context, build_report, log_route,
+                                 summarize)
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+
+READ_SCENARIOS = (
+    "titles-list",
+    "titles-detail",
+    "reviews-list",
+    "reviews-detail",
+    "comments-list",
+    "comments-detail",
+)
+
+
+def applications():
+    wsgi = WsgiToAsgi(get_wsgi_application())
+    return {"wsgi": wsgi, "asgi": AsyncReadApplication(wsgi)}
+
+
+async def call(application, method, path, token):
+    path, _, query = path.partition("?")
+    headers = [(b"host", b"localhost"), (b"accept", b"application/json")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": quote(query, safe="=&,").encode(),
+        "headers": headers,
+        "server": ("localhost", 80),
+    }
+    start = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+
+    await application(scope, receive, send)
+    return start["status"], {
+        name.decode().lower(): value.decode()
+        for name, value in start["headers"]
+    }
+
+
+async def run_scenario(application, scenario, context, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def measure():
+        async with semaphore:
+            method, path, _, token = scenario.request(context)
+            started = time.perf_counter()
+            status, headers = await call(application, method, path, token)
+            elapsed = time.perf_counter() - started
+        query_count = headers.get("x-db-query-count")
+        return elapsed, status, int(query_count) if query_count else None
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(measure() for _ in range(requests)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+def run(requests=500, concurrency=64, only=None, log=print):
+    """Возвращает отчеты ``{"wsgi": ..., "asgi": ...}`` формата ``run``.
+
+    Отчеты можно сравнить командой ``python -m benchmarks compare``.
+    Результат ASGI-пути зависит от ``DB_CONN_MAX_AGE`` и ``DB_POOL``:
+    при ``CONN_MAX_AGE=0`` без пула каждый запрос открывает соединения
+    заново, поэтому настройки базы печатаются и попадают в отчет.
+    """
+    database = connection.settings_dict
+    log(
+        f"database: {database['ENGINE']}, "
+        f"CONN_MAX_AGE={database['CONN_MAX_AGE']}, "
+        f"pool={'POOL' in database}, "
+        f"ASGI_DB_WORKERS={settings.ASGI_DB_WORKERS}"
+    )
+    context = Context()
+    scenarios = [
+        scenario
+        for scenario in SCENARIOS
+        if scenario.name in READ_SCENARIOS
+        and (not only or scenario.name in only)
+    ]
+    reports = {}
+    for mode, application in applications().items():
+        log(f"== {mode}")
+        routes = {}
+        for scenario in scenarios:
+            routes[scenario.name] = asyncio.run(
+                run_scenario(
+                    application, scenario, context, requests, concurrency
+                )
+            )
+            log_route(log, scenario.name, routes[scenario.name])
+        reports[mode] = build_report(routes, requests, concurrency, mode)
+        reports[mode]["settings"]["asgi_db_workers"] = settings.ASGI_DB_WORKERS
+    return reports
@@ -0,0 +1,28 @@
+"""Сравнение двух JSON-отчетов нагрузочного прогона."""
+
+
+def change(old, new):
+    """Изменение в процентах или ``None``, если сравнивать не с чем."""
+    if not old or new is None:
+        return None
+    return round((new - old) / old * 100, 1)
+
+
+def compare(before, after):
+    """Построчное сравнение отчетов: RPS, p99 и число запросов к БД."""
+    rows = []
+    for name, old in before["routes"].items():
+        new = after["routes"].get(name)
+        if new is None:
+            continue
+        old_rps, new_rps = old["rps"], new["rps"]
+        old_p99, new_p99 = old["latency_ms"]["p99"], new["latency_ms"]["p99"]
+        rows.append(
+            {
+                "route": name,
+                "rps": (old_rps, new_rps, change(old_rps, new_rps)),
+                "p99_ms": (old_p99, new_p99, change(old_p99, new_p99)),
+                "queries": (old["queries"]["mean"], new["queries"]["mean"]),
+            }
+        )
+    return rows
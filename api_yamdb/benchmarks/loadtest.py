@@ -0,0 +1,531 @@
+"""Нагрузочный прогон по всем маршрутам ``api/urls.py``."""
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from db.pool import pool_stats
+from django.db import close_old_connections, connection
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+REPORT_VERSION = 1
+# Выгрузки отдают NDJSON и CSV (формат выбирает ``?format=``), остальные
+# маршруты - JSON.
+ACCEPT = "application/json, */*;q=0.1"
+
+
+class Scenario:
+    """Один маршрут и способ построить запрос к нему."""
+
+    def __init__(self, name, method, build, auth=None):
+        self.name = name
+        self.method = method
+        self.build = build
+        self.auth = auth
+
+    def request(self, context):
+        path, data = self.build(context)
+        return self.method, path, data, context.tokens.get(self.auth)
+
+
+class Context:
+    """Идентификаторы объектов, по которым ходят сценарии."""
+
+    def __init__(self, sample_size=1000, random_seed=0):
+        self.rng = random.Random(random_seed)
+        self.lock = threading.Lock()
+        self.unique = count()
+        self.admin = self.account("bench-admin", User.ADMIN)
+        self.user = self.account("bench-user", User.USER)
+        self.tokens = {
+            None: None,
+            "user": str(AccessToken.for_user(self.user)),
+            "admin": str(AccessToken.for_user(self.admin)),
+        }
+        self.titles = list(
+            Title.objects.values_list("pk", flat=True)[:sample_size]
+        )
+        self.reviews = list(
+            Review.objects.values_list("title_id", "pk")[:sample_size]
+        )
+        self.comments = list(
+            Comment.objects.values_list(
+                "reviews__title_id", "reviews_id", "pk"
+            )[:sample_size]
+        )
+        self.unreviewed = list(
+            Title.objects.exclude(reviews__author=self.admin).values_list(
+                "pk", flat=True
+            )[:sample_size]
+        )
+        self.category = Category.objects.values_list("slug", flat=True)[0]
+        self.genre = Genre.objects.values_list("slug", flat=True)[0]
+        self.created = {
+            "titles": [],
+            "reviews": [],
+            "comments": [],
+            "categories": [],
+            "genres": [],
+            "users": [],
+        }
+
+    @staticmethod
+    def account(username, role):
+        user = User.objects.filter(username=username).first()
+        return user or User.objects.create_user(
+            username=username, email=f"{username}@yamdb.fake", role=role
+        )
+
+    def pick(self, items):
+        with self.lock:
+            return self.rng.choice(items)
+
+    def take(self, items):
+        with self.lock:
+            return items.pop() if items else None
+
+    def name(self, prefix):
+        return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+    def remember(self, kind, value):
+        with self.lock:
+            self.created[kind].append(value)
+        return value
+
+
+def title_path(ctx):
+    return f"/api/v1/titles/{ctx.pick(ctx.titles)}/"
+
+
+def review_path(ctx):
+    title_id, review_id = ctx.pick(ctx.reviews)
+    return f"/api/v1/titles/{title_id}/reviews/{review_id}/"
+
+
+def comment_path(ctx):
+    title_id, review_id, comment_id = ctx.pick(ctx.comments)
+    return (
+        f"/api/v1/titles/{title_id}/reviews/{review_id}/comments/"
+        f"{comment_id}/"
+    )
+
+
+def title_row(ctx, name):
+    return {
+        "name": name,
+        "description": "bench",
+        "year": 2000,
+        "category": ctx.category,
+        "genre": [ctx.genre],
+    }
+
+
+def new_title(ctx):
+    return "/api/v1/titles/", title_row(
+        ctx, ctx.remember("titles", ctx.name("bench-load"))
+    )
+
+
+def new_titles(ctx, size=10):
+    return "/api/v1/titles/bulk/", [
+        title_row(ctx, ctx.name("bench-bulk")) for _ in range(size)
+    ]
+
+
+def new_review(ctx):
+    title_id = ctx.take(ctx.unreviewed) or ctx.pick(ctx.titles)
+    ctx.remember("reviews", title_id)
+    return f"/api/v1/titles/{title_id}/reviews/", {"text": "bench", "score": 7}
+
+
+def new_comment(ctx):
+    text = ctx.remember("comments", ctx.name("bench-load"))
+    return f"{review_path(ctx)}comments/", {"text": text}
+
+
+def new_category(ctx):
+    slug = ctx.remember("categories", ctx.name("bench-load"))
+    return "/api/v1/categories/", {"name": slug, "slug": slug}
+
+
+def new_genre(ctx):
+    slug = ctx.remember("genres", ctx.name("bench-load"))
+    return "/api/v1/genres/", {"name": slug, "slug": slug}
+
+
+def new_user(ctx):
+    username = ctx.remember("users", ctx.name("bench-load"))
+    return "/api/v1/users/", {
+        "username": username,
+        "email": f"{username}@yamdb.fake",
+    }
+
+
+def created(kind, prefix):
+    def build(ctx):
+        return f"{prefix}{ctx.take(ctx.created[kind]) or 'missing'}/", None
+
+    return build
+
+
+def created_title(ctx):
+    title_id = (
+        Title.objects.filter(name=ctx.take(ctx.created["titles"]))
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return f"/api/v1/titles/{title_id or 'missing'}/", None
+
+
+def created_review(ctx):
+    title_id = ctx.take(ctx.created["reviews"])
+    review_id = (
+        Review.objects.filter(title_id=title_id, author=ctx.admin)
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return f"/api/v1/titles/{title_id}/reviews/{review_id or 'missing'}/", None
+
+
+def created_comment(ctx):
+    ids = (
+        Comment.objects.filter(text=ctx.take(ctx.created["comments"]))
+        .values_list("reviews__title_id", "reviews_id", "pk")
+        .first()
+    )
+    title_id, review_id, comment_id = ids or ("missing",) * 3
+    return (
+        f"/api/v1/titles/{title_id}/reviews/{review_id}/comments/"
+        f"{comment_id}/",
+        None,
+    )
+
+
+def batch(ctx):
+    return "/api/v1/batch/", {
+        "requests": [
+            {"method": "GET", "path": title_path(ctx)},
+            {"method": "GET", "path": f"{title_path(ctx)}reviews/"},
+            {"method": "GET", "path": review_path(ctx)},
+            {"method": "GET", "path": comment_path(ctx)},
+        ]
+    }
+
+
+def signup(ctx):
+    username = ctx.name("bench-signup")
+    return "/api/v1/auth/signup/", {
+        "username": username,
+        "email": f"{username}@yamdb.fake",
+    }
+
+
+SCENARIOS = [
+    Scenario("titles-list", "GET", lambda ctx: ("/api/v1/titles/", None)),
+    Scenario(
+        "titles-search",
+        "GET",
+        lambda ctx: ("/api/v1/titles/?q=город", None),
+    ),
+    Scenario("titles-top", "GET", lambda ctx: ("/api/v1/titles/top/", None)),
+    Scenario("titles-detail", "GET", lambda ctx: (title_path(ctx), None)),
+    Scenario(
+        "titles-distribution",
+        "GET",
+        lambda ctx: (f"{title_path(ctx)}score-distribution/", None),
+    ),
+    Scenario("titles-create", "POST", new_title, auth="admin"),
+    Scenario("titles-bulk", "POST", new_titles, auth="admin"),
+    Scenario(
+        "titles-update",
+        "PATCH",
+        lambda ctx: (title_path(ctx), {"category": ctx.category}),
+        auth="admin",
+    ),
+    Scenario("titles-destroy", "DELETE", created_title, auth="admin"),
+    Scenario(
+        "categories-list", "GET", lambda ctx: ("/api/v1/categories/", None)
+    ),
+    Scenario("categories-create", "POST", new_category, auth="admin"),
+    Scenario(
+        "categories-destroy",
+        "DELETE",
+        created("categories", "/api/v1/categories/"),
+        auth="admin",
+    ),
+    Scenario("genres-list", "GET", lambda ctx: ("/api/v1/genres/", None)),
+    Scenario("genres-create", "POST", new_genre, auth="admin"),
+    Scenario(
+        "genres-destroy",
+        "DELETE",
+        created("genres", "/api/v1/genres/"),
+        auth="admin",
+    ),
+    Scenario(
+        "reviews-list",
+        "GET",
+        lambda ctx: (f"{title_path(ctx)}reviews/", None),
+    ),
+    Scenario("reviews-detail", "GET", lambda ctx: (review_path(ctx), None)),
+    Scenario("reviews-create", "POST", new_review, auth="admin"),
+    Scenario(
+        "reviews-update",
+        "PATCH",
+        lambda ctx: (review_path(ctx), {"text": "bench"}),
+        auth="admin",
+    ),
+    Scenario("reviews-destroy", "DELETE", created_review, auth="admin"),
+    Scenario(
+        "comments-list",
+        "GET",
+        lambda ctx: (f"{review_path(ctx)}comments/", None),
+    ),
+    Scenario("comments-detail", "GET", lambda ctx: (comment_path(ctx), None)),
+    Scenario("comments-create", "POST", new_comment, auth="user"),
+    Scenario(
+        "comments-update",
+        "PATCH",
+        lambda ctx: (comment_path(ctx), {"text": "bench"}),
+        auth="admin",
+    ),
+    Scenario("comments-destroy", "DELETE", created_comment, auth="user"),
+    Scenario(
+        "users-list", "GET", lambda ctx: ("/api/v1/users/", None), "admin"
+    ),
+    Scenario(
+        "users-detail",
+        "GET",
+        lambda ctx: ("/api/v1/users/bench-user/", None),
+        auth="admin",
+    ),
+    Scenario(
+        "users-update",
+        "PATCH",
+        lambda ctx: ("/api/v1/users/bench-user/", {"bio": "bench"}),
+        auth="admin",
+    ),
+    Scenario("users-create", "POST", new_user, auth="admin"),
+    Scenario(
+        "users-destroy",
+        "DELETE",
+        created("users", "/api/v1/users/"),
+        auth="admin",
+    ),
+    Scenario(
+        "users-me", "GET", lambda ctx: ("/api/v1/users/me/", None), "user"
+    ),
+    Scenario(
+        "users-me-update",
+        "PATCH",
+        lambda ctx: ("/api/v1/users/me/", {"bio": "bench"}),
+        auth="user",
+    ),
+    Scenario(
+        "export-reviews",
+        "GET",
+        lambda ctx: (
+            f"/api/v1/export/reviews/?format=ndjson&title="
+            f"{ctx.pick(ctx.titles)}",
+            None,
+        ),
+        auth="admin",
+    ),
+    Scenario(
+        "export-comments",
+        "GET",
+        lambda ctx: (
+            f"/api/v1/export/comments/?format=csv&title="
+            f"{ctx.pick(ctx.titles)}",
+            None,
+        ),
+        auth="admin",
+    ),
+    Scenario("batch", "POST", batch),
+    Scenario("auth-signup", "POST", signup),
+    Scenario(
+        "auth-token",
+        "POST",
+        lambda ctx: (
+            "/api/v1/auth/token/",
+            {"username": "bench-user", "confirmation_code": "invalid"},
+        ),
+    ),
+]
+
+
+class HttpClient:
+    """Клиент для запущенного сервера (gunicorn, runserver, uvicorn)."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def __call__(self, method, path, data, token):
+        headers = {"Accept": ACCEPT}
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        request = urllib.request.Request(
+            self.base_url + path, data=body, headers=headers, method=method
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code, error.headers
+
+
+class InProcessClient:
+    """Клиент, вызывающий WSGI-обработчик Django в этом же процессе."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.local = threading.local()
+        self.client_class = Client
+
+    def __call__(self, method, path, data, token):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.client_class()
+        extra = {"HTTP_ACCEPT": ACCEPT}
+        if token:
+            extra["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        try:
+            response = getattr(client, method.lower())(
+                path,
+                data=json.dumps(data) if data is not None else None,
+                content_type="application/json",
+                **extra,
+            )
+        except Exception:
+            # Тестовый клиент пробрасывает исключения представлений,
+            # а сервер отдал бы на них 500.
+            return 500, {}
+        return response.status_code, response
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    latencies = [sample[0] * 1000 for sample in samples]
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample[1] >= 500),
+        "statuses": dict(
+            sorted(
+                (str(status), [s[1] for s in samples].count(status))
+                for status in {s[1] for s in samples}
+            )
+        ),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 3),
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p90": round(percentile(latencies, 0.90), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3),
+        },
+        "queries": {
+            "mean": round(statistics.mean(queries), 2) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+
+
+def measure(client, scenario, context):
+    method, path, data, token = scenario.request(context)
+    started = time.perf_counter()
+    status, headers = client(method, path, data, token)
+    elapsed = time.perf_counter() - started
+    query_count = headers.get("X-DB-Query-Count")
+    close_old_connections()
+    return elapsed, status, int(query_count) if query_count else None
+
+
+def run_scenario(client, scenario, context, requests, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        samples = list(
+            pool.map(
+                lambda _: measure(client, scenario, context), range(requests)
+            )
+        )
+        elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    client, requests=200, concurrency=16, only=None, log=print, label=None
+):
+    """Прогоняет все сценарии и возвращает отчет в виде словаря."""
+    context = Context()
+    routes = {}
+    for scenario in SCENARIOS:
+        if only and scenario.name not in only:
+            continue
+        routes[scenario.name] = run_scenario(
+            client, scenario, context, requests, concurrency
+        )
+        log_route(log, scenario.name, routes[scenario.name])
+    return build_report(routes, requests, concurrency, label)
+
+
+def log_route(log, name, stats):
+    log(
+        f"{name:20} {stats['rps']:>9} rps  "
+        f"p99 {stats['latency_ms']['p99']:>9} ms  "
+        f"queries {stats['queries']['mean']}"
+    )
+
+
+def build_report(routes, requests, concurrency, label=None):
+    return {
+        "version": REPORT_VERSION,
+        "label": label,
+        "revision": git_revision(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "settings": {"requests": requests, "concurrency": concurrency},
+        "database": {
+            "engine": connection.settings_dict["ENGINE"],
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            # Пулы есть только у прогона внутри процесса с DB_POOL=True.
+            "pools": pool_stats(),
+        },
+        "dataset": {
+            "titles": Title.objects.count(),
+            "reviews": Review.objects.count(),
+            "comments": Comment.objects.count(),
+        },
+        "routes": routes,
+    }
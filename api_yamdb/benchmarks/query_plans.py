@@ -0,0 +1,96 @@
+"""Планы запросов для сочетаний фильтров списка произведений.
+
+Запросы строятся тем же ``TitleFilter``, что и в API, и выполняются
+через ``QuerySet.explain()``. На маленьких таблицах планировщик
+предпочитает полный просмотр, поэтому прогонять имеет смысл на базе,
+наполненной ``python -m benchmarks seed``.
+"""
+import re
+import time
+
+from api.filters import TitleFilter
+from django.db import connection
+from reviews.models import Category, Genre, Title
+
+INDEXES = {
+    "category_year": r"title_category_year_idx",
+    "title_genre": r"reviews_titlegenre_genre_id_title_id_\w+_uniq",
+    "name_prefix": r"reviews_title_name_prefix_idx",
+}
+
+
+def cases():
+    category = Category.objects.values_list("slug", flat=True).first()
+    genres = list(Genre.objects.values_list("slug", flat=True)[:2])
+    word = Title.objects.values_list("name", flat=True).first() or "а"
+    return [
+        (
+            "category + year range",
+            {"category": category, "year_min": 1950, "year_max": 2000},
+            ["category_year"],
+        ),
+        ("genre any", {"genre": ",".join(genres)}, ["title_genre"]),
+        (
+            "genre all",
+            {"genre": ",".join(genres), "genre_mode": "all"},
+            ["title_genre"],
+        ),
+        (
+            "genre + category + year",
+            {"genre": genres[0], "category": category, "year_min": 1990},
+            ["title_genre", "category_year"],
+        ),
+        ("name prefix", {"name": word[:3]}, ["name_prefix"]),
+    ]
+
+
+def analyze():
+    """Обновляет статистику, чтобы планы соответствовали данным."""
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def explain(params):
+    queryset = TitleFilter(params, queryset=Title.objects.order_by("id")).qs
+    started = time.perf_counter()
+    count = len(queryset[:100])
+    elapsed = time.perf_counter() - started
+    return queryset.explain(), count, elapsed
+
+
+def run(log=print):
+    """Возвращает список словарей с планом и найденными индексами.
+
+    ``ok`` ложно, если план не использует ни один из ожидаемых индексов.
+    """
+    analyze()
+    report = []
+    for name, params, expected in cases():
+        plan, count, elapsed = explain(params)
+        used = [
+            index
+            for index, pattern in INDEXES.items()
+            if re.search(pattern, plan)
+        ]
+        # Индекс по выражению для префикса имени есть только в PostgreSQL.
+        if connection.vendor != "postgresql":
+            expected = [index for index in expected if index != "name_prefix"]
+        # Для сочетания фильтров достаточно любого из ожидаемых индексов:
+        # планировщик начинает с самого селективного условия.
+        ok = not expected or bool(set(expected) & set(used))
+        report.append(
+            {
+                "case": name,
+                "params": params,
+                "rows": count,
+                "ms": round(elapsed * 1000, 3),
+                "indexes": used,
+                "expected": expected,
+                "ok": ok,
+                "plan": plan,
+            }
+        )
+        log(f"== {name} {params} -> {count} rows, {elapsed * 1000:.1f} ms")
+        log(plan)
+        log(f"indexes: {used or '-'}; expected: {expected or '-'}")
+    return report
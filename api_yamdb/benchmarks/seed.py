@@ -0,0 +1,174 @@
+"""Наполнение базы синтетическим каталогом через модели проекта."""
+import random
+import time
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from reviews.leaderboard import refresh_global_mean
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleRanking, TitleScoreDistribution)
+from reviews.signals import ratings_recounted, titles_imported
+from users.models import User
+
+WORDS = (
+    "ночь город море тень песня дорога время звезда сердце огонь ветер "
+    "дом война мир память зеркало остров лес небо письмо"
+).split()
+SEEDED_MODELS = (Category, Genre, User, Title, TitleGenre, Review, Comment)
+
+
+def text(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def id_range(model, count):
+    """Диапазон свободных первичных ключей для ``count`` объектов."""
+    first = (model.objects.aggregate(value=Max("pk"))["value"] or 0) + 1
+    return range(first, first + count)
+
+
+def insert(model, objects, batch_size):
+    """Вставляет объекты пачками, не держа их все в памяти."""
+    batch = []
+    created = 0
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+class Dataset:
+    """Синтетический каталог заданного размера.
+
+    Первичные ключи назначаются явно, поэтому связи строятся без
+    повторного чтения созданных строк на любой СУБД. На пару
+    (произведение, автор) приходится не больше одного отзыва, так что
+    пользователей создается не меньше ``reviews / titles``.
+    """
+
+    def __init__(
+        self,
+        titles,
+        reviews,
+        comments,
+        users=None,
+        categories=10,
+        genres=30,
+        random_seed=0,
+    ):
+        self.rng = random.Random(random_seed)
+        self.sizes = {
+            "categories": categories,
+            "genres": genres,
+            "users": max(users or 0, -(-reviews // max(titles, 1)), 2),
+            "titles": titles,
+            "reviews": reviews,
+            "comments": comments if reviews else 0,
+        }
+        self.categories = id_range(Category, categories)
+        self.genres = id_range(Genre, genres)
+        self.users = id_range(User, self.sizes["users"])
+        self.titles = id_range(Title, titles)
+        self.reviews = id_range(Review, reviews)
+        self.comments = id_range(Comment, self.sizes["comments"])
+
+    def plan(self):
+        return [
+            ("categories", Category, self.make_categories()),
+            ("genres", Genre, self.make_genres()),
+            ("users", User, self.make_users()),
+            ("titles", Title, self.make_titles()),
+            ("title genres", TitleGenre, self.make_title_genres()),
+            ("reviews", Review, self.make_reviews()),
+            ("comments", Comment, self.make_comments()),
+        ]
+
+    def make_categories(self):
+        for pk in self.categories:
+            yield Category(
+                pk=pk, name=f"Категория {pk}", slug=f"bench-cat-{pk}"
+            )
+
+    def make_genres(self):
+        for pk in self.genres:
+            yield Genre(pk=pk, name=f"Жанр {pk}", slug=f"bench-genre-{pk}")
+
+    def make_users(self):
+        for pk in self.users:
+            yield User(
+                pk=pk,
+                username=f"bench{pk}",
+                email=f"bench{pk}@yamdb.fake",
+                role=User.USER,
+            )
+
+    def make_titles(self):
+        for pk in self.titles:
+            yield Title(
+                pk=pk,
+                name=text(self.rng, 3).capitalize(),
+                description=text(self.rng),
+                year=self.rng.randint(1900, 2020),
+                category_id=self.rng.choice(self.categories),
+            )
+
+    def make_title_genres(self):
+        per_title = min(3, len(self.genres))
+        for pk in self.titles:
+            for genre_id in self.rng.sample(self.genres, per_title):
+                yield TitleGenre(title_id=pk, genre_id=genre_id)
+
+    def make_reviews(self):
+        titles = len(self.titles)
+        for index, pk in enumerate(self.reviews):
+            yield Review(
+                pk=pk,
+                title_id=self.titles[index % titles],
+                author_id=self.users[index // titles],
+                text=text(self.rng),
+                score=self.rng.randint(1, 10),
+            )
+
+    def make_comments(self):
+        for pk in self.comments:
+            yield Comment(
+                pk=pk,
+                reviews_id=self.rng.choice(self.reviews),
+                author_id=self.rng.choice(self.users),
+                text=text(self.rng, 6),
+            )
+
+
+def seed(batch_size=5000, log=print, **sizes):
+    """Создает набор данных и возвращает размеры созданных таблиц."""
+    dataset = Dataset(**sizes)
+    started = time.monotonic()
+    for name, model, objects in dataset.plan():
+        count = insert(model, objects, batch_size)
+        log(f"{name}: {count} ({time.monotonic() - started:.1f} s)")
+    titles = Title.objects.filter(
+        pk__gte=dataset.titles.start, pk__lt=dataset.titles.stop
+    )
+    titles.recount_ratings()
+    TitleScoreDistribution.objects.rebuild(titles)
+    TitleRanking.objects.rebuild(refresh_global_mean())
+    log(f"ratings ({time.monotonic() - started:.1f} s)")
+    reset_sequences()
+    titles_imported.send(sender=Title, titles=[])
+    ratings_recounted.send(sender=Title)
+    return dataset.sizes
+
+
+def reset_sequences():
+    """Сдвигает последовательности после вставки с явными ключами."""
+    statements = connection.ops.sequence_reset_sql(no_style(), SEEDED_MODELS)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -0,0 +1,91 @@
+"""Сравнение сериализаторов DRF и быстрого пути ``api.fastpath``.
+
+Измеряется только сериализация уже прочитанных строк: запросы к базе,
+включая жанры произведений, выполняются один раз до замера, поэтому
+разница показывает стоимость полей DRF на строку.
+"""
+import statistics
+import time
+
+from api.fastpath import (FastCommentsSerializer, FastReviewsSerializer,
+                          FastTitleSerializer)
+from api.serializers import (CommentsSerializer, ReviewsSerializer,
+                             TitleSerializer)
+from api.views import TitleViewSet
+from reviews.models import Comment, Review
+
+
+def cases():
+    return [
+        (
+            "titles",
+            TitleViewSet.queryset,
+            TitleSerializer,
+            FastTitleSerializer,
+        ),
+        (
+            "reviews",
+            Review.objects.select_related("author"),
+            ReviewsSerializer,
+            FastReviewsSerializer,
+        ),
+        (
+            "comments",
+            Comment.objects.select_related("author"),
+            CommentsSerializer,
+            FastCommentsSerializer,
+        ),
+    ]
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run(rows=1000, repeat=5, log=print):
+    """Возвращает медианное время сериализации ``rows`` строк, мс.
+
+    DRF получает готовые модели с ``select_related``/``prefetch_related``,
+    быстрый путь - готовые словари ``values()`` и связи жанров; создание
+    моделей из строк базы в замер не входит.
+    """
+    report = []
+    for name, queryset, serializer_class, fast_class in cases():
+        queryset = queryset.order_by("id")[:rows]
+        fast = fast_class()
+        instances = list(queryset)
+        values = list(fast.get_queryset(queryset))
+        extra = {}
+        if isinstance(fast, FastTitleSerializer):
+            extra["links"] = list(
+                fast.genre_links([row["id"] for row in values])
+            )
+        count = len(instances)
+
+        def drf():
+            serializer_class(instances, many=True).data
+
+        def fast_path():
+            fast.to_representation(values, **extra)
+
+        drf_ms = measure(drf, repeat) * 1000
+        fast_ms = measure(fast_path, repeat) * 1000
+        report.append(
+            {
+                "case": name,
+                "rows": count,
+                "drf_ms": round(drf_ms, 3),
+                "fast_ms": round(fast_ms, 3),
+                "speedup": round(drf_ms / fast_ms, 2) if fast_ms else None,
+            }
+        )
+        log(
+            f"{name:10} {count:>6} rows: DRF {drf_ms:9.1f} ms, "
+            f"fast {fast_ms:9.1f} ms"
+        )
+    return report
@@ -0,0 +1,74 @@
+"""Накладные расходы ``api.throttling`` на запрос.
+
+Замеряются ведро в памяти процесса и ведро в кэше ``default`` (в
+настройках по умолчанию - LocMemCache; с memcached или Redis к цене
+добавляется сетевой запрос), а также полная проверка DRF обоими
+ограничителями для ``/auth/token/`` по ставкам из настроек. Ключи
+(IP и username) перебираются по кругу; отказ стоит столько же, сколько
+разрешение, поэтому исчерпанные ведра на результат не влияют.
+"""
+import time
+
+from api.throttling import (CacheTokenBucket, IPThrottle, TokenBucket,
+                            UsernameThrottle, reset_buckets)
+from api.views import UserTokenView
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+def measure(function, calls):
+    started = time.perf_counter()
+    for number in range(calls):
+        function(number)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def token_requests(keys):
+    factory = APIRequestFactory()
+    requests = []
+    for number in range(keys):
+        request = Request(
+            factory.post(
+                "/api/v1/auth/token/",
+                {"username": f"user{number}", "confirmation_code": "x"},
+                format="json",
+                REMOTE_ADDR=f"10.0.{number // 256}.{number % 256}",
+            ),
+            parsers=[JSONParser()],
+        )
+        # Разбор тела входит в цену представления, а не ограничителя.
+        request.data
+        requests.append(request)
+    return requests
+
+
+def run(calls=100000, keys=1000, log=print):
+    """Возвращает среднее время одного вызова в микросекундах."""
+    # Емкость больше числа вызовов на ключ: все они разрешаются.
+    capacity = calls // keys + 1
+    local = TokenBucket(capacity, 1.0)
+    shared = CacheTokenBucket(capacity, 1.0, "default", "benchmark")
+    requests = token_requests(keys)
+    throttles = [IPThrottle(), UsernameThrottle()]
+    view = UserTokenView()
+    reset_buckets()
+
+    def allow(number):
+        request = requests[number % keys]
+        for throttle in throttles:
+            throttle.allow_request(request, view)
+
+    report = {
+        "calls": calls,
+        "keys": keys,
+        "local_bucket_us": measure(lambda n: local.consume(n % keys), calls),
+        "cache_bucket_us": measure(lambda n: shared.consume(n % keys), calls),
+        "token_view_throttles_us": measure(allow, calls),
+    }
+    reset_buckets()
+    for name, value in report.items():
+        if name.endswith("_us"):
+            report[name] = round(value, 2)
+            log(f"{name:26} {report[name]:>8} µs")
+    return report
@@ -0,0 +1 @@
+"""Маршрутизация запросов к базе между основной базой и репликами."""
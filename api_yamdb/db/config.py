@@ -0,0 +1,36 @@
+"""Настройки реплик для ``DATABASES``.
+
+Модуль импортируется из settings.py, поэтому не обращается к настройкам
+Django и не импортирует модели.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+REPLICA_PREFIX = "replica_"
+
+
+def split_env(value):
+    """Список непустых значений из переменной окружения через запятую."""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def replica_databases(primary, hosts=(), names=()):
+    """Настройки реплик: копии ``primary`` с другим HOST и/или NAME.
+
+    Хосты и имена баз сопоставляются по порядку, поэтому если заданы
+    оба списка, их длины должны совпадать. Тестовая база реплики - та
+    же, что у основной (``MIRROR``), так что тесты видят одни данные.
+    """
+    if hosts and names and len(hosts) != len(names):
+        raise ImproperlyConfigured(
+            "DB_REPLICA_HOSTS и DB_REPLICA_NAMES должны быть одной длины."
+        )
+    replicas = {}
+    for index in range(max(len(hosts), len(names))):
+        config = dict(primary)
+        if hosts:
+            config["HOST"] = hosts[index]
+        if names:
+            config["NAME"] = names[index]
+        config["TEST"] = {"MIRROR": "default"}
+        replicas[f"{REPLICA_PREFIX}{index + 1}"] = config
+    return replicas
@@ -0,0 +1,16 @@
+from db.routers import request_routing
+
+
+class ReplicaRoutingMiddleware:
+    """Включает ``ReplicaRouter`` на время обработки запроса.
+
+    Пользователь, от имени которого в запросе была запись, становится
+    «липким» к основной базе на ``DATABASE_STICKY_SECONDS`` секунд.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_routing(request):
+            return self.get_response(request)
@@ -0,0 +1,203 @@
+"""Ограниченный пул соединений с базой на процесс.
+
+Пул не зависит от СУБД: соединения создает ``connect``, проверяет
+``ping``, готовит к повторной выдаче ``reset`` и закрывает ``close``.
+Функции для psycopg2 передает бэкенд ``db.pooled_postgresql``.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("db.pool")
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolExhaustedError(Exception):
+    """Свободное соединение не появилось за ``timeout`` секунд."""
+
+
+class PoolStats:
+    """Счетчики пула; время ожидания - в секундах."""
+
+    def __init__(self):
+        self.created = 0
+        self.discarded = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.wait_time_max = 0.0
+        self.exhausted = 0
+        self.health_check_failures = 0
+
+
+class ConnectionPool:
+    """Не больше ``max_size`` соединений: выданных и свободных вместе.
+
+    Свободное соединение, пролежавшее в пуле дольше ``check_idle``
+    секунд, перед выдачей проверяется через ``ping``; соединения старше
+    ``max_lifetime`` секунд закрываются при возврате.
+    """
+
+    def __init__(
+        self,
+        connect,
+        ping,
+        reset,
+        close,
+        max_size=10,
+        timeout=5.0,
+        check_idle=0.0,
+        max_lifetime=None,
+        label="",
+    ):
+        self.connect = connect
+        self.ping = ping
+        self.reset = reset
+        self.close = close
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_lifetime = max_lifetime
+        self.label = label
+        self.stats = PoolStats()
+        # Свободные соединения: (соединение, время возврата в пул).
+        self.idle = deque()
+        self.created_at = {}
+        self.size = 0
+        self.condition = threading.Condition()
+
+    def reserve(self):
+        """Свободное соединение из пула или None, если нужно новое."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats.exhausted += 1
+                    logger.warning(
+                        "Pool %s exhausted: %d connections in use",
+                        self.label,
+                        self.size,
+                    )
+                    raise PoolExhaustedError(
+                        f"Нет свободных соединений в пуле {self.label}."
+                    )
+                waited = True
+                self.condition.wait(remaining)
+            self.stats.checkouts += 1
+            if waited:
+                elapsed = time.monotonic() - started
+                self.stats.waits += 1
+                self.stats.wait_time += elapsed
+                self.stats.wait_time_max = max(
+                    self.stats.wait_time_max, elapsed
+                )
+            if self.idle:
+                return self.idle.pop()
+            self.size += 1
+            return None
+
+    def checkout(self):
+        while True:
+            entry = self.reserve()
+            if entry is None:
+                return self.open()
+            connection, returned = entry
+            idle_for = time.monotonic() - returned
+            if idle_for < self.check_idle or self.healthy(connection):
+                return connection
+            self.stats.health_check_failures += 1
+            self.discard(connection)
+
+    def open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.stats.created += 1
+            self.created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def healthy(self, connection):
+        try:
+            self.ping(connection)
+        except Exception:
+            return False
+        return True
+
+    def checkin(self, connection):
+        created = self.created_at.get(id(connection), 0)
+        expired = (
+            self.max_lifetime is not None
+            and time.monotonic() - created > self.max_lifetime
+        )
+        if expired or not self.reset(connection):
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        try:
+            self.close(connection)
+        except Exception:
+            logger.debug("Closing pooled connection failed", exc_info=True)
+        with self.condition:
+            self.created_at.pop(id(connection), None)
+            self.size -= 1
+            self.stats.discarded += 1
+            self.condition.notify()
+
+    def clear(self):
+        """Закрывает свободные соединения; выданные закроются при возврате."""
+        with self.condition:
+            idle = [connection for connection, _ in self.idle]
+            self.idle.clear()
+        for connection in idle:
+            self.discard(connection)
+
+    def snapshot(self):
+        with self.condition:
+            stats = dict(vars(self.stats))
+            stats.update(
+                size=self.size,
+                idle=len(self.idle),
+                in_use=self.size - len(self.idle),
+                max_size=self.max_size,
+            )
+        return stats
+
+
+def get_pool(key, factory):
+    """Пул процесса для ``key``, созданный ``factory`` при первом вызове."""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = factory()
+        return _pools[key]
+
+
+def pool_stats():
+    """Счетчики всех пулов процесса по их меткам."""
+    return {pool.label: pool.snapshot() for pool in list(_pools.values())}
+
+
+def close_pools(alias=None):
+    """Закрывает свободные соединения пулов ``alias`` (или всех)."""
+    with _pools_lock:
+        pools = [
+            pool
+            for key, pool in _pools.items()
+            if alias is None or key[0] == alias
+        ]
+    for pool in pools:
+        pool.clear()
@@ -0,0 +1,6 @@
+"""Бэкенд PostgreSQL с пулом соединений ``db.pool`` на процесс.
+
+Подключается через ``ENGINE = "db.pooled_postgresql"``; параметры пула
+задаются в ключе ``POOL`` настроек базы: ``MAX_SIZE``, ``TIMEOUT``,
+``CHECK_IDLE`` и ``MAX_LIFETIME`` (см. ``db.pool.ConnectionPool``).
+"""
@@ -0,0 +1,84 @@
+"""PostgreSQL, берущий соединения из пула вместо новых подключений.
+
+Django «закрывает» соединение в конце каждого запроса (при
+``CONN_MAX_AGE = 0``), а этот бэкенд вместо закрытия откатывает
+незавершенную транзакцию и возвращает соединение в пул.
+"""
+from contextlib import suppress
+
+from db.pool import ConnectionPool, get_pool
+from db.pooled_postgresql.creation import DatabaseCreation
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+POOL_DEFAULTS = {
+    "MAX_SIZE": 10,
+    "TIMEOUT": 5.0,
+    "CHECK_IDLE": 0.0,
+    "MAX_LIFETIME": None,
+}
+
+
+def ping(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    if connection.status != extensions.STATUS_READY:
+        connection.rollback()
+
+
+def reset(connection):
+    """Готовит соединение к повторной выдаче; False - его нужно закрыть."""
+    if connection.closed:
+        return False
+    status = connection.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        try:
+            connection.rollback()
+        except extensions.Error:
+            return False
+    return True
+
+
+def close(connection):
+    with suppress(extensions.Error):
+        connection.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    pool = None
+
+    def get_pool(self, conn_params):
+        options = {**POOL_DEFAULTS, **self.settings_dict.get("POOL", {})}
+        key = (self.alias, repr(sorted(conn_params.items())))
+
+        def connect():
+            return base.DatabaseWrapper.get_new_connection(self, conn_params)
+
+        return get_pool(
+            key,
+            lambda: ConnectionPool(
+                connect=connect,
+                ping=ping,
+                reset=reset,
+                close=close,
+                max_size=options["MAX_SIZE"],
+                timeout=options["TIMEOUT"],
+                check_idle=options["CHECK_IDLE"],
+                max_lifetime=options["MAX_LIFETIME"],
+                label=f"{self.alias}:{conn_params.get('database')}",
+            ),
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.checkout()
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.checkin(self.connection)
@@ -0,0 +1,10 @@
+from db.pool import close_pools
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Свободные соединения пула держат тестовую базу открытой,
+        # и DROP DATABASE с ними не пройдет.
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
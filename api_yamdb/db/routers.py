@@ -0,0 +1,159 @@
+"""Роутер чтений на реплики с привязкой к основной базе после записи.
+
+Чтения моделей из ``DATABASE_REPLICA_APPS`` уходят на одну из реплик
+``DATABASE_REPLICAS``, только если они выполняются внутри безопасного
+(GET, HEAD, OPTIONS) запроса, в котором еще не было записи. Запросы
+вне HTTP (команды, фоновые задачи), небезопасные методы и чтения
+после записи идут в основную базу.
+
+Пользователь, который что-то записал, еще ``DATABASE_STICKY_SECONDS``
+секунд читает из основной базы: за это время реплика успевает догнать
+основную базу, и он видит свои изменения.
+
+Внутри ``primary_reads()`` все чтения идут в основную базу: так
+заполняется общий кэш ответов, иначе отстающая реплика положила бы в
+него старые данные под версией, сдвинутой уже после записи.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import LazyObject, empty
+
+PRIMARY = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def sticky_key(user_id):
+    return f"db:sticky:{user_id}"
+
+
+def get_sticky_cache():
+    return caches[settings.DATABASE_STICKY_CACHE]
+
+
+def known_user(request):
+    """Пользователь запроса, если он уже определен, иначе None.
+
+    Ленивый ``request.user`` из ``AuthenticationMiddleware`` не
+    вычисляется: это запрос к базе, который снова попал бы в роутер.
+    """
+    user = getattr(request, "user", None)
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        return None
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+class RoutingState:
+    """Состояние маршрутизации одного HTTP-запроса."""
+
+    def __init__(self, request):
+        self.request = request
+        self.read_only = request.method in SAFE_METHODS
+        self.wrote = False
+        self.sticky = None
+        self.replica = None
+        self.primary_only = False
+
+    def is_sticky(self):
+        if self.sticky is None:
+            user = known_user(self.request)
+            if user is None:
+                # Пользователь может определиться позже, например
+                # после аутентификации DRF, поэтому ответ не запоминается.
+                return False
+            self.sticky = (
+                get_sticky_cache().get(sticky_key(user.pk)) is not None
+            )
+        return self.sticky
+
+    def read_alias(self):
+        """Реплика для чтения или None, если читать нужно из основной."""
+        if (
+            not self.read_only
+            or self.wrote
+            or self.primary_only
+            or not settings.DATABASE_REPLICAS
+        ):
+            return None
+        if settings.DATABASE_STICKY_SECONDS and self.is_sticky():
+            return None
+        if self.replica is None:
+            # Одна реплика на весь запрос: у разных реплик разное
+            # отставание, и данные внутри ответа не должны расходиться.
+            self.replica = random.choice(settings.DATABASE_REPLICAS)
+        return self.replica
+
+    def finish(self):
+        seconds = settings.DATABASE_STICKY_SECONDS
+        user = known_user(self.request)
+        if self.wrote and seconds and user is not None:
+            get_sticky_cache().set(sticky_key(user.pk), 1, seconds)
+
+
+def current_state():
+    return _state.get()
+
+
+@contextmanager
+def request_routing(request):
+    """Включает маршрутизацию на реплики для запроса ``request``."""
+    state = RoutingState(request)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+        state.finish()
+
+
+@contextmanager
+def primary_reads():
+    """Чтения текущего запроса внутри блока идут в основную базу."""
+    state = current_state()
+    if state is None:
+        yield
+        return
+    previous = state.primary_only
+    state.primary_only = True
+    try:
+        yield
+    finally:
+        state.primary_only = previous
+
+
+class ReplicaRouter:
+    """Роутер Django для ``DATABASE_ROUTERS``."""
+
+    def db_for_read(self, model, **hints):
+        state = current_state()
+        if (
+            state is None
+            or model._meta.app_label not in settings.DATABASE_REPLICA_APPS
+        ):
+            return None
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = current_state()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему на реплики приносит репликация, а не migrate.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,149 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Обертка выполнения SQL ставится на каждое соединение с базой и
+замеряет все запросы. Запрос дольше ``SLOW_QUERY_MS`` миллисекунд
+попадает в ``SLOW_QUERY_LOG`` строкой JSON: SQL, параметры,
+представление и действие запроса к API и план ``EXPLAIN`` для SELECT
+(``EXPLAIN ANALYZE`` на PostgreSQL при ``SLOW_QUERY_EXPLAIN_ANALYZE``;
+он выполняет запрос повторно).
+
+Записывается доля ``SLOW_QUERY_SAMPLE_RATE`` медленных запросов и не
+больше ``SLOW_QUERY_RATE`` записей на процесс, чтобы при деградации
+базы журнал сам не стал нагрузкой. Без ``SLOW_QUERY_LOG`` обертка
+только сравнивает время с порогом.
+"""
+import json
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+from api.throttling import TokenBucket, parse_rate
+from db.routers import current_state
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from metrics.http import view_labels
+
+PARAM_MAX_LENGTH = 200
+
+
+@lru_cache(maxsize=None)
+def get_logger(path):
+    logger = logging.getLogger("db.slow_queries")
+    logger.propagate = False
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+        old.close()
+    logger.addHandler(handler)
+    return logger
+
+
+@lru_cache(maxsize=None)
+def get_limiter(rate):
+    return TokenBucket(*parse_rate(rate), max_keys=1)
+
+
+def should_log():
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return False
+    return get_limiter(settings.SLOW_QUERY_RATE).consume("")[0]
+
+
+def short(value):
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > PARAM_MAX_LENGTH:
+        return text[:PARAM_MAX_LENGTH] + "…"
+    return text
+
+
+def origin():
+    """Метод, путь, представление и действие текущего запроса к API."""
+    state = current_state()
+    if state is None:
+        return {}
+    request = state.request
+    view, action = view_labels(
+        getattr(request, "resolver_match", None), request.method
+    )
+    return {
+        "method": request.method,
+        "path": request.path,
+        "view": view,
+        "action": action,
+    }
+
+
+def explain(connection, sql, params):
+    """План запроса или None для запросов, которые не SELECT."""
+    if sql.lstrip()[:6].upper() != "SELECT":
+        return None
+    options = {}
+    if connection.vendor == "postgresql":
+        options["analyze"] = settings.SLOW_QUERY_EXPLAIN_ANALYZE
+    prefix = connection.ops.explain_query_prefix(**options)
+    # Курсор бэкенда минует обертки: EXPLAIN не считается запросом
+    # ответа и не попадает обратно в этот журнал.
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"{prefix} {sql}", params)
+        return [
+            " ".join(str(column) for column in row)
+            for row in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
+
+
+def log_slow_query(connection, sql, params, duration):
+    record = {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration * 1000, 2),
+        "alias": connection.alias,
+        "sql": sql,
+        "params": [short(param) for param in params or ()],
+        **origin(),
+    }
+    if settings.SLOW_QUERY_EXPLAIN:
+        try:
+            record["plan"] = explain(connection, sql, params)
+        except Exception as exc:
+            record["plan_error"] = str(exc)
+    get_logger(settings.SLOW_QUERY_LOG).warning(
+        json.dumps(record, ensure_ascii=False, default=str)
+    )
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    # Упавшие запросы тоже записываются: отмена по statement_timeout -
+    # как раз медленный запрос.
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        if (
+            duration * 1000 >= settings.SLOW_QUERY_MS
+            and settings.SLOW_QUERY_LOG
+            and not many
+            and should_log()
+        ):
+            log_slow_query(context["connection"], sql, params, duration)
+
+
+@receiver(connection_created)
+def install_wrapper(sender, connection, **kwargs):
+    # В начало списка: ``execute_wrapper()`` снимает последнюю обертку,
+    # и обертка, поставленная внутри него, не должна оказаться снятой.
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, slow_query_wrapper)
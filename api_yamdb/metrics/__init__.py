@@ -0,0 +1,7 @@
+"""Метрики запросов к API в текстовом формате Prometheus.
+
+Каждый процесс копит счетчики в памяти и раз в
+``METRICS_FLUSH_INTERVAL`` секунд записывает их в свой файл в
+``METRICS_DIR``; ``/metrics`` складывает файлы всех процессов. Без
+``METRICS_DIR`` отдаются счетчики только ответившего процесса.
+"""
@@ -0,0 +1,64 @@
+"""Метрики HTTP-запросов с метками представления и действия."""
+from metrics.store import COUNTER, HISTOGRAM, Family, get_store
+
+REQUESTS = Family(
+    "yamdb_http_requests_total",
+    COUNTER,
+    "Обработанные запросы по представлению, действию, методу и статусу.",
+)
+DURATION = Family(
+    "yamdb_http_request_duration_seconds",
+    HISTOGRAM,
+    "Время обработки запроса.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERIES = Family(
+    "yamdb_http_request_db_queries",
+    HISTOGRAM,
+    "SQL-запросов на один HTTP-запрос.",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+RESPONSE_SIZE = Family(
+    "yamdb_http_response_size_bytes",
+    HISTOGRAM,
+    "Размер тела ответа; потоковые ответы не учитываются.",
+    buckets=(100, 1000, 4000, 16000, 64000, 256000, 1000000),
+)
+
+
+def view_labels(match, method):
+    """(представление, действие) для ``ResolverMatch`` запроса.
+
+    Для вьюсетов действие - ``list``, ``retrieve``, ``create`` и т.п.,
+    для остальных представлений DRF - метод. Ненайденные адреса
+    собираются под одной меткой, чтобы путь не попадал в метки.
+    """
+    if match is None:
+        return "unresolved", ""
+    function = match.func
+    view = getattr(function, "cls", None) or getattr(
+        function, "view_class", None
+    )
+    name = view.__name__ if view is not None else match._func_path
+    actions = getattr(function, "actions", None)
+    if actions is not None:
+        return name, actions.get(method.lower(), "")
+    return name, method.lower()
+
+
+def observe_request(match, request, response, duration):
+    view, action = view_labels(match, request.method)
+    labels = (("action", action), ("view", view))
+    store = get_store()
+    store.inc(
+        REQUESTS,
+        labels
+        + (("method", request.method), ("status", str(response.status_code))),
+    )
+    store.observe(DURATION, labels, duration)
+    query_count = getattr(request, "query_count", None)
+    if query_count is not None:
+        store.observe(QUERIES, labels, query_count)
+    if not response.streaming:
+        store.observe(RESPONSE_SIZE, labels, len(response.content))
+    store.maybe_flush()
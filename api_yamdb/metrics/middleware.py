@@ -0,0 +1,26 @@
+import time
+
+from metrics.http import observe_request
+
+
+class MetricsMiddleware:
+    """Записывает метрики каждого запроса.
+
+    Стоит в ``MIDDLEWARE`` первым, чтобы время включало остальные
+    middleware, а ``QueryCountMiddleware`` уже успел выставить
+    ``request.query_count``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        observe_request(
+            getattr(request, "resolver_match", None),
+            request,
+            response,
+            time.perf_counter() - started,
+        )
+        return response
@@ -0,0 +1,145 @@
+"""Хранилище счетчиков процесса и их сложение по файлам процессов."""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+from math import inf
+
+from django.conf import settings
+
+logger = logging.getLogger("metrics")
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+FILE_SUFFIX = ".metrics.json"
+
+FAMILIES = {}
+
+
+class Family:
+    """Описание метрики: имя, тип, справка и границы корзин гистограммы."""
+
+    def __init__(self, name, kind, documentation, buckets=()):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.buckets = (*buckets, inf)
+        FAMILIES[name] = self
+
+
+class MetricsStore:
+    """Счетчики одного процесса.
+
+    Ключ значения - (метрика, суффикс, метки, ``le``), где суффикс -
+    ``_bucket``, ``_sum``, ``_count`` гистограммы или пустая строка.
+    Блокировка держится только на время сложения чисел; файл пишется
+    вне ее целиком и подменяется атомарно, так что читатели никогда не
+    видят его наполовину записанным.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+        self.flushed_at = 0.0
+        self.pid = None
+        self.path = None
+
+    def check_pid(self):
+        # После fork (gunicorn --preload) у дочернего процесса свои
+        # счетчики и свой файл: унаследованные значения уже учтены
+        # в файле родителя.
+        pid = os.getpid()
+        if pid != self.pid:
+            self.pid = pid
+            self.values.clear()
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                name = f"{pid}-{uuid.uuid4().hex}{FILE_SUFFIX}"
+                self.path = os.path.join(self.directory, name)
+
+    def inc(self, family, labels, amount=1):
+        with self.lock:
+            self.check_pid()
+            self.values[family.name, "", labels, None] += amount
+
+    def observe(self, family, labels, value):
+        with self.lock:
+            self.check_pid()
+            # Пустые корзины тоже хранятся: Prometheus ждет все границы.
+            for bound in family.buckets:
+                self.values[family.name, "_bucket", labels, bound] += (
+                    value <= bound
+                )
+            self.values[family.name, "_sum", labels, None] += value
+            self.values[family.name, "_count", labels, None] += 1
+
+    def snapshot(self):
+        with self.lock:
+            self.check_pid()
+            return dict(self.values)
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        if not self.directory:
+            return
+        values = self.snapshot()
+        # Свой временный файл у каждого потока: сбросы могут совпасть.
+        temporary = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w") as output:
+                json.dump(dump(values), output)
+            os.replace(temporary, self.path)
+        except OSError:
+            logger.warning("Cannot write metrics to %s", self.path)
+
+    def collect(self):
+        """Сумма счетчиков всех процессов (или только этого)."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        total = defaultdict(float)
+        for name in os.listdir(self.directory):
+            if not name.endswith(FILE_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as source:
+                    rows = json.load(source)
+            except (OSError, ValueError):
+                continue
+            for key, value in load(rows):
+                total[key] += value
+        return total
+
+
+def dump(values):
+    return [
+        [name, suffix, list(labels), le, value]
+        for (name, suffix, labels, le), value in values.items()
+    ]
+
+
+def load(rows):
+    for name, suffix, labels, le, value in rows:
+        labels = tuple(tuple(pair) for pair in labels)
+        # JSON хранит бесконечность как Infinity, а float ее понимает.
+        yield (name, suffix, labels, le if le is None else float(le)), value
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    store = MetricsStore(
+        settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL
+    )
+    atexit.register(store.flush)
+    return store
@@ -0,0 +1,64 @@
+from math import inf
+
+from django.http import HttpResponse
+from metrics.store import FAMILIES, get_store
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SUFFIXES = {"": 0, "_bucket": 0, "_sum": 1, "_count": 2}
+
+
+def format_value(value):
+    if value == inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def format_labels(labels, le):
+    if le is not None:
+        labels = (*labels, ("le", format_value(le)))
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def render(values):
+    """Текстовый формат Prometheus для значений ``MetricsStore``."""
+    samples = {}
+    for (name, suffix, labels, le), value in values.items():
+        samples.setdefault(name, []).append((labels, suffix, le, value))
+    lines = []
+    for name, family in FAMILIES.items():
+        if name not in samples:
+            continue
+        lines.append(f"# HELP {name} {family.documentation}")
+        lines.append(f"# TYPE {name} {family.kind}")
+        # Корзины гистограммы - по возрастанию ``le``, затем _sum и _count.
+        rows = sorted(
+            samples[name],
+            key=lambda row: (row[0], SUFFIXES[row[1]], row[2] or 0),
+        )
+        for labels, suffix, le, value in rows:
+            lines.append(
+                f"{name}{suffix}{format_labels(labels, le)} "
+                f"{format_value(value)}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def metrics(request):
+    """``GET /metrics``: метрики всех процессов из ``METRICS_DIR``."""
+    return HttpResponse(
+        render(get_store().collect()), content_type=CONTENT_TYPE
+    )
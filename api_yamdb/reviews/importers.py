@@ -0,0 +1,128 @@
+from itertools import islice
+
+from django.db import connection, transaction
+from rest_framework.exceptions import ValidationError
+from reviews.models import Category, Genre, Title, TitleGenre
+from reviews.signals import titles_imported
+from reviews.validators import validate_year
+
+
+def parse_genres(value):
+    """Жанры строки: список слагов или строка через запятую."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [slug.strip() for slug in value if slug and slug.strip()]
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TitleImporter:
+    """Массовое создание произведений пачками.
+
+    На каждую пачку выполняется по одному запросу за категориями и
+    жанрами и по одному ``bulk_create`` для ``Title`` и ``TitleGenre``.
+    Ошибочные строки попадают в отчет и не прерывают загрузку.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self.created = []
+        self.errors = []
+
+    @property
+    def report(self):
+        return {
+            "created": len(self.created),
+            "ids": self.created,
+            "errors": self.errors,
+        }
+
+    def run(self, rows):
+        for offset, chunk in enumerate(chunked(rows, self.chunk_size)):
+            self.import_chunk(chunk, start=offset * self.chunk_size + 1)
+        return self.report
+
+    def import_chunk(self, rows, start=1):
+        categories = self.fetch(
+            Category, {row.get("category") for row in rows}
+        )
+        genres = self.fetch(
+            Genre,
+            {slug for row in rows for slug in parse_genres(row.get("genre"))},
+        )
+        titles, title_genres = [], []
+        for line, row in enumerate(rows, start=start):
+            try:
+                title, row_genres = self.build(row, categories, genres)
+            except ValidationError as error:
+                self.errors.append({"row": line, "errors": error.detail})
+                continue
+            titles.append(title)
+            title_genres.append(row_genres)
+        if not titles:
+            return
+        with transaction.atomic():
+            self.save_titles(titles)
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title=title, genre=genre)
+                for title, row_genres in zip(titles, title_genres)
+                for genre in row_genres
+            )
+        self.created.extend(title.pk for title in titles)
+        titles_imported.send(sender=Title, titles=titles)
+
+    @staticmethod
+    def fetch(model, slugs):
+        slugs = [slug for slug in slugs if slug]
+        return model.objects.in_bulk(slugs, field_name="slug")
+
+    @staticmethod
+    def build(row, categories, genres):
+        errors = {}
+        name = (row.get("name") or "").strip()
+        if not name:
+            errors["name"] = ["Обязательное поле."]
+        elif len(name) > Title._meta.get_field("name").max_length:
+            errors["name"] = ["Слишком длинное название."]
+        year = None
+        try:
+            year = int(row.get("year"))
+            validate_year(year)
+        except (TypeError, ValueError):
+            errors["year"] = ["Год должен быть целым числом."]
+        except ValidationError as error:
+            errors["year"] = error.detail
+        category = categories.get(row.get("category"))
+        if row.get("category") and category is None:
+            errors["category"] = [f"Категория {row['category']} не найдена."]
+        slugs = parse_genres(row.get("genre"))
+        missing = [slug for slug in slugs if slug not in genres]
+        if missing:
+            errors["genre"] = [f"Жанр {slug} не найден." for slug in missing]
+        if errors:
+            raise ValidationError(errors)
+        title = Title(
+            name=name,
+            year=year,
+            description=row.get("description") or "",
+            category=category,
+        )
+        return title, [genres[slug] for slug in dict.fromkeys(slugs)]
+
+    @staticmethod
+    def save_titles(titles):
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+            return
+        # SQLite не возвращает первичные ключи из bulk_create.
+        for title in titles:
+            title.save(force_insert=True)
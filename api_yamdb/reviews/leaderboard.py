@@ -0,0 +1,57 @@
+"""Байесовская оценка произведений для рейтинга лучших.
+
+Оценка ``(score_sum + m * C) / (review_count + m)`` тянет среднее
+произведения с малым числом отзывов к средней оценке по всему каталогу
+``C``; ``m`` - число отзывов, после которого собственное среднее
+начинает перевешивать (``LEADERBOARD_MIN_VOTES``).
+
+``C`` меняется медленно, поэтому хранится в кэше и при записи отзыва
+не пересчитывается; команда ``rebuild_rankings`` обновляет ее и
+пересчитывает все строки рейтинга.
+"""
+from api.cache import get_cache
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, FloatField, Sum
+from django.db.models.functions import Cast
+
+MEAN_CACHE_KEY = "reviews:leaderboard:mean"
+# Середина шкалы оценок, пока в каталоге нет ни одного отзыва.
+DEFAULT_MEAN = 5.5
+
+
+def compute_global_mean():
+    """Средняя оценка по всем отзывам из счетчиков произведений."""
+    from reviews.models import Title
+
+    totals = Title.objects.aggregate(
+        score_sum=Sum("score_sum"), review_count=Sum("review_count")
+    )
+    if not totals["review_count"]:
+        return DEFAULT_MEAN
+    return totals["score_sum"] / totals["review_count"]
+
+
+def refresh_global_mean():
+    mean = compute_global_mean()
+    get_cache().set(MEAN_CACHE_KEY, mean, settings.LEADERBOARD_MEAN_TIMEOUT)
+    return mean
+
+
+def global_mean():
+    mean = get_cache().get(MEAN_CACHE_KEY)
+    if mean is not None:
+        return mean
+    return refresh_global_mean()
+
+
+def bayesian_score(mean=None, min_votes=None):
+    """Выражение байесовской оценки над счетчиками ``Title``."""
+    if mean is None:
+        mean = global_mean()
+    if min_votes is None:
+        min_votes = settings.LEADERBOARD_MIN_VOTES
+    return ExpressionWrapper(
+        (Cast(F("score_sum"), FloatField()) + min_votes * mean)
+        / (Cast(F("review_count"), FloatField()) + min_votes),
+        output_field=FloatField(),
+    )
@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from reviews.exports import EXPORTS, FORMATS, export
+
+
+def aware_datetime(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise CommandError(f"Неверная дата: {value}")
+    if timezone.is_naive(moment):
+        return timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает отзывы или комментарии в NDJSON или CSV, не загружая "
+        "их в память целиком."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind", choices=sorted(EXPORTS), default="reviews"
+        )
+        parser.add_argument(
+            "--format", choices=sorted(FORMATS), default="ndjson"
+        )
+        parser.add_argument("--title", type=int, help="id произведения")
+        parser.add_argument("--author", help="username автора")
+        parser.add_argument("--since", help="pub_date не раньше (ISO 8601)")
+        parser.add_argument("--until", help="pub_date раньше (ISO 8601)")
+        parser.add_argument(
+            "--output", help="Файл для выгрузки; по умолчанию stdout."
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        filters = {
+            "title": options["title"],
+            "author": options["author"],
+            "since": options["since"] and aware_datetime(options["since"]),
+            "until": options["until"] and aware_datetime(options["until"]),
+        }
+        blocks = export(
+            options["kind"],
+            options["format"],
+            chunk_size=options["chunk_size"],
+            **filters,
+        )
+        if options["output"]:
+            with open(
+                options["output"], "w", encoding="utf-8", newline=""
+            ) as output:
+                output.writelines(blocks)
+        else:
+            sys.stdout.writelines(blocks)
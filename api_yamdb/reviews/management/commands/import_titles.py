@@ -0,0 +1,54 @@
+import csv
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from reviews.importers import TitleImporter
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+class Command(BaseCommand):
+    help = (
+        "Массово загружает произведения из CSV или JSONL. Колонки: "
+        "name, year, description, category (слаг), genre (слаги через "
+        "запятую или список в JSONL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу с произведениями.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Формат файла; по умолчанию определяется по расширению.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or os.path.splitext(path)[1][1:]
+        if file_format not in READERS:
+            raise CommandError(f"Неизвестный формат файла: {file_format}")
+        importer = TitleImporter(chunk_size=options["chunk_size"])
+        with open(path, encoding="utf-8", newline="") as stream:
+            report = importer.run(READERS[file_format](stream))
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано произведений: {report['created']}, "
+                f"ошибок: {len(report['errors'])}"
+            )
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.leaderboard import refresh_global_mean
+from reviews.models import Title, TitleRanking
+from reviews.signals import ratings_recounted
+
+
+class Command(BaseCommand):
+    help = (
+        "Обновляет среднюю оценку по каталогу и пересчитывает рейтинг "
+        "лучших произведений. Запускается периодически, например из cron."
+    )
+
+    def handle(self, *args, **options):
+        mean = refresh_global_mean()
+        with transaction.atomic():
+            count = TitleRanking.objects.rebuild(mean)
+            ratings_recounted.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Средняя оценка: {mean:.3f}, произведений в рейтинге: {count}"
+            )
+        )
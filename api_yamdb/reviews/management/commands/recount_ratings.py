@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Avg, Count, Sum
+from reviews.models import (SCORE_FIELDS, Review, Title,
+                            TitleScoreDistribution, score_counts)
+from reviews.signals import ratings_recounted
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает рейтинг, количество отзывов и распределение оценок "
+        "произведений."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить счетчики, ничего не изменяя.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = (
+                self.find_mismatches() + self.find_distribution_mismatches()
+            )
+            for title_id, stored, actual in mismatches:
+                self.stdout.write(
+                    f"title {title_id}: stored {stored}, actual {actual}"
+                )
+            if mismatches:
+                raise CommandError(
+                    f"Найдено расхождений: {len(mismatches)}"
+                )
+            self.stdout.write(self.style.SUCCESS("Счетчики в порядке"))
+            return
+        with transaction.atomic():
+            updated = Title.objects.recount_ratings()
+            distributions = TitleScoreDistribution.objects.rebuild()
+            ratings_recounted.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Пересчитано произведений: {updated}, "
+                f"распределений оценок: {distributions}"
+            )
+        )
+
+    def find_mismatches(self):
+        actual = {
+            row["title"]: (row["count"], row["sum"], row["avg"])
+            for row in Review.objects.order_by()
+            .values("title")
+            .annotate(count=Count("pk"), sum=Sum("score"), avg=Avg("score"))
+        }
+        mismatches = []
+        stored_rows = Title.objects.values_list(
+            "pk", "review_count", "score_sum", "rating"
+        )
+        for title_id, count, score_sum, rating in stored_rows.iterator():
+            expected = actual.get(title_id, (0, 0, None))
+            stored = (count, score_sum, rating)
+            if not self.same(stored, expected):
+                mismatches.append((title_id, stored, expected))
+        return mismatches
+
+    def find_distribution_mismatches(self):
+        fields = list(SCORE_FIELDS.values())
+        zero = dict.fromkeys(fields, 0)
+        actual = {
+            row.pop("title"): row
+            for row in Review.objects.order_by()
+            .values("title")
+            .annotate(**score_counts())
+        }
+        stored = {
+            row.pop("title"): row
+            for row in TitleScoreDistribution.objects.values("title", *fields)
+        }
+        return [
+            (title_id, stored.get(title_id, zero), actual.get(title_id, zero))
+            for title_id in sorted(actual.keys() | stored.keys())
+            if stored.get(title_id, zero) != actual.get(title_id, zero)
+        ]
+
+    @staticmethod
+    def same(stored, expected):
+        if stored[:2] != expected[:2]:
+            return False
+        if stored[2] is None or expected[2] is None:
+            return stored[2] is expected[2]
+        return abs(stored[2] - expected[2]) < 1e-9
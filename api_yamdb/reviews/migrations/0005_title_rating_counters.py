@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:04
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_counters(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    Title = apps.get_model("reviews", "Title")
+    reviews = (
+        Review.objects.filter(title=OuterRef("pk")).order_by().values("title")
+    )
+    Title.objects.update(
+        review_count=Coalesce(
+            Subquery(reviews.annotate(value=Count("pk")).values("value")), 0
+        ),
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum("score")).values("value")), 0
+        ),
+        rating=Subquery(
+            reviews.annotate(value=Avg("score")).values("value"),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0004_alter_title_year"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="rating",
+            field=models.FloatField(
+                default=None,
+                editable=False,
+                null=True,
+                verbose_name="Title rating",
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="review_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="Title review count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_sum",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="Title score sum"
+            ),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
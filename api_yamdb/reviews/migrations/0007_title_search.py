@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:14
+
+import django.contrib.postgres.search
+from django.db import migrations
+from reviews import search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0006_pub_date_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(search.install, search.uninstall),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:18
+
+from django.db import migrations, models
+from django.db.models import Min
+
+# name__istartswith на PostgreSQL превращается в
+# UPPER("name"::text) LIKE UPPER('...%'); обычный B-tree для такого
+# условия не подходит, нужен индекс по тому же выражению с
+# text_pattern_ops. Django 2.2 не умеет индексы по выражениям.
+NAME_PREFIX_INDEX = "reviews_title_name_prefix_idx"
+
+
+def delete_duplicate_title_genres(apps, schema_editor):
+    """Оставляет из повторяющихся пар (жанр, произведение) первую."""
+    TitleGenre = apps.get_model("reviews", "TitleGenre")
+    first_ids = (
+        TitleGenre.objects.order_by()
+        .values("genre", "title")
+        .annotate(first_id=Min("id"))
+        .values("first_id")
+    )
+    TitleGenre.objects.exclude(id__in=first_ids).delete()
+
+
+def create_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {NAME_PREFIX_INDEX} ON reviews_title "
+            "(UPPER(name::text) text_pattern_ops)"
+        )
+
+
+def drop_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {NAME_PREFIX_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0007_title_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_title_genres, migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name="titlegenre",
+            unique_together={("genre", "title")},
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["category", "year"], name="title_category_year_idx"
+            ),
+        ),
+        migrations.RunPython(create_name_prefix_index, drop_name_prefix_index),
+    ]
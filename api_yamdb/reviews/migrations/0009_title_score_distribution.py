@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_score_distribution(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    TitleScoreDistribution = apps.get_model(
+        "reviews", "TitleScoreDistribution"
+    )
+    counts = (
+        Review.objects.order_by()
+        .values("title")
+        .annotate(
+            **{
+                f"score_{score}": Count("pk", filter=Q(score=score))
+                for score in range(1, 11)
+            }
+        )
+    )
+    TitleScoreDistribution.objects.bulk_create(
+        (
+            TitleScoreDistribution(title_id=row.pop("title"), **row)
+            for row in counts.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0008_title_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TitleScoreDistribution",
+            fields=[
+                (
+                    "title",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score_distribution",
+                        serialize=False,
+                        to="reviews.Title",
+                        verbose_name="Title",
+                    ),
+                ),
+                ("score_1", models.IntegerField(default=0)),
+                ("score_2", models.IntegerField(default=0)),
+                ("score_3", models.IntegerField(default=0)),
+                ("score_4", models.IntegerField(default=0)),
+                ("score_5", models.IntegerField(default=0)),
+                ("score_6", models.IntegerField(default=0)),
+                ("score_7", models.IntegerField(default=0)),
+                ("score_8", models.IntegerField(default=0)),
+                ("score_9", models.IntegerField(default=0)),
+                ("score_10", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(
+            fill_score_distribution, migrations.RunPython.noop
+        ),
+    ]
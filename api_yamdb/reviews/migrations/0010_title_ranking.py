@@ -0,0 +1,74 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from reviews.leaderboard import DEFAULT_MEAN, bayesian_score
+
+
+def fill_title_ranking(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    TitleRanking = apps.get_model("reviews", "TitleRanking")
+    totals = Title.objects.aggregate(
+        score_sum=Sum("score_sum"), review_count=Sum("review_count")
+    )
+    mean = DEFAULT_MEAN
+    if totals["review_count"]:
+        mean = totals["score_sum"] / totals["review_count"]
+    rows = (
+        Title.objects.filter(review_count__gt=0)
+        .annotate(value=bayesian_score(mean))
+        .values_list("pk", "value", "review_count")
+    )
+    TitleRanking.objects.bulk_create(
+        (
+            TitleRanking(title_id=pk, score=score, review_count=count)
+            for pk, score, count in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0009_title_score_distribution"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TitleRanking",
+            fields=[
+                (
+                    "title",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="ranking",
+                        serialize=False,
+                        to="reviews.Title",
+                        verbose_name="Title",
+                    ),
+                ),
+                (
+                    "score",
+                    models.FloatField(
+                        default=0, verbose_name="Bayesian score"
+                    ),
+                ),
+                (
+                    "review_count",
+                    models.IntegerField(
+                        default=0, verbose_name="Title review count"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="titleranking",
+            index=models.Index(
+                fields=["-score", "title"], name="title_ranking_score_idx"
+            ),
+        ),
+        migrations.RunPython(fill_title_ranking, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,63 @@
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from reviews.leaderboard import bayesian_score
 from reviews.validators import validate_year
 
+RATING_FIELDS = ("rating", "review_count", "score_sum")
+# Поля, которые поддерживает сама база данных или apply_review_delta;
+# обычное сохранение произведения их не перезаписывает.
+MAINTAINED_FIELDS = RATING_FIELDS + ("search_vector",)
+SCORE_FIELDS = {score: f"score_{score}" for score in range(1, 11)}
+
+
+class TitleQuerySet(models.QuerySet):
+    def apply_review_delta(self, title_id, count_delta, score_delta):
+        """Атомарно сдвигает счетчики отзывов и пересчитывает рейтинг."""
+        new_count = F("review_count") + count_delta
+        new_sum = F("score_sum") + score_delta
+        return self.filter(pk=title_id).update(
+            review_count=new_count,
+            score_sum=new_sum,
+            rating=Case(
+                When(
+                    review_count__lte=-count_delta,
+                    then=Value(None),
+                ),
+                default=(
+                    Cast(new_sum, output_field=FloatField())
+                    / Cast(new_count, output_field=FloatField())
+                ),
+                output_field=FloatField(),
+            ),
+        )
+
+    def recount_ratings(self):
+        """Пересчитывает счетчики рейтинга по таблице отзывов."""
+        reviews = (
+            Review.objects.filter(title=OuterRef("pk"))
+            .order_by()
+            .values("title")
+        )
+        return self.update(
+            review_count=Coalesce(
+                Subquery(reviews.annotate(value=Count("pk")).values("value")),
+                0,
+            ),
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(value=Sum("score")).values("value")),
+                0,
+            ),
+            rating=Subquery(
+                reviews.annotate(value=Avg("score")).values("value"),
+                output_field=FloatField(),
+            ),
+        )
+
 
 class Title(models.Model):
     name = models.CharField(verbose_name="Ttitle name", max_length=256)
@@ -23,10 +78,201 @@ class Title(models.Model):
         related_name="titles",
         verbose_name="Title genres",
     )
+    rating = models.FloatField(
+        verbose_name="Title rating", null=True, default=None, editable=False
+    )
+    review_count = models.IntegerField(
+        verbose_name="Title review count", default=0, editable=False
+    )
+    score_sum = models.IntegerField(
+        verbose_name="Title score sum", default=0, editable=False
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Счетчики рейтинга меняются только через apply_review_delta,
+        # а поисковый вектор - триггером, поэтому обычное сохранение
+        # не должно затирать их устаревшими значениями из памяти.
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["category", "year"], name="title_category_year_idx"
+            ),
+        ]
+
+
+def score_counts():
+    """Агрегаты числа отзывов с каждой оценкой для ``annotate``."""
+    return {
+        field: Count("pk", filter=Q(score=score))
+        for score, field in SCORE_FIELDS.items()
+    }
+
+
+class ScoreDistributionQuerySet(models.QuerySet):
+    def apply_score_deltas(self, title_id, deltas):
+        """Сдвигает счетчики оценок ``{оценка: изменение}`` одним UPDATE.
+
+        Строка гистограммы создается при первом отзыве на произведение;
+        ``ignore_conflicts`` избавляет от гонки с параллельным запросом,
+        который успел создать ее раньше.
+        """
+        changes = {
+            SCORE_FIELDS[score]: F(SCORE_FIELDS[score]) + delta
+            for score, delta in deltas.items()
+            if delta and score in SCORE_FIELDS
+        }
+        if not changes or self.filter(title_id=title_id).update(**changes):
+            return
+        if all(delta <= 0 for delta in deltas.values()):
+            # Нечего уменьшать: отзыв удаляется вместе с произведением
+            # (строка гистограммы уже удалена каскадом) или гистограмма
+            # рассинхронизирована и ее поправит recount_ratings.
+            return
+        self.bulk_create(
+            [self.model(title_id=title_id)], ignore_conflicts=True
+        )
+        self.filter(title_id=title_id).update(**changes)
+
+    def rebuild(self, titles=None):
+        """Пересобирает гистограммы по таблице отзывов.
+
+        ``titles`` - queryset произведений, по умолчанию все.
+        """
+        reviews = Review.objects.order_by()
+        rows = self.all()
+        if titles is not None:
+            reviews = reviews.filter(title__in=titles.values("pk"))
+            rows = rows.filter(title__in=titles.values("pk"))
+        rows.delete()
+        counts = reviews.values("title").annotate(**score_counts())
+        created = self.bulk_create(
+            (
+                self.model(title_id=row.pop("title"), **row)
+                for row in counts.iterator()
+            ),
+            batch_size=1000,
+        )
+        return len(created)
+
+
+class TitleScoreDistribution(models.Model):
+    """Число отзывов с каждой оценкой от 1 до 10 для произведения."""
+
+    title = models.OneToOneField(
+        "Title",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="score_distribution",
+        verbose_name="Title",
+    )
+    score_1 = models.IntegerField(default=0)
+    score_2 = models.IntegerField(default=0)
+    score_3 = models.IntegerField(default=0)
+    score_4 = models.IntegerField(default=0)
+    score_5 = models.IntegerField(default=0)
+    score_6 = models.IntegerField(default=0)
+    score_7 = models.IntegerField(default=0)
+    score_8 = models.IntegerField(default=0)
+    score_9 = models.IntegerField(default=0)
+    score_10 = models.IntegerField(default=0)
+
+    objects = ScoreDistributionQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.title_id}: {self.scores}"
+
+    @property
+    def scores(self):
+        return {
+            score: getattr(self, field)
+            for score, field in SCORE_FIELDS.items()
+        }
+
+
+class TitleRankingQuerySet(models.QuerySet):
+    def refresh(self, title_id, create=True):
+        """Пересчитывает строку рейтинга по счетчикам произведения.
+
+        Строка создается при первом отзыве, если ``create`` истинно.
+        """
+        title = Title.objects.filter(pk=title_id)
+        values = {
+            "score": Subquery(
+                title.annotate(value=bayesian_score()).values("value")
+            ),
+            "review_count": Subquery(title.values("review_count")),
+        }
+        if self.filter(title_id=title_id).update(**values) or not create:
+            return
+        self.bulk_create(
+            [self.model(title_id=title_id)], ignore_conflicts=True
+        )
+        self.filter(title_id=title_id).update(**values)
+
+    def rebuild(self, mean=None, batch_size=1000):
+        """Пересоздает рейтинг для всех произведений с отзывами."""
+        rows = (
+            Title.objects.filter(review_count__gt=0)
+            .annotate(value=bayesian_score(mean))
+            .values_list("pk", "value", "review_count")
+        )
+        self.all().delete()
+        created = self.bulk_create(
+            (
+                self.model(title_id=pk, score=score, review_count=count)
+                for pk, score, count in rows.iterator()
+            ),
+            batch_size=batch_size,
+        )
+        return len(created)
+
+
+class TitleRanking(models.Model):
+    """Байесовская оценка произведения для списка лучших."""
+
+    title = models.OneToOneField(
+        "Title",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="ranking",
+        verbose_name="Title",
+    )
+    score = models.FloatField(verbose_name="Bayesian score", default=0)
+    review_count = models.IntegerField(
+        verbose_name="Title review count", default=0
+    )
+
+    objects = TitleRankingQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.title_id}: {self.score}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-score", "title"], name="title_ranking_score_idx"
+            ),
+        ]
+
 
 class TitleGenre(models.Model):
     genre = models.ForeignKey(
@@ -93,8 +339,29 @@ class Review(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get("score")
+        instance._loaded_title_id = instance.__dict__.get("title_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется сигналом post_save в той же
+        # транзакции, что и сам отзыв.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+        self._loaded_score = self.score
+        self._loaded_title_id = self.title_id
+
     class Meta:
         unique_together = ("title", "author")
+        indexes = [
+            models.Index(
+                fields=["title", "pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -125,3 +392,11 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:15]
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["reviews", "pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
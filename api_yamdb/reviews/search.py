@@ -0,0 +1,150 @@
+"""Полнотекстовый поиск по названию и описанию произведений.
+
+В PostgreSQL поиск идет по колонке ``search_vector`` с GIN-индексом,
+которую поддерживает триггер. В SQLite (тесты) вместо нее служит
+теневая таблица FTS5 с триггерами на ``reviews_title``.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "simple"
+FTS_TABLE = "reviews_title_fts"
+
+POSTGRES_INSTALL = [
+    f"""
+    CREATE OR REPLACE FUNCTION reviews_title_search_vector() RETURNS trigger
+    AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(
+                to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A'
+            )
+            || setweight(
+                to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')),
+                'B'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DROP TRIGGER IF EXISTS reviews_title_search_vector ON reviews_title
+    """,
+    """
+    CREATE TRIGGER reviews_title_search_vector
+    BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector()
+    """,
+    "UPDATE reviews_title SET name = name",
+    """
+    CREATE INDEX IF NOT EXISTS reviews_title_search_idx
+    ON reviews_title USING gin (search_vector)
+    """,
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS reviews_title_search_idx",
+    "DROP TRIGGER IF EXISTS reviews_title_search_vector ON reviews_title",
+    "DROP FUNCTION IF EXISTS reviews_title_search_vector()",
+]
+
+SQLITE_TRIGGERS = {
+    "reviews_title_fts_insert": f"""
+        AFTER INSERT ON reviews_title BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+    "reviews_title_fts_delete": f"""
+        AFTER DELETE ON reviews_title BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    "reviews_title_fts_update": f"""
+        AFTER UPDATE OF name, description ON reviews_title BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE} (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, content='reviews_title', content_rowid='id'
+    )
+    """,
+    *(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS),
+    *(
+        f"CREATE TRIGGER {name} {body}"
+        for name, body in SQLITE_TRIGGERS.items()
+    ),
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    *(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+STATEMENTS = {
+    "postgresql": {
+        "install": POSTGRES_INSTALL,
+        "uninstall": POSTGRES_UNINSTALL,
+    },
+    "sqlite": {"install": SQLITE_INSTALL, "uninstall": SQLITE_UNINSTALL},
+}
+
+
+def _execute(schema_editor, operation):
+    statements = STATEMENTS.get(schema_editor.connection.vendor, {})
+    for statement in statements.get(operation, []):
+        schema_editor.execute(statement)
+
+
+def install(apps, schema_editor):
+    """Создает индекс и триггеры поиска; вызывается из миграций.
+
+    SQLite пересоздает таблицу при изменении ее схемы и теряет
+    триггеры, поэтому такие миграции должны вызывать ``install``
+    повторно.
+    """
+    _execute(schema_editor, "install")
+
+
+def uninstall(apps, schema_editor):
+    _execute(schema_editor, "uninstall")
+
+
+def fts5_query(text):
+    """Запрос FTS5, в котором каждое слово ищется как обычный текст."""
+    words = text.split()
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по запросу и сортирует по релевантности."""
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "id")
+        )
+    match = fts5_query(text)
+    if vendor != "sqlite" or not match:
+        return queryset.filter(name__icontains=text).order_by("id")
+    # bm25 тем меньше, чем релевантнее строка; название весит больше.
+    rank = RawSQL(
+        f"SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s AND rowid = reviews_title.id",
+        (match,),
+    )
+    return (
+        queryset.annotate(rank=rank)
+        .filter(rank__isnull=False)
+        .order_by("rank", "id")
+    )
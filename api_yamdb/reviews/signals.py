@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from reviews.models import Review, Title, TitleRanking, TitleScoreDistribution
+
+# Отправляется после массового создания произведений в обход save().
+titles_imported = Signal(providing_args=["titles"])
+# Отправляется после массового пересчета рейтингов в обход save().
+ratings_recounted = Signal()
+
+
+def apply_review(title_id, sign, score):
+    """Добавляет (``sign=1``) или убирает (``-1``) оценку произведения."""
+    Title.objects.apply_review_delta(title_id, sign, sign * score)
+    TitleScoreDistribution.objects.apply_score_deltas(title_id, {score: sign})
+    TitleRanking.objects.refresh(title_id)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_review(instance.title_id, 1, instance.score)
+        return
+    old_score = getattr(instance, "_loaded_score", None)
+    old_title_id = getattr(instance, "_loaded_title_id", None)
+    if old_score is None or old_title_id is None:
+        titles = Title.objects.filter(pk=instance.title_id)
+        titles.recount_ratings()
+        TitleScoreDistribution.objects.rebuild(titles)
+        TitleRanking.objects.refresh(instance.title_id)
+    elif old_title_id != instance.title_id:
+        # Отзыв перенесен к другому произведению.
+        apply_review(old_title_id, -1, old_score)
+        apply_review(instance.title_id, 1, instance.score)
+    elif old_score != instance.score:
+        Title.objects.apply_review_delta(
+            instance.title_id, 0, instance.score - old_score
+        )
+        TitleScoreDistribution.objects.apply_score_deltas(
+            instance.title_id, {old_score: -1, instance.score: 1}
+        )
+        TitleRanking.objects.refresh(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    Title.objects.apply_review_delta(instance.title_id, -1, -instance.score)
+    TitleScoreDistribution.objects.apply_score_deltas(
+        instance.title_id, {instance.score: -1}
+    )
+    # Строку рейтинга не создаем: произведение может удаляться целиком.
+    TitleRanking.objects.refresh(instance.title_id, create=False)
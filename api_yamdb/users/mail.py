@@ -0,0 +1,98 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingMail
+
+logger = logging.getLogger("users.mail")
+
+
+def enqueue_mail(subject, body, recipient):
+    """Ставит письмо в очередь в текущей транзакции."""
+    return OutgoingMail.objects.create(
+        subject=subject, body=body, recipient=recipient
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    delay = settings.MAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.MAIL_OUTBOX_MAX_DELAY))
+
+
+def send_pending(batch_size=None):
+    """Отправляет пачку писем из очереди через одно SMTP-соединение.
+
+    Строки блокируются на время отправки с ``SKIP LOCKED``, поэтому
+    несколько обработчиков не отправят одно письмо дважды. Возвращает
+    количество обработанных писем.
+    """
+    batch_size = batch_size or settings.MAIL_OUTBOX_BATCH_SIZE
+    with transaction.atomic():
+        batch = list(
+            OutgoingMail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=OutgoingMail.PENDING,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not batch:
+            return 0
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            logger.warning("Не удалось подключиться к почте: %s", error)
+            for mail in batch:
+                mark_failed(mail, error)
+        else:
+            try:
+                for mail in batch:
+                    deliver(mail, connection)
+            finally:
+                connection.close()
+        for mail in batch:
+            mail.save(
+                update_fields=[
+                    "status",
+                    "attempts",
+                    "next_attempt_at",
+                    "last_error",
+                    "sent_at",
+                ]
+            )
+    return len(batch)
+
+
+def deliver(mail, connection):
+    message = EmailMessage(
+        mail.subject,
+        mail.body,
+        settings.DEFAULT_MAIL,
+        [mail.recipient],
+        connection=connection,
+    )
+    try:
+        message.send()
+    except Exception as error:
+        logger.warning("Не удалось отправить письмо %s: %s", mail.pk, error)
+        mark_failed(mail, error)
+        return
+    mail.attempts += 1
+    mail.status = OutgoingMail.SENT
+    mail.sent_at = timezone.now()
+    mail.last_error = ""
+
+
+def mark_failed(mail, error):
+    mail.attempts += 1
+    mail.last_error = str(error)
+    if mail.attempts >= settings.MAIL_OUTBOX_MAX_ATTEMPTS:
+        mail.status = OutgoingMail.FAILED
+    else:
+        mail.next_attempt_at = timezone.now() + retry_delay(mail.attempts)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from users.mail import send_pending
+
+
+class Command(BaseCommand):
+    help = "Отправляет письма из очереди OutgoingMail."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Разобрать очередь один раз и завершиться.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда очередь пуста.",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_pending(options["batch_size"])
+            while sent:
+                self.stdout.write(f"Обработано писем: {sent}")
+                sent = send_pending(options["batch_size"])
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,106 @@
+import pytest
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='admin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='user', email='user@yamdb.fake', role='user'
+    )
+
+
+def make_client(user=None):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+    return client
+
+
+@pytest.fixture
+def anon_client():
+    return make_client()
+
+
+@pytest.fixture
+def user_client(user):
+    return make_client(user)
+
+
+@pytest.fixture
+def admin_client(admin):
+    return make_client(admin)
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    '''Каталог из нескольких произведений с отзывами и комментариями.'''
+    from reviews.models import (Category, Comment, Genre, Review, Title,
+                                TitleGenre)
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake', role='user'
+        )
+        for i in range(5)
+    ]
+    titles = []
+    for i in range(5):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            description='Описание',
+            year=2000 + i,
+            category=categories[i % len(categories)],
+        )
+        for genre in genres[: i % len(genres) + 1]:
+            TitleGenre.objects.create(title=title, genre=genre)
+        titles.append(title)
+    reviews = []
+    for index, author in enumerate(authors):
+        review = Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=index + 1
+        )
+        for _ in range(3):
+            Comment.objects.create(
+                reviews=review, author=authors[0], text='Комментарий'
+            )
+        reviews.append(review)
+    return {
+        'categories': categories,
+        'genres': genres,
+        'authors': authors,
+        'titles': titles,
+        'reviews': reviews,
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    from django.core.cache import caches
+
+    caches[settings.API_CACHE_ALIAS].clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_throttling():
+    from api.throttling import reset_buckets
+
+    reset_buckets()
@@ -0,0 +1,176 @@
+import asyncio
+from urllib.parse import quote
+
+import pytest
+
+
+def call(path, method='GET', headers=()):
+    '''Вызывает ASGI-приложение и возвращает (статус, заголовки, тело).'''
+    from api_yamdb.asgi import application
+
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': quote(query, safe='=&,').encode(),
+        'headers': [(b'host', b'testserver')] + [
+            (name.encode(), value.encode()) for name, value in headers
+        ],
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start, *body = messages
+    response_headers = {
+        name.decode().lower(): value.decode()
+        for name, value in start['headers']
+    }
+    content = b''.join(message.get('body', b'') for message in body)
+    return start['status'], response_headers, content
+
+
+def parity_urls(catalog):
+    title = catalog['titles'][0]
+    review = catalog['reviews'][0]
+    reviews = f'/api/v1/titles/{title.id}/reviews/'
+    comments = f'{reviews}{review.id}/comments/'
+    return [
+        '/api/v1/titles/',
+        '/api/v1/titles/?page=2',
+        '/api/v1/titles/?page=9',
+        '/api/v1/titles/?genre=genre-1&year_min=2001',
+        '/api/v1/titles/?q=Произведение',
+        f'/api/v1/titles/{catalog["titles"][2].id}/',
+        '/api/v1/titles/999/',
+        reviews,
+        f'{reviews}{review.id}/',
+        f'{reviews}999/',
+        '/api/v1/titles/999/reviews/',
+        comments,
+        f'{comments}{review.comments.first().id}/',
+        f'/api/v1/titles/{catalog["titles"][1].id}/reviews/{review.id}'
+        '/comments/',
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_reads_match_wsgi(anon_client, catalog):
+    from django.conf import settings
+    from django.core.cache import caches
+
+    for url in parity_urls(catalog):
+        caches[settings.API_CACHE_ALIAS].clear()
+        expected = anon_client.get(url)
+        caches[settings.API_CACHE_ALIAS].clear()
+        status, _, content = call(url)
+        assert (status, content) == (expected.status_code, expected.content)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_reads_share_validators_with_wsgi(anon_client, catalog):
+    for url in parity_urls(catalog)[:1] + parity_urls(catalog)[5:]:
+        expected = anon_client.get(url)
+        _, headers, _ = call(url)
+        assert headers.get('etag') == expected.get('ETag')
+
+
+def test_routes_fall_back_to_wsgi():
+    from api.async_views import match_route
+
+    def scope(path, query=b'', method='GET'):
+        return {
+            'type': 'http', 'method': method, 'path': path,
+            'query_string': query,
+        }
+
+    assert match_route(scope('/api/v1/titles/')) is not None
+    assert match_route(scope('/api/v1/titles/1/reviews/2/comments/'))
+    assert match_route(scope('/api/v1/titles/', method='POST')) is None
+    assert match_route(scope('/api/v1/titles/', b'fields=id')) is None
+    assert match_route(scope('/api/v1/titles/', b'page=last')) is None
+    assert match_route(scope('/api/v1/titles/abc/')) is None
+    assert match_route(scope('/api/v1/categories/')) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_nested_list_queries_run_together(catalog):
+    title = catalog['titles'][0]
+    review = catalog['reviews'][0]
+    status, headers, _ = call(
+        f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+    )
+    assert status == 200
+    # Проверка отзыва и страница комментариев.
+    assert headers['x-db-query-count'] == '2'
+    status, headers, _ = call(
+        f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+    )
+    assert headers['x-db-query-count'] == '1'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_path_handles_auth_and_conditional_requests(catalog, user):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    url = f'/api/v1/titles/{catalog["titles"][0].id}/reviews/'
+    token = f'Bearer {AccessToken.for_user(user)}'
+    status, headers, _ = call(url, headers=[('authorization', token)])
+    assert status == 200
+    status, _, _ = call(url, headers=[('if-none-match', headers['etag'])])
+    assert status == 304
+    status, _, _ = call(url, headers=[('authorization', 'Bearer invalid')])
+    assert status == 401
+    status, _, _ = call(url, method='POST')
+    assert status == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_reads_are_counted_in_metrics(catalog, settings):
+    from metrics.http import REQUESTS
+    from metrics.store import get_store
+
+    settings.METRICS_DIR = None
+    get_store.cache_clear()
+    call(f'/api/v1/titles/{catalog["titles"][0].id}/')
+    key = (
+        REQUESTS.name,
+        '',
+        (
+            ('action', 'retrieve'),
+            ('view', 'TitleViewSet'),
+            ('method', 'GET'),
+            ('status', '200'),
+        ),
+        None,
+    )
+    assert get_store().snapshot()[key] == 1
+    get_store.cache_clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pool_thread_checks_connections_once_per_request(catalog,
+                                                         monkeypatch):
+    import threading
+
+    threads = []
+    monkeypatch.setattr(
+        'api.async_views.close_old_connections',
+        lambda: threads.append(threading.get_ident()),
+    )
+    url = f'/api/v1/titles/{catalog["titles"][0].id}/reviews/'
+    status, _, _ = call(url)
+    assert status == 200
+    # При CONN_MAX_AGE=0 каждая проверка переоткрывает соединение.
+    assert threads
+    assert len(threads) == len(set(threads))
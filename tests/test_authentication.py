@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_authenticated_read_uses_cached_user(user_client, user,
+                                             django_assert_num_queries):
+    user_client.get('/api/v1/users/me/')
+    with django_assert_num_queries(0):
+        response = user_client.get('/api/v1/users/me/')
+    assert response.status_code == 200
+    assert response.json()['username'] == user.username
+
+
+@pytest.mark.django_db
+def test_cached_user_is_invalidated_on_save(user_client, user):
+    assert user_client.get('/api/v1/users/').status_code == 403
+    user.role = 'admin'
+    user.save()
+    assert user_client.get('/api/v1/users/').status_code == 200
+    user.delete()
+    assert user_client.get('/api/v1/users/me/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_patch_me_keeps_uncached_fields(user_client, user):
+    user.set_password('secret-password')
+    user.save()
+    user_client.get('/api/v1/users/me/')
+    response = user_client.patch('/api/v1/users/me/', data={'bio': 'О себе'})
+    assert response.status_code == 200
+    user.refresh_from_db()
+    assert user.bio == 'О себе'
+    assert user.check_password('secret-password')
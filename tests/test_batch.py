@@ -0,0 +1,132 @@
+import pytest
+
+
+def batch(client, requests, **options):
+    return client.post(
+        '/api/v1/batch/', data={'requests': requests, **options},
+        format='json',
+    )
+
+
+@pytest.fixture
+def sequential(settings):
+    # Потоки пула не видят данных тестовой транзакции.
+    settings.BATCH_MAX_WORKERS = 1
+
+
+@pytest.mark.django_db
+def test_batch_reads_title_page(anon_client, catalog, sequential):
+    title = catalog['titles'][0]
+    review = catalog['reviews'][0]
+    response = batch(anon_client, [
+        {'id': 'title', 'path': f'/api/v1/titles/{title.id}/'},
+        {'path': f'/api/v1/titles/{title.id}/reviews/'},
+        {'path': f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'},
+        {'path': '/api/v1/genres/?search=genre'},
+        {'path': '/api/v1/titles/999999/'},
+    ])
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['status'] for result in results] == [
+        200, 200, 200, 200, 404
+    ]
+    assert results[0]['id'] == 'title'
+    assert results[0]['body']['name'] == title.name
+    assert results[1]['id'] == 1
+    assert 'ETag' in results[0]['headers']
+
+
+@pytest.mark.django_db
+def test_batch_shares_authenticated_user(user_client, anon_client, catalog,
+                                         sequential):
+    title = catalog['titles'][1]
+    operation = {
+        'method': 'post',
+        'path': f'/api/v1/titles/{title.id}/reviews/',
+        'body': {'text': 'Отзыв', 'score': 9},
+    }
+    assert batch(anon_client, [operation]).json()['results'][0][
+        'status'] == 401
+    result = batch(user_client, [operation]).json()['results'][0]
+    assert result['status'] == 201
+    assert result['body']['author'] == 'user'
+
+
+@pytest.mark.django_db
+def test_atomic_batch_rolls_back(admin_client, catalog):
+    from reviews.models import Category
+
+    response = batch(admin_client, [
+        {'method': 'POST', 'path': '/api/v1/categories/',
+         'body': {'name': 'Новая', 'slug': 'batch-category'}},
+        {'method': 'POST', 'path': '/api/v1/categories/',
+         'body': {'name': 'Дубль', 'slug': 'batch-category'}},
+        {'path': '/api/v1/categories/'},
+    ], atomic=True)
+    assert response.status_code == 400
+    data = response.json()
+    assert data['rolled_back'] is True
+    assert [result['status'] for result in data['results']] == [201, 400]
+    assert not Category.objects.filter(slug='batch-category').exists()
+
+
+@pytest.mark.django_db
+def test_batch_validates_operations(anon_client, settings):
+    settings.BATCH_MAX_REQUESTS = 2
+    response = batch(anon_client, [{'path': '/admin/'}])
+    assert response.status_code == 400
+    response = batch(anon_client, [{'path': '/api/v1/batch/'}])
+    assert response.status_code == 400
+    response = batch(anon_client, [{'path': '/api/v1/genres/'}] * 3)
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_reads_run_in_thread_pool(anon_client, settings):
+    from reviews.models import Category, Genre
+
+    settings.BATCH_MAX_WORKERS = 4
+    Category.objects.create(name='Кино', slug='films')
+    Genre.objects.create(name='Драма', slug='drama')
+    response = batch(anon_client, [
+        {'path': '/api/v1/categories/'},
+        {'path': '/api/v1/genres/'},
+    ])
+    results = response.json()['results']
+    assert results[0]['body']['results'][0]['slug'] == 'films'
+    assert results[1]['body']['results'][0]['slug'] == 'drama'
+
+
+@pytest.mark.django_db
+def test_batch_delete_returns_no_content(admin_client, catalog, sequential):
+    from reviews.models import Review
+
+    review = catalog['reviews'][0]
+    response = batch(admin_client, [
+        {'method': 'DELETE',
+         'path': f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'},
+        {'path': f'/api/v1/titles/{review.title_id}/reviews/'},
+    ])
+    assert response.status_code == 200
+    deleted, listed = response.json()['results']
+    assert deleted['status'] == 204
+    assert deleted['body'] is None
+    assert listed['status'] == 200
+    assert not Review.objects.filter(pk=review.pk).exists()
+
+
+@pytest.mark.django_db
+def test_atomic_batch_with_delete(admin_client, catalog):
+    from reviews.models import Genre
+
+    genre = catalog['genres'][0]
+    response = batch(admin_client, [
+        {'method': 'DELETE', 'path': f'/api/v1/genres/{genre.slug}/'},
+        {'method': 'DELETE', 'path': '/api/v1/genres/missing/'},
+    ], atomic=True)
+    assert response.status_code == 400
+    data = response.json()
+    assert data['rolled_back'] is True
+    assert [result['status'] for result in data['results']] == [204, 404]
+    assert data['results'][0]['body'] is None
+    assert Genre.objects.filter(pk=genre.pk).exists()
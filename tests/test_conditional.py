@@ -0,0 +1,144 @@
+import pytest
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [
+    '/api/v1/titles/', '/api/v1/categories/', '/api/v1/genres/',
+])
+def test_if_none_match_returns_304_without_queries(
+        anon_client, catalog, django_assert_num_queries, url):
+    etag = anon_client.get(url)['ETag']
+    with django_assert_num_queries(0):
+        response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_reviews_etag_changes_after_new_review(anon_client, user_client,
+                                               catalog):
+    url = f'/api/v1/titles/{catalog["titles"][1].id}/reviews/'
+    etag = anon_client.get(url)['ETag']
+    user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+    response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert len(response.json()['results']) == 1
+
+
+@pytest.mark.django_db
+def test_nested_etags_ignore_zero_padded_ids(anon_client, user_client,
+                                             catalog):
+    title = catalog['titles'][1]
+    review = catalog['reviews'][0]
+    reviews_url = f'/api/v1/titles/0{title.id}/reviews/'
+    comments_url = (
+        f'/api/v1/titles/{review.title_id}/reviews/0{review.id}/comments/'
+    )
+    etags = [anon_client.get(url)['ETag']
+             for url in (reviews_url, comments_url)]
+    user_client.post(reviews_url, data={'text': 'Отзыв', 'score': 5})
+    user_client.post(comments_url, data={'text': 'Комментарий'})
+    for url, etag in zip((reviews_url, comments_url), etags):
+        assert anon_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code \
+            == 200
+
+
+@pytest.mark.django_db
+def test_if_modified_since_does_not_hide_writes_in_same_second(
+        anon_client, catalog, monkeypatch):
+    from types import SimpleNamespace
+
+    monkeypatch.setattr(
+        'api.cache.time', SimpleNamespace(time=lambda: 1700000000.2)
+    )
+    title = catalog['titles'][0]
+    url = f'/api/v1/titles/{title.id}/'
+    first = anon_client.get(url)
+    monkeypatch.setattr(
+        'api.cache.time', SimpleNamespace(time=lambda: 1700000000.7)
+    )
+    title.name = 'Новое название'
+    title.save()
+    response = anon_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+    )
+    assert response.status_code == 200
+    assert response['Last-Modified'] == first['Last-Modified']
+    assert response.json()['name'] == 'Новое название'
+    response = anon_client.get(
+        url,
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        HTTP_IF_NONE_MATCH=response['ETag'],
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_if_match_on_patch(admin_client, catalog):
+    url = f'/api/v1/titles/{catalog["titles"][0].id}/'
+    etag = admin_client.get(url)['ETag']
+    data = {'name': 'Новое название', 'category': 'category-0'}
+    response = admin_client.patch(url, data=data, HTTP_IF_MATCH='"stale"')
+    assert response.status_code == 412
+    response = admin_client.patch(url, data=data, HTTP_IF_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    response = admin_client.delete(url, HTTP_IF_MATCH=etag)
+    assert response.status_code == 412
+
+
+@pytest.mark.django_db
+def test_if_match_ignores_writes_to_other_objects(admin_client, user_client,
+                                                  anon_client, catalog):
+    url = f'/api/v1/titles/{catalog["titles"][0].id}/'
+    etag = admin_client.get(url)['ETag']
+    user_client.post(
+        f'/api/v1/titles/{catalog["titles"][1].id}/reviews/',
+        data={'text': 'Отзыв', 'score': 5},
+    )
+    anon_client.post(
+        '/api/v1/auth/signup/',
+        data={'username': 'newcomer', 'email': 'newcomer@example.com'},
+    )
+    data = {'name': 'Новое название', 'category': 'category-0'}
+    response = admin_client.patch(url, data=data, HTTP_IF_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_object_etag_follows_related_data(admin_client, user_client,
+                                          anon_client, catalog):
+    title = catalog['titles'][0]
+    url = f'/api/v1/titles/{title.id}/'
+    etag = anon_client.get(url)['ETag']
+    user_client.post(
+        f'/api/v1/titles/{title.id}/reviews/',
+        data={'text': 'Отзыв', 'score': 5},
+    )
+    rated_etag = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)['ETag']
+    assert rated_etag != etag
+    title.category.name = 'Новое имя'
+    title.category.save()
+    response = anon_client.get(url, HTTP_IF_NONE_MATCH=rated_etag)
+    assert response.status_code == 200
+    assert response.json()['category']['name'] == 'Новое имя'
+
+
+@pytest.mark.django_db
+def test_review_etag_changes_only_on_author_rename(anon_client, catalog):
+    review = catalog['reviews'][0]
+    url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+    etag = anon_client.get(url)['ETag']
+    anon_client.post(
+        '/api/v1/auth/signup/',
+        data={'username': 'newcomer', 'email': 'newcomer@example.com'},
+    )
+    assert anon_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    author = review.author
+    author.username = 'renamed'
+    author.save()
+    response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['author'] == 'renamed'
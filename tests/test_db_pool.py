@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def ping(self):
+        if self.broken:
+            raise OSError('server closed the connection')
+
+
+def make_pool(**kwargs):
+    from db.pool import ConnectionPool
+
+    return ConnectionPool(
+        connect=FakeConnection,
+        ping=FakeConnection.ping,
+        reset=lambda connection: not connection.closed,
+        close=lambda connection: setattr(connection, 'closed', True),
+        label='test',
+        **kwargs,
+    )
+
+
+def test_connections_are_reused():
+    pool = make_pool(max_size=2)
+    first = pool.checkout()
+    pool.checkin(first)
+    assert pool.checkout() is first
+    assert pool.snapshot()['created'] == 1
+    assert pool.snapshot()['in_use'] == 1
+
+
+def test_broken_connection_is_replaced_on_checkout():
+    pool = make_pool(max_size=1)
+    connection = pool.checkout()
+    pool.checkin(connection)
+    connection.broken = True
+    replacement = pool.checkout()
+    assert replacement is not connection
+    assert connection.closed
+    stats = pool.snapshot()
+    assert stats['health_check_failures'] == 1
+    assert stats['size'] == 1
+
+
+def test_closed_connection_is_not_returned_to_pool():
+    pool = make_pool()
+    connection = pool.checkout()
+    connection.closed = True
+    pool.checkin(connection)
+    assert pool.snapshot()['size'] == 0
+    assert pool.snapshot()['discarded'] == 1
+
+
+def test_exhausted_pool_counts_waits_and_timeouts():
+    from db.pool import PoolExhaustedError
+
+    pool = make_pool(max_size=1, timeout=0.5)
+    connection = pool.checkout()
+    timer = threading.Timer(0.05, pool.checkin, [connection])
+    timer.start()
+    assert pool.checkout() is connection
+    timer.join()
+    stats = pool.snapshot()
+    assert stats['waits'] == 1
+    assert 0.04 < stats['wait_time'] < 0.5
+    pool.timeout = 0.01
+    started = time.monotonic()
+    with pytest.raises(PoolExhaustedError):
+        pool.checkout()
+    assert time.monotonic() - started < 0.5
+    assert pool.snapshot()['exhausted'] == 1
+
+
+def test_failed_connect_releases_slot():
+    from db.pool import ConnectionPool
+
+    def connect():
+        raise OSError('refused')
+
+    pool = ConnectionPool(
+        connect=connect, ping=None, reset=None, close=None, max_size=1
+    )
+    for _ in range(2):
+        with pytest.raises(OSError):
+            pool.checkout()
+    assert pool.snapshot()['size'] == 0
@@ -0,0 +1,175 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from django.test import RequestFactory
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica_1']
+    settings.DATABASE_STICKY_SECONDS = 5
+    return settings
+
+
+def read_alias(request):
+    from db.routers import request_routing
+    from reviews.models import Review
+
+    with request_routing(request) as state:
+        return Review.objects.all().db, state
+
+
+def test_replica_databases_copy_primary_settings():
+    from db.config import replica_databases
+    from django.core.exceptions import ImproperlyConfigured
+
+    primary = {'ENGINE': 'postgresql', 'NAME': 'yamdb', 'HOST': 'db'}
+    replicas = replica_databases(primary, hosts=['db-1', 'db-2'])
+    assert list(replicas) == ['replica_1', 'replica_2']
+    assert replicas['replica_2'] == {
+        'ENGINE': 'postgresql', 'NAME': 'yamdb', 'HOST': 'db-2',
+        'TEST': {'MIRROR': 'default'},
+    }
+    assert replica_databases(primary, names=['r.sqlite3'])['replica_1'][
+        'NAME'
+    ] == 'r.sqlite3'
+    with pytest.raises(ImproperlyConfigured):
+        replica_databases(primary, hosts=['a'], names=['b', 'c'])
+
+
+def test_safe_requests_read_from_replica(replicas):
+    from db.routers import request_routing
+    from django.contrib.sessions.models import Session
+    from reviews.models import Review
+
+    factory = RequestFactory()
+    assert read_alias(factory.get('/'))[0] == 'replica_1'
+    assert read_alias(factory.post('/'))[0] == 'default'
+    # Вне запроса и для приложений не из списка - основная база.
+    assert Review.objects.all().db == 'default'
+    with request_routing(factory.get('/')):
+        assert Session.objects.all().db == 'default'
+
+
+def test_reads_after_write_stay_on_primary(replicas):
+    from db.routers import ReplicaRouter, request_routing
+    from reviews.models import Review
+
+    with request_routing(RequestFactory().get('/')):
+        assert Review.objects.all().db == 'replica_1'
+        assert ReplicaRouter().db_for_write(Review) == 'default'
+        assert Review.objects.all().db == 'default'
+
+
+def test_response_cache_is_filled_from_primary(replicas):
+    from api.cache import CachedResponseMixin
+    from db.routers import primary_reads, request_routing
+    from reviews.models import Review
+    from rest_framework.request import Request
+    from rest_framework.response import Response
+
+    class View(CachedResponseMixin):
+        basename = 'reviews'
+        action = 'list'
+
+    def handler(request):
+        return Response({'db': Review.objects.all().db})
+
+    request = Request(RequestFactory().get('/cached/'))
+    with request_routing(request):
+        assert Review.objects.all().db == 'replica_1'
+        with primary_reads():
+            assert Review.objects.all().db == 'default'
+        assert Review.objects.all().db == 'replica_1'
+        response = View().cached_response(handler, request)
+    assert response.data == {'db': 'default'}
+
+
+def test_sticky_cache_must_be_shared(replicas):
+    from api.cache import check_shared_cache
+    from django.core.exceptions import ImproperlyConfigured
+
+    replicas.API_CACHE_REQUIRE_SHARED = True
+    replicas.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'api_cache',
+        },
+        'local': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+    check_shared_cache()
+    replicas.DATABASE_STICKY_CACHE = 'local'
+    with pytest.raises(ImproperlyConfigured):
+        check_shared_cache()
+
+
+@pytest.mark.django_db
+def test_writer_is_sticky_to_primary(replicas, user):
+    from db.routers import ReplicaRouter, request_routing
+    from reviews.models import Review
+
+    factory = RequestFactory()
+    request = factory.post('/')
+    request.user = user
+    with request_routing(request):
+        ReplicaRouter().db_for_write(Review)
+    request = factory.get('/')
+    request.user = user
+    assert read_alias(request)[0] == 'default'
+    assert read_alias(factory.get('/'))[0] == 'replica_1'
+    replicas.DATABASE_STICKY_SECONDS = 0
+    assert read_alias(request)[0] == 'replica_1'
+
+
+def test_lazy_user_is_not_resolved_by_router(replicas):
+    from django.utils.functional import SimpleLazyObject
+
+    request = RequestFactory().get('/')
+    request.user = SimpleLazyObject(lambda: pytest.fail('user resolved'))
+    alias, state = read_alias(request)
+    assert alias == 'replica_1'
+    assert state.sticky is None
+
+
+SCRIPT = '''
+import json
+from django.test import Client
+from reviews.models import Category, Title
+
+category = Category.objects.create(name="Только в основной", slug="primary")
+title = Title.objects.create(name="Т", year=2000, category=category)
+print(json.dumps([
+    Category.objects.count(),
+    Client().get(f"/api/v1/titles/{title.pk}/reviews/").status_code,
+    Client().get("/api/v1/categories/").json()["count"],
+]))
+'''
+
+
+def test_two_sqlite_files(tmp_path):
+    project = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                           'api_yamdb')
+    primary = tmp_path / 'primary.sqlite3'
+    env = dict(
+        os.environ,
+        DB_ENGINE='django.db.backends.sqlite3',
+        DB_NAME=str(primary),
+        DB_REPLICA_NAMES=str(tmp_path / 'replica.sqlite3'),
+    )
+
+    def manage(*args):
+        return subprocess.run(
+            [sys.executable, 'manage.py', *args], cwd=project, env=env,
+            check=True, capture_output=True, text=True,
+        ).stdout
+
+    manage('migrate', '-v', '0')
+    shutil.copy(primary, tmp_path / 'replica.sqlite3')
+    # Запись ушла в основную базу, а отзывы читаются с реплики, куда
+    # произведение еще не «доехало»; кэш ответов заполняется из основной.
+    assert manage('shell', '-c', SCRIPT).split()[-3:] == ['[1,', '404,', '1]']
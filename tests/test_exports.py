@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_reviews_export_streams_ndjson(admin_client, catalog):
+    title = catalog['titles'][0]
+    response = admin_client.get(
+        f'/api/v1/export/reviews/?title={title.pk}&author=author1'
+    )
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert len(rows) == 1
+    assert rows[0]['title_id'] == title.pk
+    assert rows[0]['author'] == 'author1'
+    assert rows[0]['score'] == 2
+
+
+@pytest.mark.django_db
+def test_comments_export_streams_csv(admin_client, catalog):
+    title = catalog['titles'][0]
+    response = admin_client.get(
+        f'/api/v1/export/comments/?format=csv&title={title.pk}'
+    )
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(content(response))))
+    assert len(rows) == 15
+    assert [int(row['id']) for row in rows] == sorted(
+        int(row['id']) for row in rows
+    )
+    assert {row['title_id'] for row in rows} == {str(title.pk)}
+
+
+@pytest.mark.django_db
+def test_export_validates_filters_and_permissions(user_client, admin_client):
+    assert user_client.get('/api/v1/export/reviews/').status_code == 403
+    response = admin_client.get('/api/v1/export/reviews/?since=вчера')
+    assert response.status_code == 400
+    assert 'since' in json.loads(response.content)
+
+
+@pytest.mark.django_db
+def test_export_reviews_command(catalog, tmp_path):
+    from django.core.management import call_command
+
+    output = tmp_path / 'reviews.csv'
+    call_command(
+        'export_reviews', '--format', 'csv', '--output', str(output),
+        '--since', '2000-01-01T00:00:00', '--chunk-size', '2',
+    )
+    rows = list(csv.DictReader(output.open(encoding='utf-8')))
+    assert len(rows) == 5
+    assert rows[0].keys() == {
+        'id', 'title_id', 'author', 'text', 'score', 'pub_date'
+    }
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def compare(client, settings, url):
+    """Возвращает ответы обычного и быстрого пути и число запросов."""
+    from django.core.cache import caches
+
+    responses = {}
+    queries = {}
+    for fast in (False, True):
+        settings.API_FAST_LIST = fast
+        caches[settings.API_CACHE_ALIAS].clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, response.content
+        responses[fast] = response
+        queries[fast] = len(context)
+    return responses[False], responses[True], queries
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', [
+    '', '?name=Про', '?genre=genre-1,genre-2', '?genre=genre-0&genre_mode=all',
+    '?category=category-2', '?year_min=2002', '?q=Произведение',
+])
+def test_titles_fast_list_matches_serializer(anon_client, catalog, settings,
+                                             query):
+    slow, fast, queries = compare(
+        anon_client, settings, f'/api/v1/titles/{query}'
+    )
+    assert fast.content == slow.content
+    assert queries[True] <= queries[False]
+
+
+@pytest.mark.django_db
+def test_title_without_category_or_genres(anon_client, catalog, settings):
+    from reviews.models import Title
+
+    Title.objects.create(name='Без категории', year=1999)
+    slow, fast, _ = compare(anon_client, settings, '/api/v1/titles/?page=2')
+    assert fast.content == slow.content
+    title, = [
+        title for title in fast.json()['results']
+        if title['name'] == 'Без категории'
+    ]
+    assert title['category'] is None
+    assert title['genre'] == []
+    assert title['rating'] is None
+
+
+@pytest.mark.django_db
+def test_reviews_fast_list_matches_serializer(anon_client, catalog, settings):
+    title = catalog['titles'][0]
+    url = f'/api/v1/titles/{title.id}/reviews/'
+    slow, fast, queries = compare(anon_client, settings, url)
+    assert fast.content == slow.content
+    assert queries[True] == queries[False]
+    next_url = fast.json()['next']
+    if next_url:
+        slow, fast, _ = compare(anon_client, settings, next_url)
+        assert fast.content == slow.content
+
+
+@pytest.mark.django_db
+def test_comments_fast_list_matches_serializer(anon_client, catalog,
+                                               settings):
+    review = catalog['reviews'][0]
+    url = (
+        f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+    )
+    slow, fast, _ = compare(anon_client, settings, url)
+    assert fast.content == slow.content
+    assert len(fast.json()['results']) == 3
+
+
+@pytest.mark.django_db
+def test_sparse_fields_use_regular_serializer(anon_client, catalog, settings):
+    settings.API_FAST_LIST = True
+    response = anon_client.get('/api/v1/titles/?fields=id,genre')
+    assert response.json()['results'][1] == {
+        'id': catalog['titles'][1].id, 'genre': ['genre-0', 'genre-1']
+    }
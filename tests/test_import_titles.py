@@ -0,0 +1,69 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_bulk_endpoint_reports_row_errors(admin_client, catalog,
+                                          django_assert_max_num_queries):
+    from reviews.models import Title
+
+    rows = [
+        {'name': 'Первое', 'year': 1999, 'category': 'category-0',
+         'genre': ['genre-0', 'genre-1']},
+        {'name': '', 'year': 1999},
+        {'name': 'Без жанра', 'year': 'давно', 'genre': 'unknown'},
+        {'name': 'Второе', 'year': 2000, 'genre': 'genre-2'},
+    ]
+    with django_assert_max_num_queries(12):
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data=rows, format='json'
+        )
+    assert response.status_code == 201
+    report = response.json()
+    assert report['created'] == 2
+    assert [error['row'] for error in report['errors']] == [2, 3]
+    assert set(report['errors'][1]['errors']) == {'year', 'genre'}
+    first = Title.objects.get(pk=report['ids'][0])
+    assert first.category.slug == 'category-0'
+    assert sorted(first.genre.values_list('slug', flat=True)) == [
+        'genre-0', 'genre-1'
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_endpoint_is_admin_only(user_client):
+    response = user_client.post(
+        '/api/v1/titles/bulk/', data=[{'name': 'x', 'year': 1}],
+        format='json',
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_create_title_from_json(admin_client, catalog):
+    response = admin_client.post(
+        '/api/v1/titles/',
+        data={'name': 'Из JSON', 'description': 'x', 'year': 2000,
+              'category': 'category-0', 'genre': ['genre-0', 'genre-1']},
+        format='json',
+    )
+    assert response.status_code == 201
+    assert [genre['slug'] for genre in response.json()['genre']] == [
+        'genre-0', 'genre-1'
+    ]
+
+
+@pytest.mark.django_db
+def test_import_titles_command(tmp_path, catalog):
+    from django.core.management import call_command
+    from reviews.models import Title
+
+    path = tmp_path / 'titles.csv'
+    path.write_text(
+        'name,year,category,genre\n'
+        'Фильм,2001,category-1,"genre-0,genre-2"\n'
+        'Ошибка,3000,category-1,\n',
+        encoding='utf-8',
+    )
+    before = Title.objects.count()
+    call_command('import_titles', str(path), chunk_size=1)
+    assert Title.objects.count() == before + 1
@@ -0,0 +1,84 @@
+import pytest
+
+
+@pytest.fixture
+def rated(catalog):
+    '''Второе произведение получает много высоких оценок.'''
+    from reviews.models import Review
+
+    titles = catalog['titles']
+    for author in catalog['authors']:
+        Review.objects.create(
+            title=titles[1], author=author, text='Отзыв', score=10
+        )
+    Review.objects.create(
+        title=titles[2], author=catalog['authors'][0], text='Отзыв', score=10
+    )
+    return catalog
+
+
+def top(client, query=''):
+    response = client.get(f'/api/v1/titles/top/{query}')
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_bayesian_score_prefers_many_votes(anon_client, rated):
+    data = top(anon_client)
+    titles = rated['titles']
+    ids = [row['title']['id'] for row in data['results']]
+    # Одна десятка весит меньше, чем пять: среднее тянется к общему.
+    assert ids == [titles[1].id, titles[2].id, titles[0].id]
+    assert data['results'][0]['review_count'] == 5
+    assert data['results'][0]['title']['name'] == titles[1].name
+
+
+@pytest.mark.django_db
+def test_top_filters_and_follows_deletes(anon_client, rated):
+    titles = rated['titles']
+    data = top(anon_client, '?category=category-2')
+    assert [row['title']['id'] for row in data['results']] == [titles[2].id]
+    data = top(anon_client, '?genre=genre-1')
+    assert {row['title']['id'] for row in data['results']} == {
+        titles[1].id, titles[2].id
+    }
+    titles[2].reviews.all().delete()
+    data = top(anon_client, '?genre=genre-1')
+    assert [row['title']['id'] for row in data['results']] == [titles[1].id]
+
+
+@pytest.mark.django_db
+def test_top_uses_keyset_pages(anon_client, rated, monkeypatch):
+    from api.pagination import RankingCursorPagination
+
+    expected = [row['title']['id'] for row in top(anon_client)['results']]
+    monkeypatch.setattr(RankingCursorPagination, 'page_size', 1)
+    ids = []
+    url = '/api/v1/titles/top/'
+    while url:
+        data = anon_client.get(url).json()
+        assert 'count' not in data
+        ids.extend(row['title']['id'] for row in data['results'])
+        url = data['next']
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_rebuild_rankings_command(rated, settings):
+    from django.core.management import call_command
+    from reviews.models import Title, TitleRanking
+
+    TitleRanking.objects.all().delete()
+    call_command('rebuild_rankings')
+    titles = Title.objects.filter(review_count__gt=0)
+    scores = {title.pk: title.score_sum for title in titles}
+    counts = {title.pk: title.review_count for title in titles}
+    mean = sum(scores.values()) / sum(counts.values())
+    votes = settings.LEADERBOARD_MIN_VOTES
+    for ranking in TitleRanking.objects.all():
+        expected = (scores[ranking.title_id] + votes * mean) / (
+            counts[ranking.title_id] + votes
+        )
+        assert ranking.score == pytest.approx(expected)
+    assert TitleRanking.objects.count() == len(scores)
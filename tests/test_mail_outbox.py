@@ -0,0 +1,60 @@
+import pytest
+
+
+@pytest.fixture
+def locmem_mail(settings):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    from django.core import mail
+
+    mail.outbox = []
+    return mail
+
+
+@pytest.mark.django_db
+def test_signup_queues_confirmation_code(anon_client, locmem_mail):
+    from django.contrib.auth.tokens import default_token_generator
+    from users.mail import send_pending
+    from users.models import OutgoingMail, User
+
+    data = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+    response = anon_client.post('/api/v1/auth/signup/', data=data)
+    assert response.status_code == 200
+    assert locmem_mail.outbox == []
+    queued = OutgoingMail.objects.get()
+    assert queued.recipient == data['email']
+
+    assert send_pending() == 1
+    assert len(locmem_mail.outbox) == 1
+    code = locmem_mail.outbox[0].body
+    user = User.objects.get(username='newbie')
+    assert default_token_generator.check_token(user, code)
+    queued.refresh_from_db()
+    assert queued.status == OutgoingMail.SENT
+    assert send_pending() == 0
+
+
+@pytest.mark.django_db
+def test_failed_mail_is_retried_with_backoff(monkeypatch, settings,
+                                             locmem_mail):
+    from django.core.mail import EmailMessage
+    from users.mail import enqueue_mail, send_pending
+    from users.models import OutgoingMail
+
+    settings.MAIL_OUTBOX_MAX_ATTEMPTS = 2
+
+    def broken_send(self, fail_silently=False):
+        raise ConnectionError('smtp is down')
+
+    monkeypatch.setattr(EmailMessage, 'send', broken_send)
+    mail = enqueue_mail('subject', 'body', 'user@yamdb.fake')
+    assert send_pending() == 1
+    mail.refresh_from_db()
+    assert mail.status == OutgoingMail.PENDING
+    assert mail.attempts == 1
+    assert mail.last_error == 'smtp is down'
+    assert send_pending() == 0
+
+    OutgoingMail.objects.update(next_attempt_at=mail.created)
+    assert send_pending() == 1
+    mail.refresh_from_db()
+    assert mail.status == OutgoingMail.FAILED
@@ -0,0 +1,106 @@
+import pytest
+
+
+@pytest.fixture
+def store(settings, tmp_path):
+    from metrics.store import get_store
+
+    settings.METRICS_DIR = str(tmp_path)
+    get_store.cache_clear()
+    yield get_store()
+    get_store.cache_clear()
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db
+def test_metrics_are_labelled_by_viewset_and_action(client, store, catalog):
+    for _ in range(2):
+        assert client.get('/api/v1/titles/').status_code == 200
+    client.post('/api/v1/auth/signup/', data={})
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.content.decode()
+
+    assert '# TYPE yamdb_http_request_duration_seconds histogram' in text
+    assert sample(
+        text,
+        'yamdb_http_requests_total{action="list",view="TitleViewSet",'
+        'method="GET",status="200"}',
+    ) == 2
+    assert sample(
+        text,
+        'yamdb_http_requests_total{action="post",'
+        'view="RegistrationAPIView",method="POST",status="400"}',
+    ) == 1
+    labels = 'action="list",view="TitleViewSet"'
+    assert sample(
+        text, f'yamdb_http_request_duration_seconds_count{{{labels}}}'
+    ) == 2
+    assert sample(
+        text, f'yamdb_http_request_db_queries_bucket{{{labels},le="+Inf"}}'
+    ) == 2
+    assert sample(
+        text, f'yamdb_http_request_db_queries_sum{{{labels}}}'
+    ) > 0
+    assert sample(
+        text, f'yamdb_http_response_size_bytes_sum{{{labels}}}'
+    ) > 0
+
+
+def test_processes_are_summed_from_files(tmp_path):
+    from metrics.http import REQUESTS
+    from metrics.store import MetricsStore
+
+    labels = (('action', 'list'), ('view', 'TitleViewSet'))
+    first = MetricsStore(str(tmp_path))
+    second = MetricsStore(str(tmp_path))
+    first.inc(REQUESTS, labels)
+    second.inc(REQUESTS, labels, 2)
+    second.flush()
+    assert first.collect()[REQUESTS.name, '', labels, None] == 3
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_forked_process_starts_with_own_counters(tmp_path, monkeypatch):
+    from metrics.http import DURATION
+    from metrics.store import MetricsStore
+
+    labels = (('action', 'list'), ('view', 'TitleViewSet'))
+    store = MetricsStore(str(tmp_path))
+    store.observe(DURATION, labels, 0.02)
+    store.flush()
+    parent_path = store.path
+
+    monkeypatch.setattr('metrics.store.os.getpid', lambda: -1)
+    store.observe(DURATION, labels, 3)
+    assert store.path != parent_path
+    values = store.collect()
+    assert values[DURATION.name, '_count', labels, None] == 2
+    assert values[DURATION.name, '_bucket', labels, 0.025] == 1
+    assert values[DURATION.name, '_bucket', labels, 5] == 2
+
+
+def test_render_escapes_labels_and_orders_buckets():
+    from metrics.http import DURATION
+    from metrics.store import MetricsStore
+    from metrics.views import render
+
+    store = MetricsStore()
+    store.observe(DURATION, (('view', 'a"b'),), 0.3)
+    lines = render(store.snapshot()).splitlines()
+    buckets = [line for line in lines if '_bucket' in line]
+    assert buckets[0] == (
+        'yamdb_http_request_duration_seconds_bucket'
+        '{view="a\\"b",le="0.005"} 0'
+    )
+    assert buckets[-1].endswith('le="+Inf"} 1')
+    assert lines[-1] == (
+        'yamdb_http_request_duration_seconds_count{view="a\\"b"} 1'
+    )
@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+BEFORE = [('reviews', '0007_title_search')]
+AFTER = [('reviews', '0008_title_filter_indexes')]
+
+
+@pytest.fixture
+def migrate():
+    def run(targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    yield run
+    run(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_duplicate_title_genres_are_removed_before_unique(migrate):
+    apps = migrate(BEFORE)
+    Category = apps.get_model('reviews', 'Category')
+    Genre = apps.get_model('reviews', 'Genre')
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    category = Category.objects.create(name='Кино', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Т', year=2000, category=category)
+    first = TitleGenre.objects.create(genre=genre, title=title)
+    TitleGenre.objects.create(genre=genre, title=title)
+    TitleGenre.objects.create(genre=genre, title=title)
+
+    apps = migrate(AFTER)
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    assert list(TitleGenre.objects.values_list('id', flat=True)) == [
+        first.id
+    ]
@@ -0,0 +1,42 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+def test_second_review_is_rejected_by_parent_query(user_client, catalog):
+    url = f'/api/v1/titles/{catalog["titles"][1].id}/reviews/'
+    data = {'text': 'Отзыв', 'score': 5}
+    assert user_client.post(url, data=data).status_code == 201
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.post(url, data=data)
+    assert response.status_code == 400
+    # Пользователь из кэша аутентификации и один запрос за произведением
+    # вместе с проверкой отзыва.
+    assert len(queries) == 1
+    assert 'EXISTS' in queries[0]['sql']
+
+
+@pytest.mark.django_db
+def test_comment_parent_is_resolved_once(user_client, catalog):
+    review = catalog['reviews'][0]
+    url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.post(url, data={'text': 'Комментарий'})
+    assert response.status_code == 201
+    parent, insert = [query['sql'] for query in queries]
+    assert 'JOIN "reviews_title"' in parent
+    assert insert.startswith('INSERT')
+
+
+@pytest.mark.django_db
+def test_parent_must_match_url(user_client, catalog):
+    review = catalog['reviews'][0]
+    other_title = catalog['titles'][1]
+    url = f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+    assert user_client.get(url).status_code == 404
+    assert user_client.post(url, data={'text': 'x'}).status_code == 404
+    url = '/api/v1/titles/999/reviews/'
+    assert user_client.post(url, data={'text': 'x', 'score': 1}) \
+        .status_code == 404
@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_reviews_cursor_pagination_walks_every_review(anon_client, catalog,
+                                                      django_user_model):
+    from reviews.models import Review
+
+    title = catalog['titles'][0]
+    for i in range(7):
+        author = django_user_model.objects.create_user(
+            username=f'reader{i}', email=f'reader{i}@yamdb.fake', role='user'
+        )
+        catalog['reviews'].append(Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        ))
+    url = f'/api/v1/titles/{title.id}/reviews/'
+    seen = []
+    pages = 0
+    while url:
+        pages += 1
+        response = anon_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data
+        seen.extend(review['id'] for review in data['results'])
+        url = data['next']
+    expected = sorted(
+        catalog['reviews'], key=lambda review: (review.pub_date, review.id),
+        reverse=True,
+    )
+    assert seen == [review.id for review in expected]
+    assert pages == 3
+
+
+@pytest.mark.django_db
+def test_comments_cursor_is_opaque(anon_client, catalog):
+    review = catalog['reviews'][0]
+    response = anon_client.get(
+        f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data['results']) == 3
+    assert data['next'] is None
+    response = anon_client.get(
+        f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        '?cursor=garbage'
+    )
+    assert response.status_code == 404
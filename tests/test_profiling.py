@@ -0,0 +1,87 @@
+import pytest
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+def signed_header():
+    from api.profiling import make_header_value
+
+    return {'HTTP_X_PROFILE': make_header_value()}
+
+
+@pytest.mark.django_db
+def test_signed_header_profiles_request(client, catalog, profile_dir):
+    response = client.get('/api/v1/titles/', **signed_header())
+    assert response.status_code == 200
+    name = response['X-Profile-Id']
+    assert name.startswith(
+        f'TitleViewSet.list__q{response["X-DB-Query-Count"]}__'
+    )
+    assert name.endswith('.pstats')
+    assert (profile_dir / name).exists()
+
+
+@pytest.mark.django_db
+def test_requests_are_not_profiled_without_valid_signature(
+    client, profile_dir, settings
+):
+    assert 'X-Profile-Id' not in client.get('/api/v1/titles/')
+    response = client.get('/api/v1/titles/', HTTP_X_PROFILE='profile:1:bad')
+    assert 'X-Profile-Id' not in response
+    settings.PROFILE_SAMPLE_RATE = 1
+    assert 'X-Profile-Id' not in client.get('/metrics')
+    assert 'X-Profile-Id' in client.get('/api/v1/genres/')
+    assert len(list(profile_dir.iterdir())) == 1
+
+
+@pytest.mark.django_db
+def test_aggregate_profiles_writes_collapsed_stacks(client, catalog,
+                                                    profile_dir, tmp_path):
+    from django.core.management import call_command
+
+    client.get('/api/v1/titles/', **signed_header())
+    client.get('/api/v1/genres/', **signed_header())
+    output = tmp_path / 'stacks.txt'
+    call_command(
+        'aggregate_profiles', '--route', 'TitleViewSet.list',
+        '--output', str(output),
+    )
+    lines = output.read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, micros = line.rsplit(' ', 1)
+        assert stack.startswith('TitleViewSet.list;')
+        assert int(micros) >= 0
+    assert any('get_queryset' in line for line in lines)
+
+
+def test_collapse_splits_time_between_callers():
+    from api.profiling import collapse
+
+    main = ('app.py', 1, 'main')
+    first = ('app.py', 10, 'first')
+    second = ('app.py', 20, 'second')
+    helper = ('app.py', 30, 'helper')
+    stats = {
+        main: (1, 1, 0.001, 0.007, {}),
+        first: (1, 1, 0.001, 0.003, {main: (1, 1, 0.001, 0.003)}),
+        second: (1, 1, 0.001, 0.003, {main: (1, 1, 0.001, 0.003)}),
+        helper: (2, 2, 0.004, 0.004, {
+            first: (1, 1, 0.002, 0.002),
+            second: (1, 1, 0.002, 0.002),
+        }),
+    }
+    stacks = {
+        stack: round(micros) for stack, micros in collapse(stats, 'r').items()
+    }
+    assert stacks == {
+        'r;app.py:1(main)': 1000,
+        'r;app.py:1(main);app.py:10(first)': 1000,
+        'r;app.py:1(main);app.py:20(second)': 1000,
+        'r;app.py:1(main);app.py:10(first);app.py:30(helper)': 2000,
+        'r;app.py:1(main);app.py:20(second);app.py:30(helper)': 2000,
+    }
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Максимальное число SQL-запросов на запрос к каждому маршруту router_v1.
+# Бюджет не зависит от количества объектов на странице: если он
+# превышен, скорее всего во вьюсет вернулся запрос N+1.
+BUDGETS = [
+    ('titles-list', 'anon', 'get', '/api/v1/titles/', 3),
+    ('titles-detail', 'anon', 'get', '/api/v1/titles/{title}/', 2),
+    # Произведение и его жанры создаются в одной транзакции
+    # (SAVEPOINT/RELEASE внутри тестовой транзакции).
+    ('titles-create', 'admin', 'post', '/api/v1/titles/', 8),
+    ('titles-update', 'admin', 'patch', '/api/v1/titles/{title}/', 6),
+    ('categories-list', 'anon', 'get', '/api/v1/categories/', 2),
+    ('categories-create', 'admin', 'post', '/api/v1/categories/', 3),
+    ('genres-list', 'anon', 'get', '/api/v1/genres/', 2),
+    ('genres-create', 'admin', 'post', '/api/v1/genres/', 3),
+    ('reviews-list', 'anon', 'get', '/api/v1/titles/{title}/reviews/', 2),
+    (
+        'reviews-detail', 'anon', 'get',
+        '/api/v1/titles/{title}/reviews/{review}/', 2,
+    ),
+    # Сохранение отзыва и пересчет рейтинга идут в одной транзакции,
+    # в тестах она превращается в пару SAVEPOINT/RELEASE. Это первый
+    # отзыв на произведение, поэтому еще создаются строки гистограммы
+    # оценок и рейтинга лучших (UPDATE, INSERT и повторный UPDATE вместо
+    # одного UPDATE для каждой). Произведение и проверка повторного отзыва
+    # - один запрос.
+    ('reviews-create', 'user', 'post', '/api/v1/titles/{title}/reviews/', 12),
+    (
+        'comments-list', 'anon', 'get',
+        '/api/v1/titles/{title}/reviews/{review}/comments/', 2,
+    ),
+    (
+        'comments-detail', 'anon', 'get',
+        '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/', 2,
+    ),
+    # Пользователь, отзыв вместе с произведением и INSERT.
+    (
+        'comments-create', 'user', 'post',
+        '/api/v1/titles/{title}/reviews/{review}/comments/', 3,
+    ),
+    ('users-list', 'admin', 'get', '/api/v1/users/', 3),
+    ('users-detail', 'admin', 'get', '/api/v1/users/admin/', 2),
+    ('users-me', 'user', 'get', '/api/v1/users/me/', 1),
+]
+
+PAYLOADS = {
+    'titles-create': {
+        'name': 'Новое произведение', 'year': 2001, 'description': 'Текст',
+        'category': 'category-0', 'genre': ['genre-0', 'genre-1'],
+    },
+    'titles-update': {'name': 'Новое название', 'category': 'category-1'},
+    'categories-create': {'name': 'Новая', 'slug': 'new-category'},
+    'genres-create': {'name': 'Новый', 'slug': 'new-genre'},
+    'reviews-create': {'text': 'Отзыв', 'score': 7},
+    'comments-create': {'text': 'Комментарий'},
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, client_name, method, url, budget', BUDGETS,
+    ids=[route[0] for route in BUDGETS],
+)
+def test_query_budget(request, catalog, name, client_name, method, url,
+                      budget):
+    client = request.getfixturevalue(f'{client_name}_client')
+    review = catalog['reviews'][0]
+    # На первое произведение все авторы уже написали отзывы.
+    title = catalog['titles'][1 if name == 'reviews-create' else 0]
+    url = url.format(
+        title=title.id,
+        review=review.id,
+        comment=review.comments.first().id,
+    )
+    data = PAYLOADS.get(name)
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, data=data)
+    assert response.status_code < 400, (
+        f'{name}: {response.status_code} {response.content[:200]}'
+    )
+    assert len(queries) <= budget, (
+        f'Маршрут {name} выполнил {len(queries)} SQL-запросов '
+        f'при бюджете {budget}:\n'
+        + '\n'.join(query['sql'] for query in queries)
+    )
+    assert response['X-DB-Query-Count'] == str(len(queries))
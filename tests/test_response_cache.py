@@ -0,0 +1,79 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_catalog_list_is_served_from_cache(anon_client, catalog,
+                                           django_assert_num_queries):
+    from api.cache import cache_stats
+
+    first = anon_client.get('/api/v1/titles/?page=1')
+    assert first['X-Cache'] == 'MISS'
+    with django_assert_num_queries(0):
+        second = anon_client.get('/api/v1/titles/?page=1')
+    assert second['X-Cache'] == 'HIT'
+    assert second.json() == first.json()
+    other_page = anon_client.get('/api/v1/titles/?page=1&year=2001')
+    assert other_page['X-Cache'] == 'MISS'
+    assert cache_stats() == {'hits': 1, 'misses': 2}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [
+    '/api/v1/titles/', '/api/v1/categories/', '/api/v1/genres/',
+])
+def test_catalog_cache_is_invalidated_on_write(anon_client, catalog, user,
+                                               url):
+    from reviews.models import Genre, Review
+
+    anon_client.get(url)
+    Genre.objects.create(name='Новый', slug='new-genre')
+    assert anon_client.get(url)['X-Cache'] == 'MISS'
+    anon_client.get(url)
+    Review.objects.create(
+        title=catalog['titles'][2], author=user, text='Отзыв', score=3
+    )
+    assert anon_client.get(url)['X-Cache'] == 'MISS'
+
+
+@pytest.mark.django_db
+def test_title_detail_sees_new_rating(anon_client, catalog, user_client):
+    title = catalog['titles'][1]
+    url = f'/api/v1/titles/{title.id}/'
+    assert anon_client.get(url).json()['rating'] is None
+    user_client.post(f'{url}reviews/', data={'text': 'Отзыв', 'score': 8})
+    assert anon_client.get(url).json()['rating'] == 8
+
+
+@pytest.mark.django_db
+def test_recount_ratings_invalidates_cache_and_etags(anon_client, catalog):
+    from django.core.management import call_command
+    from reviews.models import Title
+
+    title = catalog['titles'][0]
+    url = f'/api/v1/titles/{title.id}/'
+    anon_client.get('/api/v1/titles/')
+    etag = anon_client.get(url)['ETag']
+    Title.objects.filter(pk=title.pk).update(review_count=0, rating=None)
+    call_command('recount_ratings')
+    assert anon_client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+    response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['rating'] is not None
+
+
+def test_process_local_cache_is_rejected_when_shared_required(settings):
+    from api.cache import check_shared_cache
+    from django.core.exceptions import ImproperlyConfigured
+
+    check_shared_cache()
+    settings.API_CACHE_REQUIRE_SHARED = True
+    with pytest.raises(ImproperlyConfigured):
+        check_shared_cache()
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.API_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'api_cache',
+        },
+    }
+    check_shared_cache()
@@ -0,0 +1,80 @@
+import pytest
+
+
+def distribution(client, title):
+    response = client.get(f'/api/v1/titles/{title.pk}/score-distribution/')
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_distribution_is_single_row_read(anon_client, catalog,
+                                         django_assert_num_queries):
+    title = catalog['titles'][0]
+    with django_assert_num_queries(1):
+        data = distribution(anon_client, title)
+    assert data['title'] == title.pk
+    assert data['count'] == 5
+    assert data['scores'] == {
+        str(score): int(score <= 5) for score in range(1, 11)
+    }
+
+
+@pytest.mark.django_db
+def test_distribution_without_reviews(anon_client, catalog):
+    data = distribution(anon_client, catalog['titles'][1])
+    assert data['count'] == 0
+    assert set(data['scores'].values()) == {0}
+    response = anon_client.get('/api/v1/titles/999999/score-distribution/')
+    assert response.status_code == 404
+    response = anon_client.get('/api/v1/titles/abc/score-distribution/')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_distribution_follows_review_writes(anon_client, catalog):
+    title = catalog['titles'][0]
+    first, second = catalog['reviews'][:2]
+    first.score = 10
+    first.save()
+    second.delete()
+    scores = distribution(anon_client, title)['scores']
+    assert scores['1'] == 0
+    assert scores['2'] == 0
+    assert scores['10'] == 1
+    assert sum(scores.values()) == 4
+
+
+@pytest.mark.django_db
+def test_recount_rebuilds_distribution(catalog):
+    from django.core.management import CommandError, call_command
+    from reviews.models import TitleScoreDistribution
+
+    title = catalog['titles'][0]
+    TitleScoreDistribution.objects.filter(title=title).update(score_3=7)
+    with pytest.raises(CommandError):
+        call_command('recount_ratings', '--check')
+    call_command('recount_ratings')
+    call_command('recount_ratings', '--check')
+    assert TitleScoreDistribution.objects.get(title=title).score_3 == 1
+
+
+@pytest.mark.django_db
+def test_moving_review_updates_both_titles(anon_client, catalog):
+    from django.core.management import call_command
+    from reviews.models import Review, TitleRanking
+
+    old, new = catalog['titles'][:2]
+    urls = [f'/api/v1/titles/{old.pk}/', f'/api/v1/titles/{old.pk}/reviews/']
+    etags = [anon_client.get(url)['ETag'] for url in urls]
+    review = Review.objects.get(pk=catalog['reviews'][0].pk)
+    review.title = new
+    review.save()
+    call_command('recount_ratings', '--check')
+    assert distribution(anon_client, old)['count'] == 4
+    assert distribution(anon_client, new)['scores'][str(review.score)] == 1
+    assert TitleRanking.objects.get(title=old).review_count == 4
+    assert TitleRanking.objects.get(title=new).review_count == 1
+    for url, etag in zip(urls, etags):
+        assert anon_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code \
+            == 200
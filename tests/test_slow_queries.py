@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    from db.slow_queries import get_limiter, get_logger
+
+    path = tmp_path / 'slow.jsonl'
+    settings.SLOW_QUERY_LOG = str(path)
+    settings.SLOW_QUERY_MS = 0
+    get_logger.cache_clear()
+    get_limiter.cache_clear()
+
+    def records():
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield records
+    get_logger.cache_clear()
+    get_limiter.cache_clear()
+
+
+@pytest.mark.django_db
+def test_slow_query_is_logged_with_view_and_plan(client, catalog, slow_log):
+    title = catalog['titles'][0]
+    assert client.get(f'/api/v1/titles/{title.id}/reviews/').status_code \
+        == 200
+    records = slow_log()
+    assert records
+    record = records[0]
+    assert record['view'] == 'ReviewsViewSet'
+    assert record['action'] == 'list'
+    assert record['method'] == 'GET'
+    assert record['sql'].startswith('SELECT')
+    assert str(title.id) in record['params']
+    assert record['plan']
+
+
+@pytest.mark.django_db
+def test_threshold_sampling_and_rate_limit(client, catalog, slow_log,
+                                           settings):
+    settings.SLOW_QUERY_MS = 10000
+    client.get('/api/v1/users/')
+    assert slow_log() == []
+
+    settings.SLOW_QUERY_MS = 0
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+    client.get('/api/v1/titles/')
+    assert slow_log() == []
+
+    settings.SLOW_QUERY_SAMPLE_RATE = 1
+    settings.SLOW_QUERY_RATE = '2/min'
+    for title in catalog['titles']:
+        client.get(f'/api/v1/titles/{title.id}/')
+    assert len(slow_log()) == 2
+
+
+@pytest.mark.django_db
+def test_explain_does_not_count_as_request_query(client, catalog, slow_log):
+    from django.db import connection
+
+    title = catalog['titles'][0]
+    url = f'/api/v1/titles/{title.id}/reviews/'
+    response = client.get(url)
+    assert len(slow_log()) == int(response['X-DB-Query-Count'])
+    assert connection.execute_wrappers.count(
+        connection.execute_wrappers[0]
+    ) == 1
+    assert len(connection.execute_wrappers) == 1
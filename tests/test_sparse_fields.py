@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context]
+
+
+@pytest.mark.django_db
+def test_default_representation_is_unchanged(anon_client, catalog):
+    data, _ = get(anon_client, f'/api/v1/titles/{catalog["titles"][1].id}/')
+    assert set(data) == {
+        'id', 'category', 'genre', 'rating', 'name', 'description', 'year'
+    }
+    assert data['category'] == {'name': 'Категория 1', 'slug': 'category-1'}
+    assert data['genre'][0] == {'name': 'Жанр 0', 'slug': 'genre-0'}
+
+
+@pytest.mark.django_db
+def test_fields_narrow_titles_query(anon_client, catalog):
+    data, queries = get(anon_client, '/api/v1/titles/?fields=id,name')
+    assert data['results'][0] == {
+        'id': catalog['titles'][0].id, 'name': 'Произведение 0'
+    }
+    # Без жанров нет prefetch-запроса, без категории - JOIN.
+    assert len(queries) == 2
+    assert 'reviews_category' not in queries[-1]
+    assert 'description' not in queries[-1]
+
+
+@pytest.mark.django_db
+def test_relations_collapse_to_slugs_unless_expanded(anon_client, catalog):
+    title = catalog['titles'][1]
+    url = f'/api/v1/titles/{title.id}/?fields=id,category,genre'
+    data, _ = get(anon_client, url)
+    assert data == {
+        'id': title.id,
+        'category': 'category-1',
+        'genre': ['genre-0', 'genre-1'],
+    }
+    data, _ = get(anon_client, url + '&expand=genre')
+    assert data['category'] == 'category-1'
+    assert data['genre'][1] == {'name': 'Жанр 1', 'slug': 'genre-1'}
+
+
+@pytest.mark.django_db
+def test_fields_on_reviews_skip_author_join(anon_client, catalog):
+    title = catalog['titles'][0]
+    data, queries = get(
+        anon_client, f'/api/v1/titles/{title.id}/reviews/?fields=id,score'
+    )
+    assert set(data['results'][0]) == {'id', 'score'}
+    assert 'users_user' not in queries[-1]
+    assert data['next'] is None or 'cursor=' in data['next']
+
+
+@pytest.mark.django_db
+def test_sparse_etag_differs_from_full(anon_client, catalog):
+    url = f'/api/v1/titles/{catalog["titles"][0].id}/'
+    full = anon_client.get(url)
+    sparse = anon_client.get(url + '?fields=id')
+    assert full['ETag'] != sparse['ETag']
+
+
+@pytest.mark.django_db
+def test_fields_do_not_affect_writes(user_client, catalog):
+    title = catalog['titles'][1]
+    response = user_client.post(
+        f'/api/v1/titles/{title.id}/reviews/?fields=id',
+        data={'text': 'Отзыв', 'score': 6},
+    )
+    assert response.status_code == 201
+    assert response.json()['score'] == 6
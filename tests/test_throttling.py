@@ -0,0 +1,148 @@
+import pytest
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr('api.throttling.time', clock)
+    return clock
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': rates,
+        }
+
+    return set_rates
+
+
+def token_request(client, username, ip='10.0.0.1'):
+    return client.post(
+        TOKEN_URL,
+        data={'username': username, 'confirmation_code': 'wrong'},
+        REMOTE_ADDR=ip,
+    )
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    from api.throttling import TokenBucket
+
+    bucket = TokenBucket(capacity=2, rate=0.5)
+    assert bucket.consume('key') == (True, 0)
+    assert bucket.consume('key') == (True, 0)
+    allowed, wait = bucket.consume('key')
+    assert not allowed
+    assert wait == pytest.approx(2)
+
+    clock.now += 2
+    assert bucket.consume('key')[0]
+    assert not bucket.consume('key')[0]
+    assert bucket.consume('other')[0]
+
+
+def test_bucket_evicts_least_recently_used_keys(clock):
+    from api.throttling import TokenBucket
+
+    bucket = TokenBucket(capacity=1, rate=0.001, max_keys=2)
+    bucket.consume('first')
+    bucket.consume('second')
+    bucket.consume('first')
+    bucket.consume('third')
+    assert list(bucket.states) == ['first', 'third']
+    # Вытесненный ключ начинает с полного ведра.
+    assert bucket.consume('second')[0]
+
+
+@pytest.mark.django_db
+def test_token_is_throttled_per_ip(client, user, rates):
+    rates(token_ip='2/min', token_username='100/min')
+    assert token_request(client, user.username).status_code == 400
+    assert token_request(client, 'someone').status_code == 404
+    response = token_request(client, user.username)
+    assert response.status_code == 429
+    assert int(response['Retry-After']) == 30
+    assert token_request(client, user.username, ip='10.0.0.2').status_code \
+        == 400
+
+
+@pytest.mark.django_db
+def test_spoofed_forwarded_for_does_not_bypass_ip_limit(client, user, rates):
+    rates(token_ip='2/min', token_username='100/min')
+
+    def via_nginx(client_ip, spoofed):
+        # nginx дописывает адрес клиента в конец X-Forwarded-For.
+        return client.post(
+            TOKEN_URL,
+            data={'username': user.username, 'confirmation_code': 'wrong'},
+            REMOTE_ADDR='172.18.0.5',
+            HTTP_X_FORWARDED_FOR=f'{spoofed}, {client_ip}',
+        )
+
+    assert via_nginx('203.0.113.7', '1.1.1.1').status_code == 400
+    assert via_nginx('203.0.113.7', '2.2.2.2').status_code == 400
+    assert via_nginx('203.0.113.7', '3.3.3.3').status_code == 429
+    assert via_nginx('203.0.113.8', '3.3.3.3').status_code == 400
+
+
+@pytest.mark.django_db
+def test_token_is_throttled_per_username(client, user, rates):
+    rates(token_ip='100/min', token_username='2/min')
+    for ip in ('10.0.0.1', '10.0.0.2'):
+        assert token_request(client, user.username, ip).status_code == 400
+    response = token_request(client, user.username.upper(), '10.0.0.3')
+    assert response.status_code == 429
+    assert token_request(client, 'someone', '10.0.0.3').status_code == 404
+
+
+@pytest.mark.django_db
+def test_array_body_is_rejected_not_throttled(client, rates):
+    rates(token_ip='100/min', token_username='1/min')
+    response = client.post(TOKEN_URL, data=[{'username': 'user'}],
+                           content_type='application/json')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_signup_is_throttled_and_refills(client, clock, rates):
+    rates(signup_ip='1/min', signup_username='100/min')
+    data = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+    assert client.post(SIGNUP_URL, data=data).status_code == 200
+    assert client.post(SIGNUP_URL, data=data).status_code == 429
+    clock.now += 60
+    assert client.post(SIGNUP_URL, data=data).status_code == 200
+
+
+@pytest.mark.django_db
+def test_views_without_scope_are_not_throttled(client, rates):
+    rates(signup_ip='1/min', token_ip='1/min')
+    for _ in range(3):
+        assert client.get('/api/v1/titles/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_buckets_can_live_in_shared_cache(client, user, rates, settings):
+    from django.core.cache import caches
+
+    settings.THROTTLE_CACHE = 'default'
+    rates(token_ip='1/min', token_username='100/min')
+    assert token_request(client, user.username).status_code == 400
+    assert token_request(client, user.username).status_code == 429
+    tokens, _ = caches['default'].get('throttle:token_ip:10.0.0.1')
+    assert tokens < 1
@@ -0,0 +1,32 @@
+import pytest
+
+
+def title_ids(client, catalog, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200, response.content
+    ids = {title['id'] for title in response.json()['results']}
+    return sorted(catalog['titles'].index(title) for title in catalog['titles']
+                  if title.pk in ids)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query, expected', [
+    ('genre=genre-1', [1, 2, 4]),
+    ('genre=genre-1,genre-2', [1, 2, 4]),
+    ('genre=genre-1,genre-2&genre_mode=all', [2]),
+    ('genre=genre-1&category=category-1', [1, 4]),
+    ('category=category-0&year_min=2001', [3]),
+    ('year_min=2001&year_max=2002', [1, 2]),
+    ('year=2003', [3]),
+    ('name=Произведение 3', [3]),
+    ('name=Произ&genre=genre-2', [2]),
+])
+def test_title_filters_combine(anon_client, catalog, query, expected):
+    assert title_ids(anon_client, catalog, query) == expected
+
+
+@pytest.mark.django_db
+def test_title_filter_rejects_unknown_genre_mode(anon_client, catalog):
+    response = anon_client.get('/api/v1/titles/?genre=genre-1&genre_mode=x')
+    assert response.status_code == 400
+    assert 'genre_mode' in response.json()
@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_search_orders_titles_by_relevance(anon_client, catalog):
+    from reviews.models import Title
+
+    in_description = Title.objects.create(
+        name='Неизвестный', description='Ремейк фильма Godfather', year=1990
+    )
+    in_name = Title.objects.create(
+        name='Godfather', description='Классика', year=1972
+    )
+    renamed = catalog['titles'][0]
+    renamed.name = 'The Godfather II'
+    renamed.save()
+
+    response = anon_client.get('/api/v1/titles/?q=godfather')
+    assert response.status_code == 200
+    ids = [title['id'] for title in response.json()['results']]
+    assert ids[-1] == in_description.id
+    assert set(ids) == {in_description.id, in_name.id, renamed.id}
+
+
+@pytest.mark.django_db
+def test_search_index_follows_deletes(anon_client, catalog):
+    title = catalog['titles'][0]
+    title.delete()
+    response = anon_client.get('/api/v1/titles/?q=Произведение')
+    ids = [item['id'] for item in response.json()['results']]
+    assert title.id not in ids
+    assert len(ids) == len(catalog['titles']) - 1